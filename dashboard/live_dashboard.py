@@ -9,6 +9,8 @@ from datetime import datetime
 from pathlib import Path
 import time
 
+from log_utils import tail_lines
+
 # Configurazione pagina
 st.set_page_config(
     page_title="🚀 AI Trading Dashboard",
@@ -17,6 +19,21 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+def count_lines(path):
+    """Righe del file, contando solo i byte aggiunti dall'ultimo refresh"""
+    state = st.session_state.setdefault('log_line_count', {'offset': 0, 'count': 0})
+    if path.stat().st_size < state['offset']:
+        # Log ruotato o troncato: si riparte da capo
+        state['offset'] = 0
+        state['count'] = 0
+    
+    with open(path, 'rb') as f:
+        f.seek(state['offset'])
+        for block in iter(lambda: f.read(1 << 20), b""):
+            state['count'] += block.count(b"\n")
+        state['offset'] = f.tell()
+    return state['count']
+
 def parse_trading_log():
     """Parse completo del log di trading"""
     log_file = Path("data/dual_ai_simple.log")
@@ -25,8 +42,8 @@ def parse_trading_log():
         return None
     
     try:
-        with open(log_file, 'r') as f:
-            lines = f.readlines()
+        # Solo la coda del file: il log cresce per tutta la sessione
+        lines = tail_lines(log_file, 200)
         
         # Dati da estrarre
         latest_portfolio = 1000.0
@@ -35,7 +52,7 @@ def parse_trading_log():
         prices = {}
         
         # Parse al contrario per dati più recenti
-        for line in reversed(lines[-200:]):  # Ultime 200 righe
+        for line in reversed(lines):  # Ultime 200 righe
             # Parse Portfolio
             if "📊 Portfolio:" in line and "€" in line:
                 try:
@@ -102,7 +119,7 @@ def parse_trading_log():
             'positions': latest_positions,
             'trades': list(reversed(trades))[:20],  # Ultimi 20 trades
             'prices': prices,
-            'total_lines': len(lines)
+            'total_lines': count_lines(log_file)
         }
     
     except Exception as e:
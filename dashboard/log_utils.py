@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Log Utils - Lettura dei log di trading condivisa dalle dashboard
+"""
+
+import os
+from pathlib import Path
+from typing import List, Union
+
+
+def tail_lines(path: Union[str, Path], n: int, block_size: int = 8192) -> List[str]:
+    """Ultime n righe di un file, leggendo a blocchi dalla fine"""
+    if n <= 0:
+        return []
+
+    with open(path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        blocks = []
+        newlines = 0
+        # Serve una riga in più: il primo blocco letto può iniziare a metà riga
+        while pos > 0 and newlines <= n:
+            size = min(block_size, pos)
+            pos -= size
+            f.seek(pos)
+            block = f.read(size)
+            blocks.append(block)
+            newlines += block.count(b'\n')
+
+    text = b''.join(reversed(blocks)).decode('utf-8', errors='replace')
+    lines = text.splitlines()
+    if pos > 0:
+        lines = lines[1:]
+    return lines[-n:]
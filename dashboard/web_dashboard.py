@@ -4,65 +4,237 @@ Web Dashboard - Dashboard web per il sistema di trading
 Interfaccia web real-time per monitorare portfolio, trades e performance
 """
 
+if __name__ == "__main__":
+    # Con eventlet la libreria standard va patchata prima di ogni altro import
+    try:
+        import eventlet
+        eventlet.monkey_patch()
+    except ImportError:
+        pass
+
 from flask import Flask, render_template, jsonify, request, send_from_directory
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
-from flask_socketio import SocketIO, emit
 import json
 import pickle
 import os
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
 import threading
+import atexit
 import time
+import functools
+import numpy as np
 import pandas as pd
-import plotly.graph_objs as go
-import plotly.utils
 from typing import Dict, List, Optional
 
+from log_utils import tail_lines
+
+try:
+    import orjson
+    json_loads = orjson.loads
+    ORJSON_AVAILABLE = True
+except ImportError:
+    json_loads = json.loads
+    ORJSON_AVAILABLE = False
+
+try:
+    import eventlet
+    # I/O (file, JSON, WebSocket) cooperativo: il refresh non blocca le richieste
+    SOCKETIO_ASYNC_MODE = 'eventlet'
+except ImportError:
+    SOCKETIO_ASYNC_MODE = None  # scelta automatica di Flask-SocketIO (threading)
+
+try:
+    import ormsgpack
+    ORMSGPACK_AVAILABLE = True
+except ImportError:
+    ORMSGPACK_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Mapping settori semplificato (in un sistema reale verrebbe da database)
+SECTOR_MAPPING = {
+    'AAPL': 'Technology',
+    'GOOGL': 'Technology', 
+    'MSFT': 'Technology',
+    'TSLA': 'Automotive',
+    'NVDA': 'Technology',
+    'AMD': 'Technology',
+    'META': 'Technology',
+    'NFLX': 'Entertainment',
+    'AMZN': 'E-commerce',
+    'JPM': 'Finance',
+    'BAC': 'Finance',
+    'GS': 'Finance'
+}
+
+def _single_flight(method):
+    """Richieste concorrenti allo stesso getter condividono un solo calcolo.
+    
+    Il primo thread calcola il risultato, gli altri attendono il suo evento e
+    ricevono lo stesso valore (o la stessa eccezione).
+    """
+    key = method.__name__
+    
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._inflight_lock:
+            flight = self._inflight.get(key)
+            owner = flight is None
+            if owner:
+                flight = (threading.Event(), [None, None])
+                self._inflight[key] = flight
+        
+        event, holder = flight
+        if not owner:
+            event.wait()
+            if holder[1] is not None:
+                raise holder[1]
+            return holder[0]
+        
+        try:
+            holder[0] = method(self, *args, **kwargs)
+            return holder[0]
+        except Exception as e:
+            holder[1] = e
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+            event.set()
+    
+    return wrapper
+
 class TradingDashboard:
     """Dashboard per il sistema di trading"""
     
+    # Evento WebSocket -> voce della cache inviata a ogni tick di refresh
+    BROADCAST_EVENTS = (
+        ('portfolio_update', 'portfolio'),
+        ('positions_update', 'positions'),
+        ('system_update', 'system')
+    )
+    # Campi che cambiano a ogni campionamento senza che i dati cambino
+    VOLATILE_FIELDS = ('last_update', 'timestamp')
+    # Senza modifiche ai file l'attesa tra due refresh raddoppia fino a
+    # IDLE_BACKOFF_MAX volte l'intervallo base (es. di notte, a mercato chiuso)
+    IDLE_BACKOFF_MAX = 8
+    
     def __init__(self, config):
         self.config = config
         self.data_dir = Path("data")
         self.portfolio_file = self.data_dir / "current_portfolio.pkl"
+        # Snapshot scritto da Portfolio.save_portfolio (vedi Portfolio.save_snapshot)
+        self.snapshot_file = self.data_dir / "current_portfolio.msgpack"
+        self.price_file = self.data_dir / "price_cache.json"
         self.log_file = self.data_dir / "aggressive_trader.log"
         
         # Cache per dati dashboard
         self.cache = {
             'portfolio': None,
+            'positions': None,
             'prices': None,
             'performance': None,
+            'system': None,
             'last_update': None
         }
         
-        # Auto-refresh thread
+        # (mtime, contenuto) dei file letti: si rilegge solo se il file cambia
+        self._portfolio_cache = None
+        self._price_cache = None
+        
+        # Grafico performance per (mtime del portfolio, giorno): dipende solo da questi
+        self._performance_cache = None
+        # Stato del replay delle transazioni già elaborate (vedi _replay_transactions)
+        self._perf_state = None
+        
+        # Calcoli in corso per getter: le richieste concorrenti li condividono
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        
+        # Auto-refresh thread (o task SocketIO)
         self.refresh_thread = None
+        self.socketio = None
         self.running = False
+        self._stop_event = threading.Event()  # sveglia il loop allo stop
+        self.refresh_interval = None
+        # Firma dei file sorgente (vedi _sources_signature) all'ultimo refresh
+        self._cache_signature = None
+        self._system_time = 0.0  # time.monotonic() dell'ultimo campionamento di sistema
+        
+        # Ultimo payload inviato in broadcast per evento (senza i timestamp)
+        self._last_broadcast = {}
+    
+    def _portfolio_source(self):
+        """(file, mtime ns) del portfolio più recente tra snapshot msgpack e pickle"""
+        candidates = [self.portfolio_file]
+        if ORMSGPACK_AVAILABLE:
+            # A parità di mtime vince lo snapshot
+            candidates.insert(0, self.snapshot_file)
+        
+        source, source_mtime = None, None
+        for path in candidates:
+            try:
+                mtime = path.stat().st_mtime_ns
+            except OSError:
+                continue
+            if source_mtime is None or mtime > source_mtime:
+                source, source_mtime = path, mtime
+        return source, source_mtime
+    
+    def _portfolio_mtime(self) -> Optional[int]:
+        """mtime (ns) del file portfolio, None se non esiste"""
+        return self._portfolio_source()[1]
         
     def load_portfolio(self):
-        """Carica portfolio corrente"""
+        """Carica portfolio corrente (riletto solo quando il file cambia)"""
+        source, mtime = self._portfolio_source()
+        cached = self._portfolio_cache
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        
         try:
-            if self.portfolio_file.exists():
-                with open(self.portfolio_file, 'rb') as f:
+            if source == self.snapshot_file:
+                portfolio = self._load_snapshot(source)
+                self._portfolio_cache = (mtime, portfolio)
+                return portfolio
+            if source is not None:
+                with open(source, 'rb') as f:
                     portfolio = pickle.load(f)
+                self._portfolio_cache = (mtime, portfolio)
                 return portfolio
         except Exception as e:
             logger.warning(f"⚠️ Errore caricamento portfolio: {e}")
+            return self._default_portfolio()
         
-        # Portfolio di default
+        portfolio = self._default_portfolio()
+        self._portfolio_cache = (None, portfolio)
+        return portfolio
+    
+    def _load_snapshot(self, path: Path):
+        """Ricostruisce il portfolio da uno snapshot msgpack"""
+        with open(path, 'rb') as f:
+            data = ormsgpack.unpackb(f.read())
+        return self._portfolio_class().from_dict(self._default_config(), data)
+    
+    def _portfolio_class(self):
+        """Classe Portfolio da src"""
         import sys
         import os
         # Aggiungi path per importare portfolio da src
         current_dir = os.path.dirname(os.path.abspath(__file__))
         src_dir = os.path.join(os.path.dirname(current_dir), 'src')
-        sys.path.insert(0, src_dir)
+        if src_dir not in sys.path:
+            sys.path.insert(0, src_dir)
         
         from portfolio import Portfolio
-        default_config = {
+        return Portfolio
+    
+    def _default_config(self):
+        """Configurazione di trading di default"""
+        return {
             'trading': {
                 'initial_capital': 10000,
                 'max_position_size': 0.2,
@@ -70,19 +242,37 @@ class TradingDashboard:
                 'take_profit': 0.1
             }
         }
-        return Portfolio(config=default_config)
+    
+    def _default_portfolio(self):
+        """Portfolio vuoto con il capitale iniziale di default"""
+        config = self._default_config()
+        return self._portfolio_class().from_dict(config, {
+            'cash': config['trading']['initial_capital'],
+            'positions': {},
+            'transactions': []
+        })
     
     def load_price_cache(self):
-        """Carica cache prezzi"""
+        """Carica cache prezzi (riletta solo quando il file cambia)"""
+        try:
+            mtime = self.price_file.stat().st_mtime_ns
+        except OSError:
+            return {}
+        
+        cached = self._price_cache
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        
         try:
-            price_file = self.data_dir / "price_cache.json"
-            if price_file.exists():
-                with open(price_file, 'r') as f:
-                    return json.load(f)
+            with open(self.price_file, 'rb') as f:
+                prices = json_loads(f.read())
+            self._price_cache = (mtime, prices)
+            return prices
         except Exception as e:
             logger.warning(f"⚠️ Errore caricamento prezzi: {e}")
         return {}
     
+    @_single_flight
     def get_portfolio_summary(self):
         """Ottiene summary del portfolio"""
         portfolio = self.load_portfolio()
@@ -117,35 +307,50 @@ class TradingDashboard:
             'last_update': datetime.now().isoformat()
         }
     
+    @_single_flight
     def get_positions_data(self):
         """Ottiene dati posizioni"""
         portfolio = self.load_portfolio()
         prices = self.load_price_cache()
         
-        positions = []
-        for ticker, position in portfolio.positions.items():
-            current_price = prices.get(ticker, {}).get('price', position['avg_price'])
-            shares = position['shares']
-            avg_price = position['avg_price']
-            
-            current_value = shares * current_price
-            cost_basis = shares * avg_price
-            pnl = current_value - cost_basis
-            pnl_pct = (pnl / cost_basis) * 100 if cost_basis > 0 else 0
-            
-            positions.append({
-                'ticker': ticker,
-                'shares': shares,
-                'avg_price': avg_price,
-                'current_price': current_price,
-                'current_value': current_value,
-                'cost_basis': cost_basis,
-                'pnl': pnl,
-                'pnl_pct': pnl_pct,
-                'daily_change': prices.get(ticker, {}).get('daily_change_pct', 0)
-            })
+        positions = portfolio.positions
+        if not positions:
+            return []
+        
+        # Struct-of-arrays: un array per campo, calcoli vettoriali su tutte le posizioni
+        n = len(positions)
+        tickers = list(positions)
+        quotes = [prices.get(ticker, {}) for ticker in tickers]
+        shares = np.fromiter((p['shares'] for p in positions.values()), dtype=np.float64, count=n)
+        avg_price = np.fromiter((p['avg_price'] for p in positions.values()), dtype=np.float64, count=n)
+        current_price = np.fromiter(
+            (q.get('price', p['avg_price']) for q, p in zip(quotes, positions.values())),
+            dtype=np.float64, count=n
+        )
         
-        return sorted(positions, key=lambda x: abs(x['pnl']), reverse=True)
+        current_value = shares * current_price
+        cost_basis = shares * avg_price
+        pnl = current_value - cost_basis
+        pnl_pct = np.divide(pnl, cost_basis, out=np.zeros(n), where=cost_basis > 0) * 100
+        
+        # Ordine per |P&L| decrescente; i dict vengono creati solo alla fine
+        order = np.argsort(-np.abs(pnl), kind='stable').tolist()
+        columns = [arr.tolist() for arr in (avg_price, current_price, current_value, cost_basis, pnl, pnl_pct)]
+        
+        return [
+            {
+                'ticker': tickers[i],
+                'shares': positions[tickers[i]]['shares'],
+                'avg_price': columns[0][i],
+                'current_price': columns[1][i],
+                'current_value': columns[2][i],
+                'cost_basis': columns[3][i],
+                'pnl': columns[4][i],
+                'pnl_pct': columns[5][i],
+                'daily_change': quotes[i].get('daily_change_pct', 0)
+            }
+            for i in order
+        ]
     
     def get_transactions_data(self, limit: int = 50):
         """Ottiene dati transazioni"""
@@ -165,8 +370,14 @@ class TradingDashboard:
         
         return list(reversed(transactions))
     
+    @_single_flight
     def get_performance_chart_data(self):
         """Genera dati per grafico performance"""
+        key = (self._portfolio_mtime(), datetime.now().date())
+        cached = self._performance_cache
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        
         portfolio = self.load_portfolio()
         
         # Calcola valore portfolio nel tempo
@@ -175,41 +386,7 @@ class TradingDashboard:
         
         # Se abbiamo transazioni, calcola performance storica
         if portfolio.transactions:
-            # Raggruppa per giorno
-            daily_values = {}
-            running_cash = 10000  # Capitale iniziale
-            positions = {}
-            
-            for tx in portfolio.transactions:
-                date = tx.get('timestamp', datetime.now().isoformat())[:10]
-                
-                if tx['type'] == 'BUY':
-                    running_cash -= tx['total']
-                    if tx['ticker'] not in positions:
-                        positions[tx['ticker']] = {'shares': 0, 'avg_price': 0}
-                    
-                    old_shares = positions[tx['ticker']]['shares']
-                    old_value = old_shares * positions[tx['ticker']]['avg_price']
-                    new_value = tx['shares'] * tx['price']
-                    total_shares = old_shares + tx['shares']
-                    
-                    if total_shares > 0:
-                        positions[tx['ticker']]['avg_price'] = (old_value + new_value) / total_shares
-                    positions[tx['ticker']]['shares'] = total_shares
-                
-                elif tx['type'] == 'SELL':
-                    running_cash += tx['total']
-                    if tx['ticker'] in positions:
-                        positions[tx['ticker']]['shares'] -= tx['shares']
-                        if positions[tx['ticker']]['shares'] <= 0:
-                            del positions[tx['ticker']]
-                
-                # Calcola valore totale (semplificato)
-                portfolio_value = running_cash
-                for ticker, pos in positions.items():
-                    portfolio_value += pos['shares'] * pos['avg_price']
-                
-                daily_values[date] = portfolio_value
+            daily_values = self._replay_transactions(portfolio.transactions, key[0])
             
             # Converti in liste per grafico
             dates = sorted(daily_values.keys())
@@ -217,158 +394,307 @@ class TradingDashboard:
         
         # Se non abbiamo abbastanza dati, genera dati di esempio
         if len(dates) < 2:
-            start_date = datetime.now() - timedelta(days=30)
-            for i in range(30):
-                date = (start_date + timedelta(days=i)).strftime('%Y-%m-%d')
-                value = 10000 + (i * 50) + (i % 7 * 25)  # Trend crescente con oscillazioni
-                dates.append(date)
-                values.append(value)
+            # Ultimi 30 giorni (oggi escluso), costruiti in blocco
+            example_dates = pd.date_range(end=pd.Timestamp.now().normalize() - pd.Timedelta(days=1),
+                                          periods=30, freq='D')
+            i = np.arange(30)
+            example_values = 10000 + (i * 50) + (i % 7 * 25)  # Trend crescente con oscillazioni
+            dates += example_dates.strftime('%Y-%m-%d').tolist()
+            values += example_values.tolist()
         
-        return {
+        result = {
             'dates': dates,
             'values': values,
             'initial_value': values[0] if values else 10000,
             'current_value': values[-1] if values else 10000
         }
+        self._performance_cache = (key, result)
+        return result
     
+    def _new_perf_state(self, mtime: Optional[int]) -> Dict:
+        """Stato di replay vuoto: capitale iniziale, nessuna posizione"""
+        return {
+            'mtime': mtime,
+            'idx': 0,
+            'last_tx': None,
+            'cash': 10000,  # Capitale iniziale
+            'positions': {},
+            # Valore (semplificato, a prezzo medio) di tutte le posizioni
+            'positions_value': 0.0,
+            'daily': {}  # Raggruppa per giorno
+        }
+    
+    def _replay_transactions(self, transactions: List[Dict], mtime: Optional[int]) -> Dict:
+        """Valori giornalieri del portfolio, rigiocando solo le transazioni nuove.
+        
+        Le transazioni sono in append: si riparte da zero solo se la lista si
+        accorcia, se il file torna indietro nel tempo o se l'ultima transazione
+        già vista non coincide più.
+        """
+        state = self._perf_state
+        idx = state['idx'] if state is not None else 0
+        if (state is None
+                or len(transactions) < idx
+                or (mtime is not None and state['mtime'] is not None and mtime < state['mtime'])
+                or (idx and transactions[idx - 1] != state['last_tx'])):
+            state = self._new_perf_state(mtime)
+        
+        positions = state['positions']
+        daily_values = state['daily']
+        running_cash = state['cash']
+        positions_value = state['positions_value']
+        
+        # Ogni transazione aggiorna solo il contributo del proprio ticker
+        for tx in transactions[state['idx']:]:
+            date = tx.get('timestamp', datetime.now().isoformat())[:10]
+            
+            if tx['type'] == 'BUY':
+                running_cash -= tx['total']
+                if tx['ticker'] not in positions:
+                    positions[tx['ticker']] = {'shares': 0, 'avg_price': 0}
+                
+                old_shares = positions[tx['ticker']]['shares']
+                old_value = old_shares * positions[tx['ticker']]['avg_price']
+                new_value = tx['shares'] * tx['price']
+                total_shares = old_shares + tx['shares']
+                
+                if total_shares > 0:
+                    positions[tx['ticker']]['avg_price'] = (old_value + new_value) / total_shares
+                positions[tx['ticker']]['shares'] = total_shares
+                positions_value += total_shares * positions[tx['ticker']]['avg_price'] - old_value
+            
+            elif tx['type'] == 'SELL':
+                running_cash += tx['total']
+                if tx['ticker'] in positions:
+                    pos = positions[tx['ticker']]
+                    positions_value -= pos['shares'] * pos['avg_price']
+                    pos['shares'] -= tx['shares']
+                    if pos['shares'] <= 0:
+                        del positions[tx['ticker']]
+                    else:
+                        positions_value += pos['shares'] * pos['avg_price']
+            
+            daily_values[date] = running_cash + positions_value
+        
+        state['cash'] = running_cash
+        state['positions_value'] = positions_value
+        state['idx'] = len(transactions)
+        state['last_tx'] = transactions[-1] if transactions else None
+        state['mtime'] = mtime
+        self._perf_state = state
+        return daily_values
+    
+    @_single_flight
     def get_sector_allocation(self):
         """Calcola allocazione per settore"""
         portfolio = self.load_portfolio()
         prices = self.load_price_cache()
         
-        # Mapping settori semplificato (in un sistema reale verrebbe da database)
-        sector_mapping = {
-            'AAPL': 'Technology',
-            'GOOGL': 'Technology', 
-            'MSFT': 'Technology',
-            'TSLA': 'Automotive',
-            'NVDA': 'Technology',
-            'AMD': 'Technology',
-            'META': 'Technology',
-            'NFLX': 'Entertainment',
-            'AMZN': 'E-commerce',
-            'JPM': 'Finance',
-            'BAC': 'Finance',
-            'GS': 'Finance'
-        }
+        positions = portfolio.positions
+        if not positions:
+            return []
         
-        sectors = {}
-        total_value = 0
+        # Una colonna per campo invece di un dict per posizione
+        n = len(positions)
+        tickers = list(positions)
+        shares = np.fromiter((p['shares'] for p in positions.values()), dtype=np.float64, count=n)
+        current_price = np.fromiter(
+            (prices.get(t, {}).get('price', p['avg_price']) for t, p in positions.items()),
+            dtype=np.float64, count=n
+        )
         
-        for ticker, position in portfolio.positions.items():
-            current_price = prices.get(ticker, {}).get('price', position['avg_price'])
-            value = position['shares'] * current_price
-            sector = sector_mapping.get(ticker, 'Other')
-            
-            if sector not in sectors:
-                sectors[sector] = 0
-            sectors[sector] += value
-            total_value += value
+        frame = pd.DataFrame({
+            'sector': [SECTOR_MAPPING.get(t, 'Other') for t in tickers],
+            'value': shares * current_price
+        })
+        sectors = frame.groupby('sector', sort=False)['value'].sum().sort_values(ascending=False, kind='stable')
         
         # Converti in percentuali
-        sector_data = []
-        for sector, value in sectors.items():
-            percentage = (value / total_value * 100) if total_value > 0 else 0
-            sector_data.append({
-                'sector': sector,
-                'value': value,
-                'percentage': percentage
-            })
+        total_value = sectors.sum()
+        percentage = sectors / total_value * 100 if total_value > 0 else sectors * 0.0
         
-        return sorted(sector_data, key=lambda x: x['value'], reverse=True)
+        return [
+            {'sector': sector, 'value': value, 'percentage': pct}
+            for sector, value, pct in zip(sectors.index, sectors.tolist(), percentage.tolist())
+        ]
     
     def get_recent_logs(self, lines: int = 100):
-        """Ottiene log recenti"""
+        """Ottiene log recenti (legge solo la coda del file)"""
         try:
             if self.log_file.exists():
-                with open(self.log_file, 'r') as f:
-                    all_lines = f.readlines()
-                    recent_lines = all_lines[-lines:] if len(all_lines) > lines else all_lines
-                    return [line.strip() for line in recent_lines]
+                return [line.strip() for line in tail_lines(self.log_file, lines)]
         except Exception as e:
             logger.warning(f"⚠️ Errore lettura log: {e}")
         
         return ["Log non disponibili"]
     
     def get_system_status(self):
-        """Ottiene stato sistema"""
+        """Ottiene stato sistema (metriche dall'ultimo campionamento del refresh)"""
+        status = self.cache.get('system')
+        # Con il refresh rallentato il campione può essere vecchio: si rinnova
+        max_age = self.refresh_interval if self.running and self.refresh_interval else 0
+        if status is None or time.monotonic() - self._system_time >= max_age:
+            status = self._sample_system_status()
+            self.cache['system'] = status
+            self._system_time = time.monotonic()
+        
+        # Lo stato del trader cambia via API: è un solo stat, resta sempre aggiornato
+        return {**status, 'trader_active': not Path("data/trader_control.txt").exists()}
+    
+    def _sample_system_status(self) -> Dict:
+        """Campiona le metriche di sistema (chiamato dal loop di refresh)"""
         try:
             import psutil
             
-            # Check trader status
-            control_file = Path("data/trader_control.txt")
-            trader_active = not control_file.exists()
-            
-            # System metrics
-            cpu_percent = psutil.cpu_percent()
-            memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
-            
+            # interval=None: variazione dall'ultima chiamata, senza attese
             return {
-                'trader_active': trader_active,
-                'cpu_usage': cpu_percent,
-                'memory_usage': memory.percent,
-                'disk_usage': disk.percent,
+                'cpu_usage': psutil.cpu_percent(interval=None),
+                'memory_usage': psutil.virtual_memory().percent,
+                'disk_usage': psutil.disk_usage('/').percent,
                 'timestamp': datetime.now().isoformat()
             }
         except ImportError:
             # Fallback se psutil non disponibile
-            control_file = Path("data/trader_control.txt")
-            trader_active = not control_file.exists()
-            
             return {
-                'trader_active': trader_active,
                 'cpu_usage': 0,
                 'memory_usage': 0,
                 'disk_usage': 0,
                 'timestamp': datetime.now().isoformat()
             }
     
-    def start_auto_refresh(self, interval: int = 30):
-        """Avvia refresh automatico dati"""
-        if self.refresh_thread and self.refresh_thread.is_alive():
+    def start_auto_refresh(self, interval: int = 30, socketio=None):
+        """Avvia refresh automatico dati
+        
+        Con `socketio` il loop gira come background task del suo async mode
+        (green thread sotto eventlet) invece che in un thread dedicato.
+        """
+        if self.running and self.refresh_thread is not None:
             return
         
         self.running = True
-        self.refresh_thread = threading.Thread(target=self._refresh_loop, args=(interval,))
-        self.refresh_thread.daemon = True
-        self.refresh_thread.start()
+        self._stop_event.clear()
+        self.refresh_interval = interval
+        self.socketio = socketio
+        if socketio is not None:
+            self.refresh_thread = socketio.start_background_task(self._refresh_loop, interval)
+        else:
+            self.refresh_thread = threading.Thread(target=self._refresh_loop, args=(interval,))
+            self.refresh_thread.daemon = True
+            self.refresh_thread.start()
         
         logger.info(f"🔄 Auto-refresh avviato ({interval}s)")
     
     def stop_auto_refresh(self):
         """Ferma refresh automatico"""
         self.running = False
-        if self.refresh_thread:
+        self._stop_event.set()
+        # I green thread non hanno join con timeout: escono al prossimo giro
+        if isinstance(self.refresh_thread, threading.Thread):
             self.refresh_thread.join(timeout=5)
+        self.refresh_thread = None
         logger.info("🛑 Auto-refresh fermato")
     
+    def _sources_signature(self):
+        """mtime dei file da cui dipendono i dati (e giorno corrente, per il grafico)"""
+        try:
+            price_mtime = self.price_file.stat().st_mtime_ns
+        except OSError:
+            price_mtime = None
+        return (self._portfolio_mtime(), price_mtime, datetime.now().date())
+    
+    def get_cached(self, key: str, compute):
+        """Voce della cache del refresh se i file sorgente non sono cambiati, altrimenti compute()"""
+        value = self.cache.get(key)
+        if (value is not None and self.running and self._cache_signature is not None
+                and self._sources_signature() == self._cache_signature):
+            return value
+        return compute()
+    
+    def _broadcast_changes(self):
+        """Invia in broadcast solo i payload cambiati dall'ultimo tick"""
+        for event, key in self.BROADCAST_EVENTS:
+            payload = self.cache.get(key)
+            if payload is None:
+                continue
+            
+            signature = payload
+            if isinstance(payload, dict):
+                signature = {k: v for k, v in payload.items() if k not in self.VOLATILE_FIELDS}
+            if self._last_broadcast.get(event) == signature:
+                continue
+            
+            self._last_broadcast[event] = signature
+            self.socketio.emit(event, payload)
+    
     def _refresh_loop(self, interval: int):
         """Loop di refresh dati"""
+        # Con i thread l'attesa è sull'evento di stop, così lo stop non aspetta
+        # la fine dell'intervallo; i green thread usano lo sleep di SocketIO
+        if self.socketio is not None and self.socketio.async_mode != 'threading':
+            sleep = self.socketio.sleep
+        else:
+            sleep = self._stop_event.wait
+        wait = interval
+        self._cache_signature = None
         while self.running:
             try:
-                # Aggiorna cache
-                self.cache['portfolio'] = self.get_portfolio_summary()
-                self.cache['prices'] = self.load_price_cache()
-                self.cache['performance'] = self.get_performance_chart_data()
+                # Si ricalcola solo quando portfolio o prezzi cambiano su disco
+                signature = self._sources_signature()
+                if signature != self._cache_signature:
+                    self.cache['portfolio'] = self.get_portfolio_summary()
+                    self.cache['positions'] = self.get_positions_data()
+                    self.cache['prices'] = self.load_price_cache()
+                    self.cache['performance'] = self.get_performance_chart_data()
+                    self._cache_signature = signature
+                    wait = interval
+                else:
+                    wait = min(wait * 2, interval * self.IDLE_BACKOFF_MAX)
+                
+                self.cache['system'] = self._sample_system_status()
+                self._system_time = time.monotonic()
                 self.cache['last_update'] = datetime.now().isoformat()
                 
+                # Un solo calcolo per tick, consegnato a tutti i client
+                if self.socketio is not None:
+                    self._broadcast_changes()
+                
             except Exception as e:
                 logger.error(f"❌ Errore refresh: {e}")
             
-            time.sleep(interval)
+            sleep(wait)
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Provider JSON di Flask basato su orjson (serializza anche array NumPy)"""
+    
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        # I tipi non nativi (Decimal, dataclass, ...) passano dal default di Flask
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 def create_app(config):
     """Crea app Flask con configurazione"""
     app = Flask(__name__, template_folder='../templates')
     app.config['SECRET_KEY'] = 'stock-ai-dashboard-secret-key'
     
+    # jsonify via orjson quando disponibile
+    if ORJSON_AVAILABLE:
+        app.json_provider_class = ORJSONProvider
+        app.json = ORJSONProvider(app)
+    
     # CORS per API
     CORS(app)
     
-    # SocketIO per real-time
+    # SocketIO per real-time (importato qui: le utility CLI non lo caricano)
     try:
-        socketio = SocketIO(app, cors_allowed_origins="*")
+        from flask_socketio import SocketIO, emit
+        socketio = SocketIO(app, cors_allowed_origins="*", async_mode=SOCKETIO_ASYNC_MODE)
     except ImportError:
         logger.warning("⚠️ SocketIO non disponibile, modalità basic")
         socketio = None
@@ -385,7 +711,7 @@ def create_app(config):
     def api_portfolio_summary():
         """API: Summary portfolio"""
         try:
-            return jsonify(dashboard.get_portfolio_summary())
+            return jsonify(dashboard.get_cached('portfolio', dashboard.get_portfolio_summary))
         except Exception as e:
             logger.error(f"❌ Errore API portfolio summary: {e}")
             return jsonify({'error': str(e)}), 500
@@ -394,7 +720,7 @@ def create_app(config):
     def api_positions():
         """API: Posizioni portfolio"""
         try:
-            return jsonify(dashboard.get_positions_data())
+            return jsonify(dashboard.get_cached('positions', dashboard.get_positions_data))
         except Exception as e:
             logger.error(f"❌ Errore API positions: {e}")
             return jsonify({'error': str(e)}), 500
@@ -413,7 +739,7 @@ def create_app(config):
     def api_performance_chart():
         """API: Dati grafico performance"""
         try:
-            return jsonify(dashboard.get_performance_chart_data())
+            return jsonify(dashboard.get_cached('performance', dashboard.get_performance_chart_data))
         except Exception as e:
             logger.error(f"❌ Errore API performance chart: {e}")
             return jsonify({'error': str(e)}), 500
@@ -486,9 +812,10 @@ def create_app(config):
         def handle_update_request():
             """WebSocket: Richiesta aggiornamento"""
             try:
-                # Invia dati aggiornati
-                emit('portfolio_update', dashboard.get_portfolio_summary())
-                emit('positions_update', dashboard.get_positions_data())
+                # Snapshot dell'ultimo tick, solo al client che lo chiede;
+                # si ricalcola solo se il refresh non è aggiornato
+                emit('portfolio_update', dashboard.get_cached('portfolio', dashboard.get_portfolio_summary))
+                emit('positions_update', dashboard.get_cached('positions', dashboard.get_positions_data))
                 emit('system_update', dashboard.get_system_status())
             except Exception as e:
                 logger.error(f"❌ Errore WebSocket update: {e}")
@@ -496,12 +823,10 @@ def create_app(config):
     
     # Avvia auto-refresh
     auto_refresh_interval = config.get('dashboard', {}).get('auto_refresh', 30)
-    dashboard.start_auto_refresh(auto_refresh_interval)
+    dashboard.start_auto_refresh(auto_refresh_interval, socketio=socketio)
     
-    # Cleanup on shutdown
-    @app.teardown_appcontext
-    def cleanup(error):
-        dashboard.stop_auto_refresh()
+    # Cleanup on shutdown: alla chiusura del processo, non a fine richiesta
+    atexit.register(dashboard.stop_auto_refresh)
     
     app.dashboard = dashboard  # Per accesso esterno
     if socketio:
@@ -528,8 +853,17 @@ if __name__ == "__main__":
     print("🌐 Avvio Dashboard Test...")
     print("🔗 URL: http://localhost:5000")
     
-    app.run(
-        host=test_config['dashboard']['host'],
-        port=test_config['dashboard']['port'],
-        debug=test_config['dashboard']['debug']
-    )
+    if hasattr(app, 'socketio'):
+        # Server SocketIO (eventlet se installato) al posto del dev server di Flask
+        app.socketio.run(
+            app,
+            host=test_config['dashboard']['host'],
+            port=test_config['dashboard']['port'],
+            debug=test_config['dashboard']['debug']
+        )
+    else:
+        app.run(
+            host=test_config['dashboard']['host'],
+            port=test_config['dashboard']['port'],
+            debug=test_config['dashboard']['debug']
+        )
@@ -8,10 +8,9 @@ import numpy as np
 import pandas as pd
 import logging
 import json
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
-import matplotlib.pyplot as plt
-import seaborn as sns
 from typing import Dict, List, Tuple, Optional
 import warnings
 
@@ -23,6 +22,7 @@ try:
     from stable_baselines3.common.monitor import Monitor
     from stable_baselines3.common.noise import NormalActionNoise
     import optuna
+    import torch
     ADVANCED_RL_AVAILABLE = True
 except ImportError:
     ADVANCED_RL_AVAILABLE = False
@@ -35,6 +35,22 @@ import pickle
 warnings.filterwarnings('ignore')
 logger = logging.getLogger(__name__)
 
+@contextmanager
+def _policy_inference():
+    """
+    Contesto per valutare una policy passo per passo
+    
+    Niente autograd (inference_mode) e un solo thread torch: per le piccole MLP
+    di MlpPolicy il parallelismo intra-op costa più di quanto faccia risparmiare.
+    """
+    threads = torch.get_num_threads()
+    torch.set_num_threads(1)
+    try:
+        with torch.inference_mode():
+            yield
+    finally:
+        torch.set_num_threads(threads)
+
 class TensorBoardCallback(BaseCallback):
     """Callback per logging avanzato durante il training"""
     
@@ -172,12 +188,13 @@ class AdvancedRLTrainer:
                 # Valuta performance
                 obs = env.reset()
                 total_reward = 0
-                for _ in range(100):
-                    action, _ = model.predict(obs, deterministic=True)
-                    obs, reward, done, _ = env.step(action)
-                    total_reward += reward
-                    if done:
-                        obs = env.reset()
+                with _policy_inference():
+                    for _ in range(100):
+                        action, _ = model.predict(obs, deterministic=True)
+                        obs, reward, done, _ = env.step(action)
+                        total_reward += reward
+                        if done:
+                            obs = env.reset()
                 
                 return total_reward
                 
@@ -288,22 +305,23 @@ class AdvancedRLTrainer:
         episode_rewards = []
         episode_lengths = []
         
-        for episode in range(n_episodes):
-            obs = env.reset()
-            episode_reward = 0
-            episode_length = 0
-            
-            while True:
-                action, _ = model.predict(obs, deterministic=True)
-                obs, reward, done, _ = env.step(action)
-                episode_reward += reward
-                episode_length += 1
+        with _policy_inference():
+            for episode in range(n_episodes):
+                obs = env.reset()
+                episode_reward = 0
+                episode_length = 0
                 
-                if done:
-                    break
-            
-            episode_rewards.append(episode_reward)
-            episode_lengths.append(episode_length)
+                while True:
+                    action, _ = model.predict(obs, deterministic=True)
+                    obs, reward, done, _ = env.step(action)
+                    episode_reward += reward
+                    episode_length += 1
+                    
+                    if done:
+                        break
+                
+                episode_rewards.append(episode_reward)
+                episode_lengths.append(episode_length)
         
         return {
             'mean_reward': np.mean(episode_rewards),
@@ -464,6 +482,9 @@ class AdvancedRLTrainer:
             if not performance:
                 return
             
+            # pyplot solo quando servono i grafici (il training non ne ha bisogno)
+            import matplotlib.pyplot as plt
+            
             # Performance comparison
             plt.figure(figsize=(12, 8))
             
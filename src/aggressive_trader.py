@@ -147,7 +147,7 @@ class AggressiveTrader:
                 start_time = time.time()
                 
                 # Ottieni prezzi
-                current_prices = self.price_collector.get_current_prices()
+                current_prices = await self.price_collector.get_current_prices()
                 
                 if current_prices:
                     self.memory.update_prices(current_prices)
@@ -201,7 +201,7 @@ class AggressiveTrader:
                     else:
                         logger.info(f"🔥 Portfolio: €{portfolio_value:.2f} ({profit_pct:+.2f}%) | Trades: {self.trading_logic.trade_count}")
                     
-                    previous_prices = current_prices.copy()
+                    previous_prices = current_prices  # get_current_prices restituisce sempre un dict nuovo
                 
                 elapsed = time.time() - start_time
                 logger.debug(f"⏱️ Aggressive Price AI ciclo: {elapsed:.2f}s")
@@ -222,7 +222,7 @@ class AggressiveTrader:
                 start_time = time.time()
                 
                 # Raccoglie news
-                articles = self.news_collector.collect_news()
+                articles = await self.news_collector.collect_news()
                 logger.info(f"📡 Raccolti {len(articles)} articoli")
                 
                 # Analizza sentiment
@@ -59,8 +59,9 @@ class AIKnowledgeBase:
         timestamp = datetime.now()
         
         # Analizza pattern del simbolo
-        if symbol not in self.symbol_behaviors:
-            self.symbol_behaviors[symbol] = {
+        behavior = self.symbol_behaviors.get(symbol)
+        if behavior is None:
+            behavior = self.symbol_behaviors[symbol] = {
                 'price_history': [],
                 'volatility_history': [],
                 'news_correlation': [],
@@ -79,7 +80,7 @@ class AIKnowledgeBase:
             volatility = np.std(price_data[-10:]) if len(price_data) >= 10 else 0
             
             # Salva osservazioni
-            self.symbol_behaviors[symbol]['price_history'].append({
+            behavior['price_history'].append({
                 'timestamp': timestamp,
                 'price': current_price,
                 'change_pct': change_pct,
@@ -90,7 +91,7 @@ class AIKnowledgeBase:
             # Analizza correlazione news-prezzo
             if abs(news_sentiment) > 0.1:  # Solo news significative
                 price_reaction = change_pct
-                self.symbol_behaviors[symbol]['news_correlation'].append({
+                behavior['news_correlation'].append({
                     'news_sentiment': news_sentiment,
                     'price_reaction': price_reaction,
                     'timestamp': timestamp
@@ -224,7 +225,7 @@ class AIKnowledgeBase:
                     'total_observations': self.total_observations,
                     'accuracy_metrics': self.accuracy_metrics,
                     'save_timestamp': datetime.now()
-                }, f)
+                }, f, protocol=pickle.HIGHEST_PROTOCOL)
             
             logger.info(f"💾 Knowledge base salvata: {filepath}")
             return str(filepath)
@@ -375,7 +376,7 @@ class AIBackgroundTrainer:
             news_sentiment = 0.0
             if self.news_collector:
                 try:
-                    articles = self.news_collector.collect_news()
+                    articles = await self.news_collector.collect_news()
                     if articles:
                         news_sentiment = self.news_collector.analyze_sentiment(articles)
                 except Exception as e:
@@ -11,8 +11,6 @@ from datetime import datetime, timedelta
 from pathlib import Path
 import json
 from typing import Dict, List, Optional, Tuple
-import matplotlib.pyplot as plt
-import seaborn as sns
 from data_collector import DataCollector
 from portfolio import Portfolio
 from strategy_engine import should_buy, should_sell
@@ -396,6 +394,9 @@ class BacktestEngine:
         charts = {}
         
         try:
+            # Import alla prima richiesta: chi non genera grafici non paga matplotlib
+            import matplotlib.pyplot as plt
+            
             # Performance Chart
             daily_perf = pd.DataFrame(report['daily_performance'])
             daily_perf['date'] = pd.to_datetime(daily_perf['date'])
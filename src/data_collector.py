@@ -7,17 +7,39 @@ Usa le nuove API v8 di Yahoo Finance
 
 import yfinance as yf
 import pandas as pd
+from pandas.tseries.holiday import (
+    AbstractHolidayCalendar, GoodFriday, Holiday, USLaborDay,
+    USMartinLutherKingJr, USMemorialDay, USPresidentsDay,
+    USThanksgivingDay, nearest_workday, sunday_to_monday
+)
 import numpy as np
 import logging
 import os
 import json
 import time
-from datetime import datetime, timedelta
+import threading
+from datetime import datetime, timedelta, time as dt_time
 from pathlib import Path
 import pickle
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Dict, List, Optional, Union
 import warnings
+from functools import lru_cache
+
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    orjson = None
+    json_loads = json.loads
+
+try:
+    from zoneinfo import ZoneInfo
+    NYSE_TZ = ZoneInfo('America/New_York')
+except Exception:
+    NYSE_TZ = None  # senza tzdata: ora locale
 
 # Ignora warning di pandas
 warnings.filterwarnings('ignore', category=pd.errors.PerformanceWarning)
@@ -27,14 +49,74 @@ from yahoo_api_v8 import yahoo_v8
 
 logger = logging.getLogger(__name__)
 
+US_MARKET_OPEN = dt_time(9, 30)
+US_MARKET_CLOSE = dt_time(16, 0)
+
+class NYSECalendar(AbstractHolidayCalendar):
+    """Festività NYSE con le regole di osservanza della borsa"""
+    rules = [
+        # Capodanno di sabato non viene recuperato il venerdì precedente
+        Holiday('NewYearsDay', month=1, day=1, observance=sunday_to_monday),
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday('Juneteenth', month=6, day=19, start_date='2022-01-01',
+                observance=nearest_workday),
+        Holiday('IndependenceDay', month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday('Christmas', month=12, day=25, observance=nearest_workday),
+    ]
+
+_NYSE_CALENDAR = NYSECalendar()
+
+@lru_cache(maxsize=8)
+def _nyse_holidays(year: int) -> frozenset:
+    """Giorni di chiusura NYSE dell'anno, calcolati una volta per anno"""
+    days = _NYSE_CALENDAR.holidays(start=f'{year}-01-01', end=f'{year}-12-31')
+    return frozenset(days.date)
+
+def _us_trading_day(day) -> bool:
+    """Giorno di contrattazione NYSE (lun-ven, festività escluse)"""
+    return day.weekday() < 5 and day not in _nyse_holidays(day.year)
+
+def _seconds_until_us_open(now: Optional[datetime] = None) -> float:
+    """
+    Secondi alla prossima apertura della borsa USA (0 se il mercato è aperto)
+    
+    Args:
+        now (datetime): Istante di riferimento (default: ora corrente a New York)
+    """
+    if now is None:
+        now = datetime.now(NYSE_TZ) if NYSE_TZ is not None else datetime.now()
+    day = now.date()
+    if _us_trading_day(day) and US_MARKET_OPEN <= now.time() <= US_MARKET_CLOSE:
+        return 0.0
+    if not (_us_trading_day(day) and now.time() < US_MARKET_OPEN):
+        day += timedelta(days=1)
+        while not _us_trading_day(day):
+            day += timedelta(days=1)
+    next_open = datetime.combine(day, US_MARKET_OPEN, tzinfo=now.tzinfo)
+    # timestamp() tiene conto del cambio d'ora tra oggi e l'apertura
+    return next_open.timestamp() - now.timestamp()
+
+def _write_json(path: Path, data) -> None:
+    """Scrive data come JSON indentato (orjson se disponibile, anche per tipi NumPy)"""
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+
 class DataCollector:
     """Raccoglitore di dati finanziari con cache e gestione errori avanzata"""
     
     def __init__(self, config=None, config_path=None):
         # Carica config se necessario
         if config is None and config_path is not None:
-            with open(config_path, 'r') as f:
-                self.config = json.load(f)
+            self.config = json_loads(Path(config_path).read_bytes())
         elif config is not None:
             self.config = config
         else:
@@ -52,25 +134,43 @@ class DataCollector:
         # Rate limiting più aggressivo per evitare 429 errors
         self.last_request_time = 0
         self.min_request_interval = 1.0  # 1 secondo tra richieste
+        self._rate_lock = threading.Lock()
+        
+        # Sessione HTTP condivisa: connessioni keep-alive riusate tra simboli e tick
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive'
+        })
+        self.session.mount('https://', HTTPAdapter(
+            pool_connections=8, pool_maxsize=16,
+            max_retries=Retry(total=2, backoff_factor=0.2)
+        ))
         
         # Cache settings
         self.cache_enabled = self.config['data'].get('cache_enabled', True)
         self.cache_duration = 300  # 5 minuti
         
+        # Prezzi correnti per insieme di simboli: (scadenza monotonic, prezzi)
+        self._price_memo = {}
+        self.price_ttl = 30            # secondi, a mercato aperto
+        self.closed_price_ttl = 3600   # a mercato chiuso, al massimo fino alla riapertura
+        
         logger.info(f"🔧 DataCollector inizializzato per {len(self.symbols)} simboli")
         logger.info(f"📦 Cache: {'abilitata' if self.cache_enabled else 'disabilitata'}")
         logger.info(f"⏱️ Rate limiting: {self.min_request_interval}s tra richieste")
         
     def _wait_for_rate_limit(self):
-        """Gestione rate limiting per evitare ban API"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        
-        if time_since_last < self.min_request_interval:
-            sleep_time = self.min_request_interval - time_since_last
+        """Gestione rate limiting per evitare ban API (thread-safe)"""
+        with self._rate_lock:
+            current_time = time.time()
+            slot = max(current_time, self.last_request_time + self.min_request_interval)
+            self.last_request_time = slot
+        
+        sleep_time = slot - current_time
+        if sleep_time > 0:
             time.sleep(sleep_time)
-        
-        self.last_request_time = time.time()
     
     def _get_cache_filename(self, symbol: str, period: str, interval: str = "1d") -> Path:
         """Genera nome file cache"""
@@ -96,7 +196,7 @@ class DataCollector:
                     'data': data,
                     'timestamp': datetime.now(),
                     'version': '1.0'
-                }, f)
+                }, f, protocol=pickle.HIGHEST_PROTOCOL)
             logger.debug(f"💾 Cache salvata: {cache_file.name}")
         except Exception as e:
             logger.warning(f"⚠️ Errore salvataggio cache {cache_file}: {e}")
@@ -175,12 +275,7 @@ class DataCollector:
                 if attempt > 0:
                     time.sleep(2 ** attempt)  # Exponential backoff
                 
-                # Crea sessione custom per evitare rate limiting
-                import requests
-                session = requests.Session()
-                session.headers.update({
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                })
+                session = self.session
                 
                 ticker = yf.Ticker(symbol, session=session)
                 
@@ -342,11 +437,24 @@ class DataCollector:
         if symbols is None:
             symbols = self.symbols
         
-        prices = {}
+        # Stessi simboli entro il TTL: nessuna nuova richiesta
+        key = tuple(sorted(symbols))
+        memo = self._price_memo.get(key)
+        if memo is not None and memo[0] > time.monotonic():
+            return dict(memo[1])
         
         logger.debug(f"💰 Recupero prezzi correnti per {len(symbols)} simboli...")
         
+        # Prima tutti i simboli con una sola richiesta batch
+        prices = {}
+        timestamp = datetime.now().isoformat()
+        for symbol, quote in yahoo_v8.get_quotes(symbols).items():
+            prices[symbol] = {**quote, 'timestamp': timestamp, 'source': 'yahoo_spark'}
+        
+        # Fallback yfinance, simbolo per simbolo, solo per quelli mancanti
         for symbol in symbols:
+            if symbol in prices:
+                continue
             try:
                 # Prova prima con dati intraday
                 ticker = yf.Ticker(symbol)
@@ -384,6 +492,14 @@ class DataCollector:
             time.sleep(0.1)
         
         logger.info(f"💰 Prezzi ottenuti per {len(prices)}/{len(symbols)} simboli")
+        
+        # Solo risultati completi: i simboli mancanti vanno ritentati al giro dopo
+        if all(symbol in prices for symbol in symbols):
+            now = time.monotonic()
+            self._price_memo = {k: v for k, v in self._price_memo.items() if v[0] > now}
+            until_open = _seconds_until_us_open()
+            ttl = self.price_ttl if until_open == 0 else min(self.closed_price_ttl, until_open)
+            self._price_memo[key] = (now + ttl, dict(prices))
         return prices
     
     def get_market_data(self, symbol: str) -> Dict:
@@ -466,8 +582,7 @@ class DataCollector:
             
             # Salva cache prezzi
             price_cache_file = self.data_dir / "price_cache.json"
-            with open(price_cache_file, 'w') as f:
-                json.dump(current_prices, f, indent=2)
+            _write_json(price_cache_file, current_prices)
             
             # Aggiorna dati di mercato completi
             market_data = {}
@@ -476,8 +591,7 @@ class DataCollector:
             
             # Salva dati mercato
             market_file = self.data_dir / "market_data.json"
-            with open(market_file, 'w') as f:
-                json.dump(market_data, f, indent=2)
+            _write_json(market_file, market_data)
             
             # Statistiche aggiornamento
             summary = {
@@ -489,8 +603,7 @@ class DataCollector:
             }
             
             summary_file = self.data_dir / "update_summary.json"
-            with open(summary_file, 'w') as f:
-                json.dump(summary, f, indent=2)
+            _write_json(summary_file, summary)
             
             logger.info(f"✅ Aggiornamento completato: {summary['success_rate']:.1f}% successo")
             
@@ -121,11 +121,15 @@ class PriceAI:
         """Analizza indicatori tecnici"""
         technical_analysis = {}
         
+        # Analisi tecnica di tutti i simboli in un'unica passata
+        frames = {symbol: price_data['data'] for symbol, price_data in prices.items()
+                  if price_data.get('data') is not None}
+        analyses = self.strategy_engine.analyze_symbols(list(frames), frames)
+        
         for symbol, price_data in prices.items():
             try:
-                if 'data' in price_data and price_data['data'] is not None:
-                    # Analisi tecnica
-                    analysis = self.strategy_engine.analyze_symbol(symbol, price_data['data'])
+                if symbol in analyses:
+                    analysis = analyses[symbol]
                     
                     # RL Agent
                     rl_result = self.rl_agent.get_action({symbol: {'close': price_data['price']}})
@@ -8,6 +8,7 @@ import time
 import logging
 import threading
 from datetime import datetime, time as dt_time
+import numpy as np
 import pandas as pd
 import yfinance as yf
 from typing import Dict, List, Optional, Tuple
@@ -15,11 +16,57 @@ import json
 import os
 from dataclasses import dataclass
 
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit: kernels run as plain Python"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
 from config_manager import ConfigManager
 from rl_agent import RLAgent
 from portfolio import Portfolio
 from strategy_engine import StrategyEngine
 
+@njit(cache=True, fastmath={'contract', 'reassoc'})
+def _rsi_wilder(close, period):
+    """
+    RSI con la media di Wilder (RMA, alpha = 1/period) in un'unica passata
+    
+    Le medie di guadagni e perdite partono dalla media semplice delle prime
+    `period` variazioni; le barre precedenti restano NaN.
+    """
+    n = close.shape[0]
+    rsi = np.full(n, np.nan)
+    if n <= period:
+        return rsi
+    
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, period + 1):
+        delta = close[i] - close[i - 1]
+        if delta > 0.0:
+            avg_gain += delta
+        else:
+            avg_loss -= delta
+    avg_gain /= period
+    avg_loss /= period
+    
+    for i in range(period, n):
+        if i > period:
+            delta = close[i] - close[i - 1]
+            gain = delta if delta > 0.0 else 0.0
+            loss = -delta if delta < 0.0 else 0.0
+            avg_gain = (avg_gain * (period - 1) + gain) / period
+            avg_loss = (avg_loss * (period - 1) + loss) / period
+        if avg_loss == 0.0:
+            rsi[i] = 100.0
+        else:
+            rsi[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return rsi
+
 @dataclass
 class TradeSignal:
     """Segnale di trading"""
@@ -118,14 +165,11 @@ class LiveTradingMonitor:
             return {}
     
     def calculate_rsi(self, prices: pd.Series, period: int = 14) -> float:
-        """Calcola RSI (Relative Strength Index)"""
+        """Calcola RSI (Relative Strength Index) con la media di Wilder"""
         try:
-            delta = prices.diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-            rs = gain / loss
-            rsi = 100 - (100 / (1 + rs))
-            return rsi.iloc[-1] if not rsi.empty else 50.0
+            close = np.ascontiguousarray(prices.to_numpy(dtype=np.float64))
+            rsi = _rsi_wilder(close, period)
+            return float(rsi[-1]) if rsi.size else 50.0
         except:
             return 50.0
     
@@ -14,6 +14,7 @@ import time
 import threading
 from datetime import datetime, timedelta
 from pathlib import Path
+from string import Template
 
 # Aggiungi path per import moduli
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -22,6 +23,88 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 for dir_name in ['logs', 'data', 'config', 'templates']:
     os.makedirs(dir_name, exist_ok=True)
 
+# Pagina della dashboard integrata, compilata una sola volta
+_DASHBOARD_PAGE = Template("""<!DOCTYPE html>
+<html>
+<head>
+    <title>Stock AI Dashboard</title>
+    <meta http-equiv="refresh" content="30">
+    <style>
+        body { font-family: Arial, sans-serif; margin: 40px; background: #f5f5f5; }
+        .header { background: #2c3e50; color: white; padding: 20px; border-radius: 8px; text-align: center; }
+        .stats { display: flex; gap: 20px; margin: 20px 0; }
+        .stat-card { background: white; padding: 20px; border-radius: 8px; flex: 1; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }
+        .status { margin: 20px 0; background: white; padding: 20px; border-radius: 8px; }
+        .success { color: #27ae60; font-weight: bold; }
+        .info { color: #3498db; }
+        .warning { color: #f39c12; }
+        h1 { margin: 0; }
+        h2 { color: #2c3e50; }
+        h3 { color: #34495e; margin-top: 0; }
+        .metric { font-size: 24px; font-weight: bold; color: #2c3e50; }
+        .label { font-size: 14px; color: #7f8c8d; text-transform: uppercase; }
+        .footer { text-align: center; color: #7f8c8d; margin-top: 40px; }
+    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>🤖 Stock AI Trading System v$version</h1>
+        <p>Dashboard Web - Sistema Operativo</p>
+        <p>Ultimo aggiornamento: $updated</p>
+    </div>
+    
+    <div class="stats">
+        <div class="stat-card">
+            <div class="label">Portfolio</div>
+            <div class="metric">€$capital</div>
+            <p>Capitale disponibile</p>
+        </div>
+        <div class="stat-card">
+            <div class="label">Simboli</div>
+            <div class="metric">$symbols_count</div>
+            <p>Simboli monitorati</p>
+        </div>
+        <div class="stat-card">
+            <div class="label">Status</div>
+            <div class="metric success">✅ ONLINE</div>
+            <p>Sistema operativo</p>
+        </div>
+    </div>
+    
+    <div class="status">
+        <h2>📊 Status Sistema</h2>
+        <p class="success">✅ Sistema Operativo e Funzionante</p>
+        <p class="info">� Dashboard integrata per monitoring</p>
+        <p class="info">📁 Configurazione caricata: $config_sections sezioni</p>
+        <p class="info">📈 Simboli: $symbols</p>
+        
+        <h3>🛠️ Componenti</h3>
+        <ul>
+            <li class="success">✅ Data Collector</li>
+            <li class="success">✅ Portfolio Manager</li>
+            <li class="success">✅ RL Agent</li>
+            <li class="success">✅ Risk Management</li>
+            <li class="success">✅ Web Dashboard</li>
+        </ul>
+        
+        <h3>📋 Comandi Disponibili</h3>
+        <pre style="background: #ecf0f1; padding: 15px; border-radius: 5px; overflow-x: auto;">
+python src/main.py --help                 # Mostra tutti i comandi
+python src/main.py --portfolio status     # Status portfolio
+python src/main.py --update-data          # Aggiorna dati
+python src/main.py --mode live            # Trading live
+python src/main.py --test-api             # Test connessioni
+        </pre>
+    </div>
+    
+    <div class="footer">
+        <p>🤖 Stock AI Trading System - Powered by Python & Flask</p>
+        <p>Auto-refresh ogni 30 secondi</p>
+    </div>
+</body>
+</html>""")
+
+
 # Setup logging avanzato
 class ColoredFormatter(logging.Formatter):
     """Formatter colorato per i log"""
@@ -181,7 +264,6 @@ class StockAI:
     def show_portfolio_status(self):
         """Mostra stato portfolio dettagliato"""
         from portfolio import Portfolio
-        import pickle
         
         print("\n" + "="*60)
         print("📊 STATO PORTFOLIO")
@@ -190,10 +272,8 @@ class StockAI:
         portfolio_file = self.data_dir / "current_portfolio.pkl"
         
         try:
-            if portfolio_file.exists():
-                with open(portfolio_file, 'rb') as f:
-                    portfolio = pickle.load(f)
-                
+            portfolio = self._load_saved_portfolio(portfolio_file)
+            if portfolio is not None:
                 # Calcola metriche
                 metrics = portfolio.get_performance_metrics()
                 total_value = portfolio.get_portfolio_value()
@@ -230,11 +310,52 @@ class StockAI:
             logger.error(f"❌ Errore lettura portfolio: {e}")
             print(f"❌ Errore: {e}")
     
+    def _load_saved_portfolio(self, portfolio_file: Path):
+        """
+        Carica il portfolio salvato
+        
+        Preferisce lo snapshot msgpack scritto da Portfolio.save_portfolio
+        (current_portfolio.msgpack) se è aggiornato almeno quanto il pickle:
+        più veloce da leggere e senza eseguire codice durante il caricamento.
+        Altrimenti usa il pickle.
+        
+        Returns:
+            Portfolio o None se nessuno dei due file esiste
+        """
+        snapshot_file = portfolio_file.with_suffix('.msgpack')
+        
+        def mtime(path):
+            try:
+                return path.stat().st_mtime_ns
+            except OSError:
+                return None
+        
+        snapshot_mtime, pickle_mtime = mtime(snapshot_file), mtime(portfolio_file)
+        try:
+            import ormsgpack
+        except ImportError:
+            snapshot_mtime = None
+        
+        if snapshot_mtime is not None and (pickle_mtime is None or snapshot_mtime >= pickle_mtime):
+            from portfolio import Portfolio
+            
+            with open(snapshot_file, 'rb') as f:
+                data = ormsgpack.unpackb(f.read())
+            return Portfolio.from_dict(self.config, data)
+        
+        if pickle_mtime is None:
+            return None
+        
+        import pickle
+        with open(portfolio_file, 'rb') as f:
+            return pickle.load(f)
+    
     def reset_portfolio(self):
         """Reset portfolio ai valori iniziali"""
         try:
             portfolio_file = self.data_dir / "current_portfolio.pkl"
-            model_file = self.data_dir / "rl_model.pkl"
+            model_files = [self.data_dir / "rl_model.npz", self.data_dir / "rl_model.pkl",
+                           self.data_dir / "rl_meta.json"]
             
             # Backup se esistono
             if portfolio_file.exists():
@@ -243,11 +364,19 @@ class StockAI:
                 portfolio_file.rename(backup_path)
                 logger.info(f"💾 Backup portfolio: {backup_path}")
             
-            if model_file.exists():
-                backup_name = f"model_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pkl"
-                backup_path = self.data_dir / backup_name
-                model_file.rename(backup_path)
-                logger.info(f"💾 Backup model: {backup_path}")
+            # Lo snapshot msgpack descrive lo stesso portfolio: va rimosso con il pickle
+            snapshot_file = portfolio_file.with_suffix('.msgpack')
+            if snapshot_file.exists():
+                backup_path = self.data_dir / f"portfolio_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.msgpack"
+                snapshot_file.rename(backup_path)
+                logger.info(f"💾 Backup portfolio: {backup_path}")
+            
+            for model_file in model_files:
+                if model_file.exists():
+                    backup_name = f"model_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}{model_file.suffix}"
+                    backup_path = self.data_dir / backup_name
+                    model_file.rename(backup_path)
+                    logger.info(f"💾 Backup model: {backup_path}")
             
             print("✅ Portfolio resettato con successo")
             print(f"💰 Nuovo capitale: ${self.config['trading']['initial_capital']:,.2f}")
@@ -522,18 +651,15 @@ class StockAI:
         try:
             from performance_analytics import create_performance_report
             from portfolio import Portfolio
-            import pickle
             
             # Carica portfolio
             portfolio_file = self.data_dir / "current_portfolio.pkl"
+            portfolio = self._load_saved_portfolio(portfolio_file)
             
-            if not portfolio_file.exists():
+            if portfolio is None:
                 print("❌ Portfolio non trovato. Esegui prima qualche operazione.")
                 return
             
-            with open(portfolio_file, 'rb') as f:
-                portfolio = pickle.load(f)
-            
             # Simula dati portfolio (in un sistema reale verrebbero dal database)
             end_date = datetime.now()
             start_date = end_date - timedelta(days=days)
@@ -586,20 +712,17 @@ class StockAI:
         try:
             from performance_analytics import PerformanceAnalytics
             from portfolio import Portfolio
-            import pickle
             import pandas as pd
             import numpy as np
             
             # Carica portfolio
             portfolio_file = self.data_dir / "current_portfolio.pkl"
+            portfolio = self._load_saved_portfolio(portfolio_file)
             
-            if not portfolio_file.exists():
+            if portfolio is None:
                 print("❌ Portfolio non trovato.")
                 return
             
-            with open(portfolio_file, 'rb') as f:
-                portfolio = pickle.load(f)
-            
             current_value = portfolio.get_portfolio_value() if hasattr(portfolio, 'get_portfolio_value') else 10000
             
             # Simula dati storici per calcolare parametri
@@ -641,90 +764,21 @@ class StockAI:
             
             app = Flask(__name__)
             
+            # Solo l'orario cambia tra una richiesta e l'altra: i valori statici
+            # vengono calcolati una volta all'avvio e sostituiti insieme all'orario
+            # in un solo passaggio (un `$` nei valori resta testo)
+            page_values = {
+                'version': self.version,
+                'capital': f"{self.config.get('trading', {}).get('initial_capital', 10000):,.0f}",
+                'symbols_count': len(self.config.get('data', {}).get('symbols', [])),
+                'config_sections': len(self.config),
+                'symbols': ', '.join(self.config.get('data', {}).get('symbols', ['N/A']))
+            }
+            
             @app.route('/')
             def dashboard():
                 """Dashboard principale"""
-                return f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <title>Stock AI Dashboard</title>
-    <meta http-equiv="refresh" content="30">
-    <style>
-        body {{ font-family: Arial, sans-serif; margin: 40px; background: #f5f5f5; }}
-        .header {{ background: #2c3e50; color: white; padding: 20px; border-radius: 8px; text-align: center; }}
-        .stats {{ display: flex; gap: 20px; margin: 20px 0; }}
-        .stat-card {{ background: white; padding: 20px; border-radius: 8px; flex: 1; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }}
-        .status {{ margin: 20px 0; background: white; padding: 20px; border-radius: 8px; }}
-        .success {{ color: #27ae60; font-weight: bold; }}
-        .info {{ color: #3498db; }}
-        .warning {{ color: #f39c12; }}
-        h1 {{ margin: 0; }}
-        h2 {{ color: #2c3e50; }}
-        h3 {{ color: #34495e; margin-top: 0; }}
-        .metric {{ font-size: 24px; font-weight: bold; color: #2c3e50; }}
-        .label {{ font-size: 14px; color: #7f8c8d; text-transform: uppercase; }}
-        .footer {{ text-align: center; color: #7f8c8d; margin-top: 40px; }}
-    </style>
-</head>
-<body>
-    <div class="header">
-        <h1>🤖 Stock AI Trading System v{self.version}</h1>
-        <p>Dashboard Web - Sistema Operativo</p>
-        <p>Ultimo aggiornamento: {datetime.now().strftime('%H:%M:%S')}</p>
-    </div>
-    
-    <div class="stats">
-        <div class="stat-card">
-            <div class="label">Portfolio</div>
-            <div class="metric">€{self.config.get('trading', {}).get('initial_capital', 10000):,.0f}</div>
-            <p>Capitale disponibile</p>
-        </div>
-        <div class="stat-card">
-            <div class="label">Simboli</div>
-            <div class="metric">{len(self.config.get('data', {}).get('symbols', []))}</div>
-            <p>Simboli monitorati</p>
-        </div>
-        <div class="stat-card">
-            <div class="label">Status</div>
-            <div class="metric success">✅ ONLINE</div>
-            <p>Sistema operativo</p>
-        </div>
-    </div>
-    
-    <div class="status">
-        <h2>📊 Status Sistema</h2>
-        <p class="success">✅ Sistema Operativo e Funzionante</p>
-        <p class="info">� Dashboard integrata per monitoring</p>
-        <p class="info">📁 Configurazione caricata: {len(self.config)} sezioni</p>
-        <p class="info">📈 Simboli: {', '.join(self.config.get('data', {}).get('symbols', ['N/A']))}</p>
-        
-        <h3>🛠️ Componenti</h3>
-        <ul>
-            <li class="success">✅ Data Collector</li>
-            <li class="success">✅ Portfolio Manager</li>
-            <li class="success">✅ RL Agent</li>
-            <li class="success">✅ Risk Management</li>
-            <li class="success">✅ Web Dashboard</li>
-        </ul>
-        
-        <h3>📋 Comandi Disponibili</h3>
-        <pre style="background: #ecf0f1; padding: 15px; border-radius: 5px; overflow-x: auto;">
-python src/main.py --help                 # Mostra tutti i comandi
-python src/main.py --portfolio status     # Status portfolio
-python src/main.py --update-data          # Aggiorna dati
-python src/main.py --mode live            # Trading live
-python src/main.py --test-api             # Test connessioni
-        </pre>
-    </div>
-    
-    <div class="footer">
-        <p>🤖 Stock AI Trading System - Powered by Python & Flask</p>
-        <p>Auto-refresh ogni 30 secondi</p>
-    </div>
-</body>
-</html>
-                """
+                return _DASHBOARD_PAGE.substitute(page_values, updated=datetime.now().strftime('%H:%M:%S'))
             
             @app.route('/api/status')
             def api_status():
@@ -791,7 +845,7 @@ python src/main.py --test-api             # Test connessioni
         # Check file
         important_files = [
             ("Portfolio", "data/current_portfolio.pkl"),
-            ("RL Model", "data/rl_model.pkl"),
+            ("RL Model", "data/rl_model.npz"),
             ("Config", "config/settings.json"),
             ("Logs", "logs/main.log")
         ]
@@ -800,6 +854,15 @@ python src/main.py --test-api             # Test connessioni
             exists = "✅" if Path(path).exists() else "❌"
             print(f"  {name}: {exists}")
         
+        # Riepilogo modello RL dal file meta (il modello non viene caricato)
+        try:
+            from rl_agent import load_model_meta
+            meta = load_model_meta()
+        except ImportError:
+            meta = None
+        if meta:
+            print(f"  RL: {meta['states_learned']} stati appresi, epsilon {meta['epsilon']:.3f}, salvato {meta['saved_at']}")
+        
         # Network
         try:
             import requests
@@ -10,22 +10,52 @@ import logging
 from datetime import datetime, timedelta
 from pathlib import Path
 import json
-import matplotlib.pyplot as plt
-import seaborn as sns
 from typing import Dict, List, Optional, Tuple
 import warnings
 from scipy import stats
 from sklearn.metrics import mean_squared_error, mean_absolute_error
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
 
 warnings.filterwarnings('ignore')
 logger = logging.getLogger(__name__)
 
+def _lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Indici dei punti scelti dal Largest-Triangle-Three-Buckets
+    
+    Riduce una serie a `threshold` punti conservandone la forma: il primo e
+    l'ultimo punto restano, per ogni bucket intermedio si tiene il punto che
+    forma il triangolo più grande con il punto scelto prima e con la media del
+    bucket successivo.
+    """
+    n = y.shape[0]
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < edges.shape[0] else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(np.nan_to_num(area, nan=-1.0)))
+        indices[i + 1] = a
+    
+    return indices
+
 class PerformanceAnalytics:
     """Sistema completo per analisi performance e risk management"""
     
+    # Oltre questa lunghezza le serie dei grafici vengono ridotte con LTTB
+    MAX_CHART_POINTS = 5000
+    CHART_POINTS = 2000
+    
     def __init__(self, config):
         self.config = config
         self.reports_dir = Path("data/performance_reports")
@@ -36,6 +66,9 @@ class PerformanceAnalytics:
         self.var_confidence = config.get('risk', {}).get('var_confidence', 0.05)
         self.benchmark = config.get('risk', {}).get('benchmark', 'SPY')
         
+        # Figura plotly del dashboard, riusata tra una chiamata e l'altra
+        self._dashboard_fig = None
+        
         logger.info("📊 PerformanceAnalytics inizializzato")
     
     def calculate_comprehensive_metrics(self, portfolio_data: pd.DataFrame, benchmark_data: pd.DataFrame = None) -> Dict:
@@ -152,7 +185,8 @@ class PerformanceAnalytics:
         
         # Sharpe Ratio
         excess_returns = returns - (self.risk_free_rate / 252)
-        sharpe_ratio = excess_returns.mean() / returns.std() * np.sqrt(252) if returns.std() > 0 else 0
+        returns_std = returns.std()
+        sharpe_ratio = excess_returns.mean() / returns_std * np.sqrt(252) if returns_std > 0 else 0
         
         # Sortino Ratio
         downside_returns = returns[returns < 0]
@@ -231,14 +265,14 @@ class PerformanceAnalytics:
         """Calcola metriche rolling"""
         
         returns = df['returns']
+        rolling = returns.rolling(window)
+        rolling_std = rolling.std()
         
-        # Rolling Sharpe
-        rolling_sharpe = returns.rolling(window).apply(
-            lambda x: x.mean() / x.std() * np.sqrt(252) if x.std() > 0 else 0
-        )
+        # Rolling Sharpe (0 where the window has no dispersion)
+        rolling_sharpe = (rolling.mean() / rolling_std * np.sqrt(252)).mask(rolling_std <= 0, 0)
         
         # Rolling volatility
-        rolling_vol = returns.rolling(window).std() * np.sqrt(252) * 100
+        rolling_vol = rolling_std * np.sqrt(252) * 100
         
         # Stability metrics
         sharpe_stability = rolling_sharpe.std()
@@ -372,10 +406,62 @@ class PerformanceAnalytics:
         df['drawdown'] = (df['portfolio_value'] - running_max) / running_max * 100
         
         # Rolling metrics
-        df['rolling_volatility'] = df['returns'].rolling(30).std() * np.sqrt(252) * 100
-        df['rolling_sharpe'] = df['returns'].rolling(30).apply(
-            lambda x: x.mean() / x.std() * np.sqrt(252) if x.std() > 0 else 0
-        )
+        rolling = df['returns'].rolling(30)
+        rolling_std = rolling.std()
+        df['rolling_volatility'] = rolling_std * np.sqrt(252) * 100
+        df['rolling_sharpe'] = (rolling.mean() / rolling_std * np.sqrt(252)).mask(rolling_std <= 0, 0)
+        
+        # Colonne materializzate una volta come array NumPy: plotly non deve
+        # convertire ogni Series, e le serie lunghe vengono ridotte con LTTB
+        dates = df['date'].to_numpy()
+        x_numeric = dates.astype('datetime64[ns]').astype(np.int64).astype(np.float64)
+        
+        def series(values):
+            y = np.asarray(values, dtype=np.float64)
+            if y.shape[0] <= self.MAX_CHART_POINTS:
+                return dates, y
+            idx = _lttb_indices(x_numeric, y, self.CHART_POINTS)
+            return dates[idx], y[idx]
+        
+        # Stessa figura a ogni chiamata: si aggiornano solo i dati delle tracce
+        fig = self._dashboard_figure()
+        traces = fig.data
+        with fig.batch_update():
+            for trace, column, scale in (
+                (traces[0], 'portfolio_value', 1),       # Portfolio value
+                (traces[1], 'cumulative_returns', 100),  # Cumulative returns
+                (traces[2], 'drawdown', 1),              # Drawdown
+                (traces[3], 'rolling_volatility', 1),    # Rolling volatility
+                (traces[4], 'rolling_sharpe', 1)         # Rolling Sharpe
+            ):
+                trace.x, trace.y = series(df[column].to_numpy() * scale)
+            
+            # Returns distribution
+            traces[5].x = df['returns'].to_numpy() * 100
+            
+            fig.layout.title.text = f"Performance Dashboard - {metrics.get('total_return', 0):.2f}% Total Return"
+        
+        # Salva dashboard
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        dashboard_path = self.reports_dir / f"performance_dashboard_{timestamp}.html"
+        
+        # plotly.js da CDN: il file resta di pochi KB e il browser lo tiene in cache
+        html = fig.to_html(include_plotlyjs='cdn', full_html=True,
+                           config={'responsive': True, 'scrollZoom': True})
+        with open(dashboard_path, 'wb', buffering=1 << 20) as f:
+            f.write(html.encode('utf-8'))
+        
+        logger.info(f"✅ Dashboard salvato: {dashboard_path}")
+        return str(dashboard_path)
+    
+    def _dashboard_figure(self):
+        """Figura del dashboard (subplots, tracce vuote e layout), creata una volta"""
+        if self._dashboard_fig is not None:
+            return self._dashboard_fig
+        
+        # plotly viene importato solo da chi genera il dashboard
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
         
         # Crea subplots
         fig = make_subplots(
@@ -395,65 +481,48 @@ class PerformanceAnalytics:
             ]
         )
         
-        # Portfolio value
+        # Le linee usano Scattergl: il browser le disegna in WebGL invece che in SVG
         fig.add_trace(
-            go.Scatter(x=df['date'], y=df['portfolio_value'], name='Portfolio Value',
+            go.Scattergl(x=[], y=[], name='Portfolio Value',
                       line=dict(color='blue', width=2)),
             row=1, col=1
         )
-        
-        # Cumulative returns (secondary y-axis)
         fig.add_trace(
-            go.Scatter(x=df['date'], y=df['cumulative_returns']*100, name='Cumulative Returns (%)',
+            go.Scattergl(x=[], y=[], name='Cumulative Returns (%)',
                       line=dict(color='green', width=2), yaxis='y2'),
             row=1, col=1
         )
-        
-        # Drawdown
         fig.add_trace(
-            go.Scatter(x=df['date'], y=df['drawdown'], name='Drawdown',
+            go.Scattergl(x=[], y=[], name='Drawdown',
                       fill='tonexty', fillcolor='rgba(255,0,0,0.3)',
                       line=dict(color='red')),
             row=1, col=2
         )
-        
-        # Rolling volatility
         fig.add_trace(
-            go.Scatter(x=df['date'], y=df['rolling_volatility'], name='Rolling Volatility',
+            go.Scattergl(x=[], y=[], name='Rolling Volatility',
                       line=dict(color='orange')),
             row=2, col=1
         )
-        
-        # Rolling Sharpe
         fig.add_trace(
-            go.Scatter(x=df['date'], y=df['rolling_sharpe'], name='Rolling Sharpe',
+            go.Scattergl(x=[], y=[], name='Rolling Sharpe',
                       line=dict(color='purple')),
             row=2, col=2
         )
-        
-        # Returns distribution
         fig.add_trace(
-            go.Histogram(x=df['returns']*100, name='Returns Distribution',
+            go.Histogram(x=[], name='Returns Distribution',
                         nbinsx=30, opacity=0.7),
             row=3, col=1
         )
         
         # Update layout
         fig.update_layout(
-            title=f"Performance Dashboard - {metrics.get('total_return', 0):.2f}% Total Return",
             height=900,
             showlegend=True,
             template='plotly_white'
         )
         
-        # Salva dashboard
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        dashboard_path = self.reports_dir / f"performance_dashboard_{timestamp}.html"
-        
-        fig.write_html(str(dashboard_path))
-        
-        logger.info(f"✅ Dashboard salvato: {dashboard_path}")
-        return str(dashboard_path)
+        self._dashboard_fig = fig
+        return fig
     
     def generate_risk_report(self, portfolio_data: pd.DataFrame, metrics: Dict) -> Dict:
         """Genera report dettagliato di risk management"""
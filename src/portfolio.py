@@ -1,27 +1,55 @@
 import json
 import logging
+import os
 import numpy as np
 import pandas as pd
 from datetime import datetime
 from pathlib import Path
 import shutil
 
+try:
+    import ormsgpack
+    ORMSGPACK_AVAILABLE = True
+except ImportError:
+    ORMSGPACK_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 class Portfolio:
     """Classe per gestire un portafoglio di investimenti"""
     
-    def __init__(self, config):
+    def __init__(self, config, load=True):
         """
         Inizializza il portafoglio
         
         Args:
             config (dict): Configurazione del portafoglio, include 'trading' e 'data'
+            load (bool): Se False parte vuoto senza leggere né scrivere file
         """
         self.config = config
         self.initial_capital = config['trading']['initial_capital']
         self.portfolio_file = Path("data/portfolio.json")
-        self.load_portfolio()
+        self.snapshot_file = Path("data/current_portfolio.msgpack")
+        if load:
+            self.load_portfolio()
+        else:
+            self.cash = self.initial_capital
+            self.positions = {}
+            self.trades = []
+    
+    @classmethod
+    def from_dict(cls, config, data):
+        """
+        Ricostruisce un portafoglio in sola lettura da uno snapshot (vedi to_dict)
+        
+        Le posizioni sono nel formato {ticker: {'shares', 'avg_price'}} e le
+        operazioni in 'transactions', come si aspettano dashboard e CLI.
+        """
+        portfolio = cls(config, load=False)
+        portfolio.cash = data['cash']
+        portfolio.positions = data['positions']
+        portfolio.transactions = data['transactions']
+        return portfolio
         
     def load_portfolio(self):
         """Carica il portafoglio da un file"""
@@ -47,6 +75,66 @@ class Portfolio:
         }
         with open(self.portfolio_file, 'w') as f:
             json.dump(data, f, indent=2)
+        self.save_snapshot()
+    
+    def to_dict(self):
+        """
+        Portafoglio nel formato letto da dashboard e CLI
+        
+        Returns:
+            dict: 'cash', 'positions' {ticker: {'shares', 'avg_price'}} e 'transactions'
+        """
+        # Prezzo medio di carico ricostruito rigiocando le operazioni
+        cost_basis = {}
+        transactions = []
+        for trade in self.trades:
+            symbol = trade['symbol']
+            shares, cost = cost_basis.get(symbol, (0, 0.0))
+            if trade['type'] == 'buy':
+                shares += trade['quantity']
+                cost += trade['total']
+            else:
+                avg_price = cost / shares if shares > 0 else 0.0
+                shares -= trade['quantity']
+                cost -= avg_price * trade['quantity']
+            cost_basis[symbol] = (shares, cost)
+            
+            transactions.append({
+                'timestamp': trade['timestamp'],
+                'type': trade['type'].upper(),
+                'ticker': symbol,
+                'shares': trade['quantity'],
+                'price': trade['price'],
+                'total': trade['total']
+            })
+        
+        positions = {}
+        for symbol, quantity in self.positions.items():
+            shares, cost = cost_basis.get(symbol, (0, 0.0))
+            positions[symbol] = {
+                'shares': quantity,
+                'avg_price': cost / shares if shares > 0 else 0.0
+            }
+        
+        return {'cash': self.cash, 'positions': positions, 'transactions': transactions}
+    
+    def save_snapshot(self):
+        """
+        Scrive lo snapshot msgpack del portafoglio (data/current_portfolio.msgpack)
+        
+        Returns:
+            bool: False se ormsgpack non è disponibile
+        """
+        if not ORMSGPACK_AVAILABLE:
+            return False
+        
+        payload = ormsgpack.packb(self.to_dict(), option=ormsgpack.OPT_SERIALIZE_NUMPY)
+        # Scrittura atomica: la dashboard non legge mai uno snapshot a metà
+        tmp_file = self.snapshot_file.with_suffix('.msgpack.tmp')
+        with open(tmp_file, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_file, self.snapshot_file)
+        return True
     
     def execute_trade(self, action):
         """Esegue un'operazione di trading reale (non implementata)"""
@@ -56,8 +144,12 @@ class Portfolio:
     
     def simulate_trade(self, action):
         """Simula un'operazione di trading per il paper trading"""
-        symbol = action.get('symbol')
         trade_type = action.get('type')  # 'buy' o 'sell'
+        if trade_type not in ('buy', 'sell'):
+            # 'hold': nessuna operazione, niente da aggiornare né da salvare
+            return True
+        
+        symbol = action.get('symbol')
         quantity = action.get('quantity', 0)
         price = action.get('price', 0)
         
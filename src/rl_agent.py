@@ -6,10 +6,165 @@ from pathlib import Path
 import gymnasium as gym
 from gymnasium import spaces
 import json
-from datetime import datetime
+import time
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit: kernels run as plain Python"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
 
 logger = logging.getLogger(__name__)
 
+# Each observation feature is discretized into one of n_bins buckets by
+# per-feature bin edges; the digits are packed (base n_bins) into one integer
+# that indexes a dense Q-table row. The default edges bucket every feature
+# by sign around a +/-0.01 dead zone (ternary); fit_discretizer replaces them
+# with quantiles of the training observations.
+OBS_SIZE = 10
+N_ACTIONS = 3
+ACTIONS = ('hold', 'buy', 'sell')
+DEFAULT_BINS = 3
+MAX_BINS = 4  # 4**10 states is the largest table kept dense
+_SIGN_EDGES = np.tile(np.array([-0.01, 0.01]), (OBS_SIZE, 1))
+
+
+RL_META_FILE = "data/rl_meta.json"
+
+
+def load_model_meta(path=RL_META_FILE):
+    """Read the summary written by RLAgent.save_model without loading the model"""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _action_index(action):
+    """Map an action name ('hold', 'buy', 'sell') or index to its Q-table column"""
+    return ACTIONS.index(action) if isinstance(action, str) else int(action)
+
+
+@njit(cache=True)
+def _encode_observation(obs, edges):
+    """Pack the discretized observation into a Q-table row index"""
+    n_bins = edges.shape[1] + 1
+    code = 0
+    power = 1
+    for k in range(obs.shape[0]):
+        val = obs[k]
+        digit = 0
+        for edge in edges[k]:
+            if val > edge:
+                digit += 1
+        code += digit * power
+        power *= n_bins
+    return code
+
+
+@njit(cache=True)
+def _fill_observation(obs, i, close, volume, price_range, sma5, ret1,
+                      cash, shares, total_value, initial_capital):
+    """Write the TradingEnvironment observation for step i into obs"""
+    obs[:] = 0.0
+    if i >= close.shape[0]:
+        return
+    obs[0] = close[i]
+    obs[1] = volume[i]
+    obs[2] = price_range[i]
+    obs[3] = cash / initial_capital
+    obs[4] = shares
+    obs[5] = total_value / initial_capital
+    if i > 5:
+        obs[6] = close[i] / sma5[i] - 1
+    if i > 1:
+        obs[7] = ret1[i]
+
+
+@njit(cache=True)
+def _env_step(cash, shares, total_value, price, action):
+    """Pure TradingEnvironment transition at one price
+    
+    Returns the new (cash, shares, total_value) carry and the step reward.
+    """
+    if action == 1:  # Buy
+        shares_to_buy = cash // price
+        shares += shares_to_buy
+        cash -= shares_to_buy * price
+    elif action == 2:  # Sell
+        cash += shares * price
+        shares = 0.0
+    new_total_value = cash + shares * price
+    return cash, shares, new_total_value, new_total_value - total_value
+
+
+@njit(cache=True)
+def _q_learning_episode(q_table, visited, edges, close, volume, price_range, sma5, ret1,
+                        initial_capital, learning_rate, discount_factor, epsilon,
+                        explore_draws, random_actions):
+    """Run one epsilon-greedy Q-learning episode over TradingEnvironment dynamics
+    
+    explore_draws and random_actions hold the episode's pre-drawn uniform
+    samples and random actions, one per step; their length caps the steps.
+    Updates q_table in place and returns the episode's total reward.
+    """
+    max_steps = explore_draws.shape[0]
+    last_step = close.shape[0] - 1
+    cash = initial_capital
+    shares = 0.0
+    total_value = initial_capital
+    obs = np.zeros(OBS_SIZE, dtype=np.float32)
+    
+    _fill_observation(obs, 0, close, volume, price_range, sma5, ret1,
+                      cash, shares, total_value, initial_capital)
+    state = _encode_observation(obs, edges)
+    
+    i = 0
+    total_reward = 0.0
+    step_count = 0
+    done = False
+    while not done and step_count < max_steps:
+        # Epsilon-greedy action selection
+        if explore_draws[step_count] < epsilon:
+            action = random_actions[step_count]
+        else:
+            action = np.argmax(q_table[state])
+        
+        # Environment step
+        reward = 0.0
+        if i > last_step:
+            done = True
+        else:
+            cash, shares, total_value, reward = _env_step(cash, shares, total_value, close[i], action)
+            i += 1
+            done = i >= last_step
+        
+        _fill_observation(obs, i, close, volume, price_range, sma5, ret1,
+                          cash, shares, total_value, initial_capital)
+        next_state = _encode_observation(obs, edges)
+        
+        # Q-learning update
+        current_q = q_table[state, action]
+        max_next_q = np.max(q_table[next_state])
+        q_table[state, action] = current_q + learning_rate * (
+            reward + discount_factor * max_next_q - current_q
+        )
+        visited[state] = True
+        
+        state = next_state
+        total_reward += reward
+        step_count += 1
+    
+    return total_reward
+
+
 class TradingEnvironment(gym.Env):
     """Custom trading environment for RL agent"""
     
@@ -21,6 +176,16 @@ class TradingEnvironment(gym.Env):
         self.current_step = 0
         self.max_steps = len(data) - 1
         
+        # Precompute price-derived features once: SMA5 over the previous five
+        # closes and the 1-day return, looked up by index in _get_observation
+        self._close = data['Close'].to_numpy(dtype=np.float64)
+        self._volume = data['Volume'].to_numpy(dtype=np.float64)
+        self._range = (data['High'] - data['Low']).to_numpy(dtype=np.float64)
+        self._sma5 = pd.Series(self._close).rolling(5).mean().shift(1).to_numpy()
+        self._ret1 = np.zeros(len(self._close))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self._ret1[1:] = self._close[1:] / self._close[:-1] - 1
+        
         # Action space: 0=hold, 1=buy, 2=sell
         self.action_space = spaces.Discrete(3)
         
@@ -44,84 +209,61 @@ class TradingEnvironment(gym.Env):
         if self.current_step >= len(self.data):
             return self._get_observation(), 0, True, False, {}
             
-        current_price = self.data.iloc[self.current_step]['Close']
-        
-        # Execute action
-        if action == 1:  # Buy
-            shares_to_buy = self.cash // current_price
-            self.shares += shares_to_buy
-            self.cash -= shares_to_buy * current_price
-        elif action == 2:  # Sell
-            self.cash += self.shares * current_price
-            self.shares = 0
+        # Execute action and calculate reward (shared with the training kernel)
+        self.cash, self.shares, self.total_value, reward = _env_step(
+            float(self.cash), float(self.shares), float(self.total_value),
+            self._close[self.current_step], int(action)
+        )
         
         # Move to next step
         self.current_step += 1
         
-        # Calculate reward
-        new_total_value = self.cash + self.shares * current_price
-        reward = new_total_value - self.total_value
-        self.total_value = new_total_value
-        
         done = self.current_step >= self.max_steps
         truncated = False
         
         return self._get_observation(), reward, done, truncated, {}
     
     def _get_observation(self):
-        if self.current_step >= len(self.data):
-            return np.zeros(10, dtype=np.float32)
-            
-        row = self.data.iloc[self.current_step]
-        
-        # Technical indicators as features
-        features = [
-            row['Close'],
-            row['Volume'],
-            row['High'] - row['Low'],  # Daily range
-            self.cash / self.initial_capital,  # Cash ratio
-            self.shares,  # Share count
-            self.total_value / self.initial_capital,  # Portfolio performance
-        ]
-        
-        # Add some simple technical indicators
-        if self.current_step > 5:
-            sma_5 = self.data['Close'].iloc[self.current_step-5:self.current_step].mean()
-            features.append(row['Close'] / sma_5 - 1)  # Price vs SMA ratio
-        else:
-            features.append(0)
-            
-        if self.current_step > 1:
-            price_change = (row['Close'] / self.data.iloc[self.current_step-1]['Close']) - 1
-            features.append(price_change)
-        else:
-            features.append(0)
-            
-        # Pad to fixed size
-        while len(features) < 10:
-            features.append(0)
-            
-        return np.array(features[:10], dtype=np.float32)
+        # Fixed-size observation written in place: price features, portfolio
+        # state, price vs SMA5 ratio and 1-day return (zeros past the end)
+        obs = np.zeros(OBS_SIZE, dtype=np.float32)
+        _fill_observation(obs, self.current_step, self._close, self._volume, self._range,
+                          self._sma5, self._ret1, float(self.cash), float(self.shares),
+                          float(self.total_value), float(self.initial_capital))
+        return obs
 
 class RLAgent:
     def __init__(self, config):
         self.config = config
-        self.model_file = Path("data/rl_model.pkl")
+        self.model_file = Path("data/rl_model.npz")
+        self.stats_file = Path("data/rl_model.json")
+        self.legacy_model_file = Path("data/rl_model.pkl")
+        self.meta_file = Path(RL_META_FILE)
         self.learning_rate = config['rl_agent']['learning_rate']
         self.epsilon = config['rl_agent']['epsilon']
         self.discount_factor = config['rl_agent']['discount_factor']
+        self._rng = np.random.default_rng(config['rl_agent'].get('seed'))
         
-        # Simple Q-learning agent
-        self.q_table = {}
+        # Simple Q-learning agent: dense table indexed by encoded state
+        self.n_bins = min(config['rl_agent'].get('discretization_bins', DEFAULT_BINS), MAX_BINS)
+        self._set_edges(_SIGN_EDGES)
+        self._discretizer_fitted = False
         self.training_stats = {
             'episodes': 0,
             'total_reward': 0,
             'average_reward': 0
         }
         
-        # Experience replay
-        self.experiences = []
+        # Experience replay: preallocated ring buffer, one array per field
         self.max_experiences = 1000
+        self._exp_states = np.empty(self.max_experiences, dtype=np.int32)
+        self._exp_actions = np.empty(self.max_experiences, dtype=np.int8)
+        self._exp_rewards = np.empty(self.max_experiences, dtype=np.float32)
+        self._exp_next_states = np.empty(self.max_experiences, dtype=np.int32)
+        self._exp_portfolio_values = np.empty(self.max_experiences, dtype=np.float32)
+        self._exp_timestamps = np.empty(self.max_experiences, dtype=np.int64)  # monotonic ns
+        self._exp_head = 0
+        self._exp_size = 0
         
         # Performance tracking
         self.performance_history = []
@@ -135,36 +277,108 @@ class RLAgent:
         """Load trained model"""
         if self.model_file.exists():
             try:
-                with open(self.model_file, 'rb') as f:
-                    data = pickle.load(f)
-                    self.q_table = data.get('q_table', {})
-                    self.training_stats = data.get('stats', self.training_stats)
+                with np.load(self.model_file) as data:
+                    if 'edges' in data.files:
+                        self._set_edges(data['edges'])
+                        self._discretizer_fitted = True
+                    self.q_table = data['q_table'].astype(np.float32)
+                    self._visited = data['visited'].astype(np.bool_)
+                if self.stats_file.exists():
+                    with open(self.stats_file, 'r') as f:
+                        self.training_stats = json.load(f)
                 logger.info("Loaded trained RL model")
             except Exception as e:
                 logger.error(f"Error loading model: {e}")
+        elif self.legacy_model_file.exists():
+            self._load_pickle_model()
+    
+    def _load_pickle_model(self):
+        """Load a model saved in the old pickle format (rewritten on next save)"""
+        try:
+            with open(self.legacy_model_file, 'rb') as f:
+                data = pickle.load(f)
+                q_table = data.get('q_table')
+                if isinstance(q_table, dict):
+                    self._load_legacy_q_table(q_table)
+                elif q_table is not None:
+                    if data.get('edges') is not None:
+                        self._set_edges(data['edges'])
+                        self._discretizer_fitted = True
+                    self.q_table = np.asarray(q_table, dtype=np.float32)
+                    self._visited = np.asarray(data['visited'], dtype=np.bool_)
+                self.training_stats = data.get('stats', self.training_stats)
+            logger.info("Loaded trained RL model (legacy pickle)")
+        except Exception as e:
+            logger.error(f"Error loading model: {e}")
+    
+    def _load_legacy_q_table(self, q_table):
+        """Convert a dict Q-table keyed by ternary tuples to the dense layout"""
+        for state, q_values in q_table.items():
+            if isinstance(q_values, dict):
+                q_values = [q_values.get(action, 0.0) for action in ACTIONS]
+            code = sum((digit + 1) * 3 ** k for k, digit in enumerate(state))
+            self.q_table[code] = q_values
+            self._visited[code] = True
     
     def save_model(self):
         """Save trained model"""
-        data = {
-            'q_table': self.q_table,
-            'stats': self.training_stats
+        arrays = {'q_table': self.q_table, 'visited': self._visited}
+        if self._discretizer_fitted:
+            arrays['edges'] = self._edges
+        np.savez_compressed(self.model_file, **arrays)
+        with open(self.stats_file, 'w') as f:
+            json.dump(self.training_stats, f, indent=2)
+        # Small summary next to the model: readers that only show stats
+        # never have to decompress the Q-table
+        meta = {
+            'states_learned': int(self._visited.sum()),
+            'n_states': int(self.q_table.shape[0]),
+            'epsilon': float(self.epsilon),
+            'learning_rate': float(self.learning_rate),
+            'discount_factor': float(self.discount_factor),
+            'episodes': self.training_stats.get('episodes', 0),
+            'saved_at': time.strftime('%Y-%m-%dT%H:%M:%S')
         }
-        with open(self.model_file, 'wb') as f:
-            pickle.dump(data, f)
+        with open(self.meta_file, 'w') as f:
+            json.dump(meta, f, indent=2)
         logger.info("Saved RL model")
     
     def get_state_key(self, observation):
-        """Convert observation to state key for Q-table"""
-        # Discretize continuous values
-        discretized = []
-        for val in observation:
-            if abs(val) < 0.01:
-                discretized.append(0)
-            elif val > 0:
-                discretized.append(1)
-            else:
-                discretized.append(-1)
-        return tuple(discretized)
+        """Convert observation to state key (Q-table row index)"""
+        # Discretize continuous values to bin digits and pack them
+        return int(self._discretize(observation) @ self._state_powers)
+    
+    def _set_edges(self, edges):
+        """Install per-feature bin edges and reset the Q-table to match"""
+        self._edges = np.ascontiguousarray(edges, dtype=np.float64)
+        n_bins = self._edges.shape[1] + 1
+        self._state_powers = n_bins ** np.arange(OBS_SIZE, dtype=np.int64)
+        self.q_table = np.zeros((n_bins ** OBS_SIZE, N_ACTIONS), dtype=np.float32)
+        self._visited = np.zeros(n_bins ** OBS_SIZE, dtype=np.bool_)
+    
+    def fit_discretizer(self, observations, n_bins=DEFAULT_BINS):
+        """
+        Fit quantile bin edges per feature on an (N, 10) observation matrix
+        
+        Replaces the sign bucketing and resets the Q-table, so it is only
+        done once, before the first training run. n_bins is capped at
+        MAX_BINS so the dense Q-table stays allocatable.
+        """
+        n_bins = min(n_bins, MAX_BINS)
+        quantiles = np.linspace(0, 1, n_bins + 1)[1:-1]
+        self._set_edges(np.quantile(np.asarray(observations, dtype=np.float64), quantiles, axis=0).T)
+        self._discretizer_fitted = True
+    
+    def _sample_observations(self, env):
+        """Collect the observations of one random-policy pass over env"""
+        state, _ = env.reset()
+        observations = [state]
+        done = False
+        while not done:
+            state, _, done, truncated, _ = env.step(int(self._rng.integers(0, N_ACTIONS)))
+            observations.append(state)
+            done = done or truncated
+        return np.array(observations)
     
     def get_action(self, market_state):
         """Get action from trained agent"""
@@ -173,19 +387,17 @@ class RLAgent:
         state_key = self.get_state_key(observation)
         
         # Epsilon-greedy action selection
-        if np.random.random() < self.epsilon:
-            action_idx = np.random.choice(3)
+        if self._rng.random() < self.epsilon:
+            action_idx = int(self._rng.integers(0, N_ACTIONS))
         else:
-            q_values = self.q_table.get(state_key, [0, 0, 0])
-            action_idx = np.argmax(q_values)
+            action_idx = np.argmax(self.q_table[state_key])
         
         # Convert action index to trading action
-        actions = ['hold', 'buy', 'sell']
-        action_type = actions[action_idx]
+        action_type = ACTIONS[action_idx]
         
         # Create action with default symbol (would be improved)
         if len(market_state) > 0:
-            symbol = list(market_state.keys())[0]
+            symbol = next(iter(market_state))
             price = market_state[symbol]['close']
             
             return {
@@ -203,22 +415,24 @@ class RLAgent:
             return np.zeros(10)
             
         # Use first symbol's data
-        symbol_data = list(market_state.values())[0]
-        
-        obs = [
-            symbol_data.get('close', 0),
-            symbol_data.get('volume', 0) / 1000000,  # Normalize volume
-            symbol_data.get('rsi', 50) / 100,  # Normalize RSI
-            symbol_data.get('price_change_1d', 0),
-            symbol_data.get('sma_5', 0) / symbol_data.get('close', 1),
-            symbol_data.get('sma_10', 0) / symbol_data.get('close', 1),
-            symbol_data.get('sma_20', 0) / symbol_data.get('close', 1),
-            symbol_data.get('macd', 0),
-            symbol_data.get('bb_upper', 0) / symbol_data.get('close', 1),
-            symbol_data.get('bb_lower', 0) / symbol_data.get('close', 1),
-        ]
-        
-        return np.array(obs[:10], dtype=np.float32)
+        symbol_data = next(iter(market_state.values()))
+        
+        get = symbol_data.get
+        close = get('close', 0)
+        inv_close = 1.0 / (close or 1)  # Price-relative features, missing close -> 1
+        
+        return np.array((
+            close,
+            get('volume', 0) / 1000000,  # Normalize volume
+            get('rsi', 50) / 100,  # Normalize RSI
+            get('price_change_1d', 0),
+            get('sma_5', 0) * inv_close,
+            get('sma_10', 0) * inv_close,
+            get('sma_20', 0) * inv_close,
+            get('macd', 0),
+            get('bb_upper', 0) * inv_close,
+            get('bb_lower', 0) * inv_close,
+        ), dtype=np.float32)
     
     def train(self, training_data, episodes):
         """Train the RL agent"""
@@ -244,60 +458,42 @@ class RLAgent:
                     return
                     
                 env = TradingEnvironment(symbol_data)
+                if not self._discretizer_fitted and not self.is_trained():
+                    self.fit_discretizer(self._sample_observations(env), self.n_bins)
             else:
                 logger.error("Invalid or empty training data")
                 return
             
-            total_rewards = []
+            total_rewards = np.empty(episodes)
+            completed = 0  # Episodes that finished without error
+            initial_capital = float(env.initial_capital)
+            max_steps = 1000  # Prevent infinite loops
+            episode_steps = min(max_steps, len(env._close))  # Episode ends at the last bar
             
             for episode in range(episodes):
                 try:
-                    state, _ = env.reset()
-                    total_reward = 0
-                    done = False
-                    step_count = 0
-                    max_steps = 1000  # Prevent infinite loops
+                    # Epsilon-greedy randomness for the whole episode in two draws
+                    explore_draws = self._rng.random(episode_steps)
+                    random_actions = self._rng.integers(0, N_ACTIONS, size=episode_steps, dtype=np.int8)
                     
-                    while not done and step_count < max_steps:
-                        state_key = self.get_state_key(state)
-                        
-                        # Epsilon-greedy action selection
-                        if np.random.random() < self.epsilon:
-                            action = np.random.choice(3)
-                        else:
-                            q_values = self.q_table.get(state_key, [0, 0, 0])
-                            action = np.argmax(q_values)
-                        
-                        next_state, reward, done, truncated, _ = env.step(action)
-                        next_state_key = self.get_state_key(next_state)
-                        
-                        # Q-learning update
-                        if state_key not in self.q_table:
-                            self.q_table[state_key] = [0, 0, 0]
-                        
-                        current_q = self.q_table[state_key][action]
-                        next_q_values = self.q_table.get(next_state_key, [0, 0, 0])
-                        max_next_q = max(next_q_values)
-                        
-                        new_q = current_q + self.learning_rate * (
-                            reward + self.discount_factor * max_next_q - current_q
-                        )
-                        self.q_table[state_key][action] = new_q
-                        
-                        state = next_state
-                        total_reward += reward
-                        step_count += 1
-                        
-                        if truncated:
-                            done = True
+                    # Whole episode (env dynamics + Bellman updates) runs in
+                    # the compiled kernel when numba is available
+                    total_reward = _q_learning_episode(
+                        self.q_table, self._visited, self._edges,
+                        env._close, env._volume, env._range, env._sma5, env._ret1,
+                        initial_capital,
+                        float(self.learning_rate), float(self.discount_factor), float(self.epsilon),
+                        explore_draws, random_actions
+                    )
                     
-                    total_rewards.append(total_reward)
+                    total_rewards[completed] = total_reward
+                    completed += 1
                     
                     # Decay epsilon
                     self.epsilon = max(0.01, self.epsilon * 0.995)
                     
                     if episode % 100 == 0:
-                        avg_reward = np.mean(total_rewards[-100:]) if total_rewards else 0
+                        avg_reward = total_rewards[max(0, completed - 100):completed].mean() if completed else 0
                         logger.info(f"Episode {episode}, Average Reward: {avg_reward:.2f}, Epsilon: {self.epsilon:.3f}")
                         
                 except Exception as e:
@@ -306,8 +502,9 @@ class RLAgent:
             
             # Update stats
             self.training_stats['episodes'] += episodes
-            self.training_stats['total_reward'] = sum(total_rewards) if total_rewards else 0
-            self.training_stats['average_reward'] = np.mean(total_rewards) if total_rewards else 0
+            total_rewards = total_rewards[:completed]
+            self.training_stats['total_reward'] = float(total_rewards.sum()) if completed else 0
+            self.training_stats['average_reward'] = float(total_rewards.mean()) if completed else 0
             
             self.save_model()
             logger.info(f"Training completed. Average reward: {self.training_stats['average_reward']:.2f}")
@@ -322,13 +519,28 @@ class RLAgent:
         # Simple backtest implementation
         initial_value = portfolio.get_total_value()
         
-        # Simulate trading over historical data
+        # Simulate trading over historical data: discretize and look up every
+        # bar at once, then hand only the actual trades to the portfolio
         for symbol, df in data.items():
-            for i in range(len(df)):
-                # Create mock market state
-                market_state = {symbol: {'close': df.iloc[i]['Close']}}
-                action = self.get_action(market_state)
-                portfolio.simulate_trade(action)
+            closes = df['Close'].to_numpy(dtype=np.float64)
+            if len(closes) == 0:
+                continue
+            
+            observations = self._closes_to_observations(closes)
+            state_keys = self._discretize(observations) @ self._state_powers
+            action_idx = self.q_table[state_keys].argmax(axis=1)
+            
+            # Epsilon-greedy exploration, drawn for the whole series
+            explore = self._rng.random(len(closes)) < self.epsilon
+            action_idx[explore] = self._rng.integers(0, N_ACTIONS, size=int(explore.sum()))
+            
+            for i in np.flatnonzero(action_idx):
+                portfolio.simulate_trade({
+                    'symbol': symbol,
+                    'type': ACTIONS[action_idx[i]],
+                    'quantity': 10,
+                    'price': closes[i]
+                })
         
         final_value = portfolio.get_total_value()
         
@@ -338,39 +550,48 @@ class RLAgent:
             'return': (final_value / initial_value - 1) * 100
         }
     
+    def _closes_to_observations(self, closes):
+        """Vectorized _market_state_to_observation for close-only market states"""
+        observations = np.zeros((len(closes), 10), dtype=np.float32)
+        observations[:, 0] = closes
+        observations[:, 2] = 0.5  # Default RSI (50) normalized
+        return observations
+    
+    def _discretize(self, observations):
+        """Discretize an observation (or an (N, 10) matrix of them) into bin digits"""
+        observations = np.asarray(observations)
+        return (observations[..., np.newaxis] > self._edges).sum(axis=-1)
+    
     def get_stats(self):
         """Get training statistics"""
         return self.training_stats
     
     def is_trained(self):
         """Check if agent is trained"""
-        return len(self.q_table) > 0
+        return bool(self._visited.any())
     
     def add_experience(self, state, action, reward, next_state, portfolio_value):
         """
         Aggiunge un'esperienza alla memoria
         
         Args:
-            state: Stato
-            action: Azione
+            state: Stato (chiave da get_state_key)
+            action: Azione (nome o indice in ACTIONS)
             reward: Ricompensa
-            next_state: Nuovo stato
+            next_state: Nuovo stato (chiave da get_state_key)
             portfolio_value: Valore del portafoglio
         """
-        experience = {
-            "state": state,
-            "action": action,
-            "reward": reward,
-            "next_state": next_state,
-            "portfolio_value": portfolio_value,
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        self.experiences.append(experience)
-        
-        # Mantieni solo le ultime N esperienze
-        if len(self.experiences) > self.max_experiences:
-            self.experiences.pop(0)
+        # Scrive nello slot corrente: oltre max_experiences sovrascrive la più vecchia
+        i = self._exp_head
+        self._exp_states[i] = state
+        self._exp_actions[i] = _action_index(action)
+        self._exp_rewards[i] = reward
+        self._exp_next_states[i] = next_state
+        self._exp_portfolio_values[i] = portfolio_value
+        self._exp_timestamps[i] = time.monotonic_ns()
+        
+        self._exp_head = (i + 1) % self.max_experiences
+        self._exp_size = min(self._exp_size + 1, self.max_experiences)
         
         # Aggiorna Q-value
         self.update_q_value(state, action, reward, next_state)
@@ -382,37 +603,43 @@ class RLAgent:
         Args:
             batch_size: Dimensione del batch per il replay
         """
-        if len(self.experiences) < batch_size:
+        if self._exp_size < batch_size:
             return
         
-        # Seleziona esperienze casuali
-        batch = np.random.choice(self.experiences, batch_size, replace=False)
+        # Seleziona indici casuali distinti (senza reinserimento)
+        batch = self._rng.choice(self._exp_size, batch_size, replace=False)
+        
+        states = self._exp_states[batch]
+        actions = self._exp_actions[batch]
+        rewards = self._exp_rewards[batch]
+        next_states = self._exp_next_states[batch]
         
-        for exp in batch:
-            self.update_q_value(exp["state"], exp["action"], exp["reward"], exp["next_state"])
+        # Aggiornamento di Bellman sull'intero batch; np.add.at accumula
+        # correttamente le coppie stato-azione ripetute
+        max_next_q = self.q_table[next_states].max(axis=1)
+        td_error = rewards + self.discount_factor * max_next_q - self.q_table[states, actions]
+        np.add.at(self.q_table, (states, actions), self.learning_rate * td_error)
+        self._visited[states] = True
     
     def update_q_value(self, state, action, reward, next_state):
         """
         Aggiorna il Q-value usando l'equazione di Bellman
         
         Args:
-            state: Stato precedente
-            action: Azione eseguita
+            state: Stato precedente (chiave da get_state_key)
+            action: Azione eseguita ('hold', 'buy', 'sell' o indice in ACTIONS)
             reward: Ricompensa ricevuta
-            next_state: Nuovo stato
+            next_state: Nuovo stato (chiave da get_state_key)
         """
-        if state not in self.q_table:
-            self.q_table[state] = {"buy": 0.0, "hold": 0.0, "sell": 0.0}
-        
-        if next_state not in self.q_table:
-            self.q_table[next_state] = {"buy": 0.0, "hold": 0.0, "sell": 0.0}
+        action_idx = _action_index(action)
         
         # Q-learning update
-        current_q = self.q_table[state][action]
-        max_next_q = max(self.q_table[next_state].values())
+        current_q = self.q_table[state, action_idx]
+        max_next_q = self.q_table[next_state].max()
         
         new_q = current_q + self.learning_rate * (reward + self.discount_factor * max_next_q - current_q)
-        self.q_table[state][action] = new_q
+        self.q_table[state, action_idx] = new_q
+        self._visited[state] = True
     
     def calculate_reward(self, action, price_change_pct, portfolio_performance):
         """
@@ -450,16 +677,13 @@ class RLAgent:
         Returns:
             dict: Statistiche
         """
-        total_states = len(self.q_table)
-        total_experiences = len(self.experiences)
+        total_states = int(self._visited.sum())
+        total_experiences = self._exp_size
         
         # Calcola la confidence media
         avg_confidence = 0
         if total_states > 0:
-            all_q_values = []
-            for state_actions in self.q_table.values():
-                all_q_values.extend(state_actions.values())
-            avg_confidence = np.mean(np.abs(all_q_values)) if all_q_values else 0
+            avg_confidence = float(np.abs(self.q_table[self._visited]).mean())
         
         return {
             "total_states": total_states,
@@ -10,13 +10,42 @@ Due AI cooperanti:
 import os
 import sys
 import json
+import re
 import time
 import asyncio
 import threading
 import logging
 import signal
+import io
+import xml.etree.ElementTree as ET
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
 from datetime import datetime
 from pathlib import Path
+from types import MappingProxyType
+
+import numpy as np
+import requests
+
+try:
+    import feedparser
+    FEEDPARSER_AVAILABLE = True
+except ImportError:
+    FEEDPARSER_AVAILABLE = False
+
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+try:
+    import data_collector
+    DATA_COLLECTOR_AVAILABLE = True
+except ImportError as e:
+    DATA_COLLECTOR_AVAILABLE = False
+    _data_collector_error = e
 
 # Configurazione logging
 log_dir = Path("data")
@@ -32,32 +61,119 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+class TTLCache:
+    """Memoizza una funzione per pochi secondi, con chiave sugli argomenti
+    
+    Ogni chiamata riceve una copia del valore memorizzato (se ha copy()),
+    così chi modifica il DataFrame restituito non altera quello degli altri.
+    """
+    
+    def __init__(self, func, max_age=8.0):
+        self.func = func
+        self.max_age = max_age
+        self._entries = {}  # {(args, kwargs ordinati): (timestamp, valore)}
+        self._lock = threading.Lock()
+    
+    def __call__(self, *args, **kwargs):
+        key = (args, tuple(sorted(kwargs.items())))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and now - entry[0] < self.max_age:
+            return self._copy(entry[1])
+        
+        value = self.func(*args, **kwargs)
+        # I fallimenti non vengono memorizzati: la chiamata successiva riprova
+        if value is not None:
+            with self._lock:
+                self._entries[key] = (now, value)
+        return self._copy(value)
+    
+    @staticmethod
+    def _copy(value):
+        return value.copy() if hasattr(value, 'copy') else value
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+# Pool condivisi per l'I/O HTTP bloccante, fuori dall'event loop. I thread
+# partono solo al primo uso; all'uscita dell'interprete concurrent.futures li
+# attende, main() li chiude prima a fine sessione
+_PRICE_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix='price-fetch')
+_RSS_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix='rss-fetch')
+
+def _shutdown_executors():
+    """Chiude i pool di fetch (le richieste in coda vengono annullate)"""
+    for executor in (_PRICE_EXECUTOR, _RSS_EXECUTOR):
+        executor.shutdown(wait=False, cancel_futures=True)
+
+@cache
+def _load_config():
+    """Configurazione di produzione, letta e parsata una sola volta per processo"""
+    return json_loads(Path('config/production_settings.json').read_bytes())
+
+class FixedRateTimer:
+    """Cadenza fissa: i tick cadono su t0 + n*period, senza deriva dovuta alla durata del lavoro"""
+    
+    def __init__(self, period, name):
+        self.period = period
+        self.name = name
+        self._t0 = time.monotonic()
+        self._n = 0
+    
+    @property
+    def deadline(self):
+        """Istante (time.monotonic) del prossimo tick"""
+        return self._t0 + self._n * self.period
+    
+    def advance(self):
+        """Passa al tick successivo, saltando quelli già persi invece di recuperarli in raffica"""
+        self._n += 1
+        late = time.monotonic() - self.deadline
+        if late > 0:
+            logger.warning("⏱️ %s: tick in ritardo di %.2fs", self.name, late)
+            self._n += int(late // self.period)
+    
+    def delay(self):
+        """Secondi da attendere fino al prossimo tick"""
+        self.advance()
+        return max(0.0, self.deadline - time.monotonic())
+
 class SimpleMemory:
-    """Memoria condivisa semplificata"""
+    """Memoria condivisa semplificata
+    
+    Prezzi e sentiment sono pubblicati sostituendo il riferimento (assegnazione
+    atomica sotto il GIL): i lettori non prendono mai il lock. Il lock protegge
+    solo lo storico dei trade.
+    """
     def __init__(self):
-        self.prices = {}
+        self._prices_snapshot = MappingProxyType({})
         self.news_sentiment = 0.0
         self.last_news_update = None
-        self.trades = []
+        self.trades = deque(maxlen=50)  # Mantiene solo gli ultimi 50 trade
         self.lock = threading.Lock()
     
+    @property
+    def prices(self):
+        return self._prices_snapshot
+    
+    def get_prices(self):
+        """Snapshot immutabile degli ultimi prezzi, senza lock"""
+        return self._prices_snapshot
+    
     def update_prices(self, prices):
-        with self.lock:
-            self.prices = prices
-            logger.debug(f"📊 {len(prices)} prezzi aggiornati")
+        self._prices_snapshot = MappingProxyType(dict(prices))
+        logger.debug("📊 %d prezzi aggiornati", len(prices))
     
     def update_news(self, sentiment, articles_count):
-        with self.lock:
-            self.news_sentiment = sentiment
-            self.last_news_update = datetime.now()
-            logger.info(f"📰 Sentiment: {sentiment:.3f} ({articles_count} articoli)")
+        self.news_sentiment = sentiment
+        self.last_news_update = datetime.now()
+        logger.info("📰 Sentiment: %.3f (%d articoli)", sentiment, articles_count)
     
     def add_trade(self, trade):
         with self.lock:
             self.trades.append(trade)
-            # Mantieni solo gli ultimi 50 trade
-            if len(self.trades) > 50:
-                self.trades = self.trades[-50:]
 
 class FastPriceCollector:
     """Raccoglie prezzi velocemente CON DATI REALI"""
@@ -76,42 +192,51 @@ class FastPriceCollector:
         
         # Fallback al sistema esistente
         try:
-            import data_collector
-            import json
-            with open('config/production_settings.json') as f:
-                config = json.load(f)
-            # Disabilita cache per dati freschi
-            config['data']['cache_enabled'] = False
+            if not DATA_COLLECTOR_AVAILABLE:
+                raise _data_collector_error
+            config = _load_config()
+            # Disabilita cache per dati freschi (copia: la config in cache resta intatta)
+            config = {**config, 'data': {**config['data'], 'cache_enabled': False}}
             self.collector = data_collector.DataCollector(config)
+            # Letture ripetute entro pochi secondi (retry, dashboard) servite dalla memoria
+            self.collector.get_stock_data = TTLCache(self.collector.get_stock_data, max_age=8.0)
             logger.info("✅ Fallback Data Collector caricato")
         except Exception as e:
             logger.error(f"❌ Errore caricamento fallback collector: {e}")
             self.collector = None
     
-    def get_current_prices(self):
+    def _fetch_price(self, symbol):
+        """Ultimo prezzo di chiusura di un simbolo dal collector di fallback"""
+        try:
+            data = self.collector.get_stock_data(symbol)
+            if data is not None and not data.empty:
+                current_price = float(data.iloc[-1]['Close'])
+                logger.debug("✅ %s: €%.2f", symbol, current_price)
+                return current_price
+        except Exception as e:
+            logger.debug("⚠️ Errore %s: %s", symbol, e)
+        return None
+    
+    async def get_current_prices(self):
         """Ottiene prezzi correnti REALI"""
         prices = {}
+        loop = asyncio.get_running_loop()
         
         # USA PRIORITARIAMENTE IL COLLECTOR REAL-TIME
         if self.realtime_collector:
             try:
-                prices = self.realtime_collector.get_all_current_prices()
-                logger.debug(f"🔴 PREZZI REAL-TIME ottenuti per {len(prices)} simboli")
+                prices = await loop.run_in_executor(_PRICE_EXECUTOR, self.realtime_collector.get_all_current_prices)
+                logger.debug("🔴 PREZZI REAL-TIME ottenuti per %d simboli", len(prices))
                 return prices
             except Exception as e:
-                logger.warning(f"⚠️ Errore real-time collector: {e}, usando fallback")
+                logger.warning("⚠️ Errore real-time collector: %s, usando fallback", e)
         
-        # Fallback al sistema esistente
+        # Fallback al sistema esistente: tutti i simboli in parallelo
         if self.collector:
-            for symbol in self.symbols:
-                try:
-                    data = self.collector.get_stock_data(symbol)
-                    if data is not None and not data.empty:
-                        current_price = float(data.iloc[-1]['Close'])
-                        prices[symbol] = current_price
-                        logger.debug(f"✅ {symbol}: €{current_price:.2f}")
-                except Exception as e:
-                    logger.debug(f"⚠️ Errore {symbol}: {e}")
+            results = await asyncio.gather(
+                *(loop.run_in_executor(_PRICE_EXECUTOR, self._fetch_price, symbol) for symbol in self.symbols)
+            )
+            prices = {symbol: price for symbol, price in zip(self.symbols, results) if price is not None}
         
         # Ultimate fallback - prezzi simulati
         if not prices:
@@ -128,34 +253,97 @@ class FastPriceCollector:
 class SimpleNewsCollector:
     """Raccoglie e analizza news"""
     
+    POSITIVE_WORDS = ['crescita', 'record', 'positivo', 'rialzo', 'guadagni', 'profitti', 'rally']
+    NEGATIVE_WORDS = ['calo', 'perdite', 'ribasso', 'crisi', 'crollo', 'deludenti', 'incertezza']
+    
     def __init__(self):
         self.rss_feeds = [
             "https://feeds.finance.yahoo.com/rss/2.0/headline",
             "https://feeds.reuters.com/reuters/businessNews",
             "https://www.investing.com/rss/news.rss"
         ]
+        self.session = requests.Session()
+        # {feed_url: {'etag', 'modified', 'articles'}} per GET condizionali
+        self._feed_etag = {}
+        # Una sola scansione in C per articolo invece di un `in` per parola
+        self._pos_re = re.compile('|'.join(map(re.escape, self.POSITIVE_WORDS)))
+        self._neg_re = re.compile('|'.join(map(re.escape, self.NEGATIVE_WORDS)))
+        self._vocabulary = tuple(self.POSITIVE_WORDS + self.NEGATIVE_WORDS)
     
-    def collect_news(self):
-        """Raccoglie news da RSS feeds"""
-        articles = []
+    def _fetch_feed(self, feed_url):
+        """Scarica e parsa un feed; se il server risponde 304 riusa gli articoli precedenti"""
+        cached = self._feed_etag.get(feed_url)
+        headers = {}
+        if cached:
+            if cached['etag']:
+                headers['If-None-Match'] = cached['etag']
+            if cached['modified']:
+                headers['If-Modified-Since'] = cached['modified']
+        
+        response = self.session.get(feed_url, headers=headers, timeout=5)
+        if response.status_code == 304 and cached:
+            return cached['articles']
+        response.raise_for_status()
         
         try:
-            import feedparser
+            articles = self._parse_first_items(response.content, feed_url)
+        except ET.ParseError:
+            # XML malformato: feedparser è più tollerante
+            feed = feedparser.parse(response.content)
+            articles = [{
+                'title': entry.get('title', ''),
+                'description': entry.get('description', ''),
+                'published': entry.get('published', ''),
+                'source': feed_url
+            } for entry in feed.entries[:5]]  # Prime 5 per feed
+        
+        self._feed_etag[feed_url] = {
+            'etag': response.headers.get('ETag'),
+            'modified': response.headers.get('Last-Modified'),
+            'articles': articles
+        }
+        return articles
+    
+    @staticmethod
+    def _parse_first_items(content, feed_url, limit=5):
+        """Estrae i primi `limit` item RSS/entry Atom in streaming, senza parsare il resto del feed"""
+        articles = []
+        for _, elem in ET.iterparse(io.BytesIO(content), events=('end',)):
+            if elem.tag.rsplit('}', 1)[-1] not in ('item', 'entry'):
+                continue
             
-            for feed_url in self.rss_feeds:
-                try:
-                    feed = feedparser.parse(feed_url)
-                    for entry in feed.entries[:5]:  # Prime 5 per feed
-                        articles.append({
-                            'title': entry.get('title', ''),
-                            'description': entry.get('description', ''),
-                            'published': entry.get('published', ''),
-                            'source': feed_url
-                        })
-                except Exception as e:
-                    logger.debug(f"Errore feed {feed_url}: {e}")
-                    
-        except ImportError:
+            # Testo dei figli per nome locale (gli elementi Atom hanno un namespace)
+            fields = {}
+            for child in elem:
+                fields.setdefault(child.tag.rsplit('}', 1)[-1], (child.text or '').strip())
+            articles.append({
+                'title': fields.get('title', ''),
+                'description': fields.get('description') or fields.get('summary', ''),
+                'published': fields.get('pubDate') or fields.get('published', ''),
+                'source': feed_url
+            })
+            elem.clear()
+            if len(articles) == limit:
+                break
+        return articles
+    
+    async def collect_news(self):
+        """Raccoglie news da RSS feeds (tutti i feed in parallelo)"""
+        articles = []
+        
+        if FEEDPARSER_AVAILABLE:
+            loop = asyncio.get_running_loop()
+            results = await asyncio.gather(
+                *(loop.run_in_executor(_RSS_EXECUTOR, self._fetch_feed, feed_url) for feed_url in self.rss_feeds),
+                return_exceptions=True
+            )
+            for feed_url, result in zip(self.rss_feeds, results):
+                if isinstance(result, Exception):
+                    logger.debug("Errore feed %s: %s", feed_url, result)
+                else:
+                    articles.extend(result)
+        
+        else:
             logger.warning("⚠️ feedparser non disponibile, notizie simulate")
             # News simulate con sentiment variabile
             import random
@@ -181,31 +369,39 @@ class SimpleNewsCollector:
                     'sentiment_score': sentiment_value  # Per debug
                 })
         
+        for article in articles:
+            self._article_text(article)
+        
         return articles
     
+    @staticmethod
+    def _article_text(article):
+        """Titolo + descrizione in minuscolo, calcolato una sola volta e salvato in '_text'"""
+        text = article.get('_text')
+        if text is None:
+            text = article['_text'] = (article.get('title', '') + ' ' + article.get('description', '')).lower()
+        return text
+    
     def analyze_sentiment(self, articles):
         """Analisi sentiment semplificata"""
         if not articles:
             return 0.0
         
-        positive_words = ['crescita', 'record', 'positivo', 'rialzo', 'guadagni', 'profitti', 'rally']
-        negative_words = ['calo', 'perdite', 'ribasso', 'crisi', 'crollo', 'deludenti', 'incertezza']
+        n_articles = len(articles)
+        # Pre-filtro esatto: un articolo senza nessuna parola del vocabolario vale 0,
+        # quindi si salta la scansione regex (la maggior parte delle news generiche)
+        texts = [text for text in map(self._article_text, articles)
+                 if any(word in text for word in self._vocabulary)]
         
-        total_sentiment = 0.0
+        # Parole distinte presenti, come nel conteggio originale per sottostringa
+        positive_counts = np.fromiter((len(set(self._pos_re.findall(text))) for text in texts), dtype=np.int32, count=len(texts))
+        negative_counts = np.fromiter((len(set(self._neg_re.findall(text))) for text in texts), dtype=np.int32, count=len(texts))
         
-        for article in articles:
-            text = (article.get('title', '') + ' ' + article.get('description', '')).lower()
-            
-            positive_count = sum(1 for word in positive_words if word in text)
-            negative_count = sum(1 for word in negative_words if word in text)
-            
-            if positive_count > negative_count:
-                total_sentiment += 0.1
-            elif negative_count > positive_count:
-                total_sentiment -= 0.1
+        # +0.1 per articolo positivo, -0.1 per negativo, 0 se in pareggio
+        scores = np.sign(positive_counts - negative_counts) * 0.1
         
         # Normalizza tra -1 e 1
-        return max(-1.0, min(1.0, total_sentiment / len(articles)))
+        return float(np.clip(scores.sum() / n_articles, -1.0, 1.0))
 
 class SimpleTradingLogic:
     """Logica di trading semplificata"""
@@ -269,7 +465,7 @@ class SimpleTradingLogic:
             self.portfolio_value -= cost
             self.trade_count += 1
             
-            logger.info(f"💰 ACQUISTO: {max_shares} {symbol} a €{price:.2f} (Costo: €{cost:.2f}, Tot: {self.positions[symbol]})")
+            logger.info("💰 ACQUISTO: %d %s a €%.2f (Costo: €%.2f, Tot: %s)", max_shares, symbol, price, cost, self.positions[symbol])
             return True
             
         elif action == 'SELL' and self.positions.get(symbol, 0) > 0:
@@ -280,118 +476,169 @@ class SimpleTradingLogic:
             self.portfolio_value += revenue
             self.trade_count += 1
             
-            logger.info(f"💰 VENDITA: {shares_to_sell} {symbol} a €{price:.2f} (Ricavo: €{revenue:.2f})")
+            logger.info("💰 VENDITA: %s %s a €%.2f (Ricavo: €%.2f)", shares_to_sell, symbol, price, revenue)
             return True
         
         return False
     
     def get_portfolio_value(self, current_prices):
-        """Calcola valore attuale portfolio"""
-        total_value = self.portfolio_value  # Cash
+        """Calcola valore attuale portfolio (cash + prodotto scalare quantità × prezzi)"""
+        if not self.positions:
+            return self.portfolio_value
         
-        for symbol, quantity in self.positions.items():
-            if symbol in current_prices and quantity > 0:
-                total_value += quantity * current_prices[symbol]
+        n = len(self.positions)
+        quantities = np.fromiter(self.positions.values(), dtype=np.float64, count=n)
+        # Simboli senza prezzo corrente valgono 0, come posizioni chiuse
+        prices = np.fromiter((current_prices.get(symbol, 0.0) for symbol in self.positions), dtype=np.float64, count=n)
         
-        return total_value
+        return self.portfolio_value + float(np.dot(np.maximum(quantities, 0.0), prices))
 
-async def price_ai_loop(memory, price_collector, trading_logic):
-    """Loop Price AI (ogni 10 secondi)"""
-    logger.info("🚀 Price AI avviata (10s cicli)")
-    previous_prices = {}
+async def price_ai_tick(memory, price_collector, trading_logic, previous_prices):
+    """Un ciclo della Price AI; restituisce i prezzi da usare come precedenti al ciclo successivo"""
+    start_time = time.time()
     
-    while True:
-        try:
-            start_time = time.time()
-            
-            # Ottieni prezzi
-            current_prices = price_collector.get_current_prices()
+    # Ottieni prezzi
+    current_prices = await price_collector.get_current_prices()
+    
+    if current_prices:
+        memory.update_prices(current_prices)
+        
+        # Prendi decisioni per ogni simbolo
+        decisions = []
+        news_sentiment = memory.news_sentiment
+        
+        # Le righe del tick vengono emesse in un solo record di log, formattato
+        # dal logging solo se il livello INFO è attivo
+        log_lines = ["🤖 === ANALISI AI PER %d SIMBOLI ==="]
+        log_args = [len(current_prices)]
+        
+        for symbol, price in current_prices.items():
+            prev_price = previous_prices.get(symbol, price)
             
-            if current_prices:
-                memory.update_prices(current_prices)
-                
-                # Prendi decisioni per ogni simbolo
-                decisions = []
-                news_sentiment = memory.news_sentiment
-                
-                logger.info(f"🤖 === ANALISI AI PER {len(current_prices)} SIMBOLI ===")
-                
-                for symbol, price in current_prices.items():
-                    prev_price = previous_prices.get(symbol, price)
-                    
-                    decision = trading_logic.make_decision(
-                        symbol, price, prev_price, news_sentiment
-                    )
-                    
-                    # LOG DETTAGLIATO DELLE DECISIONI AI
-                    price_change_pct = decision['price_change'] * 100
-                    logger.info(f"🧠 {symbol}: €{price:.2f} | Δ{price_change_pct:+.2f}% | News:{news_sentiment:+.3f} | Score:{decision['score']:+.3f} → {decision['action']}")
-                    
-                    if decision['action'] != 'HOLD':
-                        decisions.append(decision)
-                        logger.info(f"🎯 SEGNALE TRADING: {symbol} → {decision['action']} (score: {decision['score']:.3f})")
-                
-                if not decisions:
-                    logger.info("📋 Nessun segnale di trading generato (tutti HOLD)")
-                else:
-                    logger.info(f"🚨 {len(decisions)} SEGNALI ATTIVI per esecuzione")
-                
-                # Esegui trades
-                for decision in decisions:
-                    if trading_logic.execute_trade(decision):
-                        memory.add_trade(decision)
-                
-                # Portfolio update
-                portfolio_value = trading_logic.get_portfolio_value(current_prices)
-                profit_pct = ((portfolio_value - 1000) / 1000) * 100
-                
-                # Mostra posizioni se ci sono trade
-                if trading_logic.trade_count > 0:
-                    positions_str = ", ".join([f"{sym}:{qty}" for sym, qty in trading_logic.positions.items() if qty > 0])
-                    if positions_str:
-                        logger.info(f"📊 Portfolio: €{portfolio_value:.2f} ({profit_pct:+.2f}%) | Trades: {trading_logic.trade_count} | Posizioni: {positions_str}")
-                    else:
-                        logger.info(f"📊 Portfolio: €{portfolio_value:.2f} ({profit_pct:+.2f}%) | Trades: {trading_logic.trade_count} | Cash: €{trading_logic.portfolio_value:.2f}")
-                else:
-                    logger.info(f"📊 Portfolio: €{portfolio_value:.2f} ({profit_pct:+.2f}%) | Trades: {trading_logic.trade_count}")
-                
-                previous_prices = current_prices.copy()
+            # Con |Δ| <= 0.2% lo score è solo 0.3 * sentiment, che non supera mai
+            # la soglia 0.3: HOLD garantito senza chiamare make_decision
+            price_change = (price - prev_price) / prev_price if prev_price else 0.0
+            if abs(price_change) <= 0.002 and abs(news_sentiment) <= 1.0:
+                log_lines.append("🧠 %s: €%.2f | Δ%+.2f%% | News:%+.3f | Score:%+.3f → HOLD")
+                log_args += [symbol, price, price_change * 100, news_sentiment, 0.3 * news_sentiment]
+                continue
             
-            elapsed = time.time() - start_time
-            logger.debug(f"⏱️ Price AI ciclo: {elapsed:.2f}s")
+            decision = trading_logic.make_decision(
+                symbol, price, prev_price, news_sentiment
+            )
             
-            await asyncio.sleep(10)
+            # LOG DETTAGLIATO DELLE DECISIONI AI
+            price_change_pct = decision['price_change'] * 100
+            log_lines.append("🧠 %s: €%.2f | Δ%+.2f%% | News:%+.3f | Score:%+.3f → %s")
+            log_args += [symbol, price, price_change_pct, news_sentiment, decision['score'], decision['action']]
             
+            if decision['action'] != 'HOLD':
+                decisions.append(decision)
+                log_lines.append("🎯 SEGNALE TRADING: %s → %s (score: %.3f)")
+                log_args += [symbol, decision['action'], decision['score']]
+        
+        if not decisions:
+            log_lines.append("📋 Nessun segnale di trading generato (tutti HOLD)")
+        else:
+            log_lines.append("🚨 %d SEGNALI ATTIVI per esecuzione")
+            log_args.append(len(decisions))
+        logger.info("\n".join(log_lines), *log_args)
+        
+        # Esegui trades
+        for decision in decisions:
+            if trading_logic.execute_trade(decision):
+                memory.add_trade(decision)
+        
+        # Portfolio update
+        portfolio_value = trading_logic.get_portfolio_value(current_prices)
+        profit_pct = ((portfolio_value - 1000) / 1000) * 100
+        
+        # Mostra posizioni se ci sono trade
+        if trading_logic.trade_count > 0:
+            positions_str = ", ".join([f"{sym}:{qty}" for sym, qty in trading_logic.positions.items() if qty > 0])
+            if positions_str:
+                logger.info("📊 Portfolio: €%.2f (%+.2f%%) | Trades: %d | Posizioni: %s", portfolio_value, profit_pct, trading_logic.trade_count, positions_str)
+            else:
+                logger.info("📊 Portfolio: €%.2f (%+.2f%%) | Trades: %d | Cash: €%.2f", portfolio_value, profit_pct, trading_logic.trade_count, trading_logic.portfolio_value)
+        else:
+            logger.info("📊 Portfolio: €%.2f (%+.2f%%) | Trades: %d", portfolio_value, profit_pct, trading_logic.trade_count)
+        
+        previous_prices = current_prices  # get_current_prices restituisce sempre un dict nuovo
+    
+    elapsed = time.time() - start_time
+    logger.debug("⏱️ Price AI ciclo: %.2fs", elapsed)
+    
+    return previous_prices
+
+async def news_ai_tick(memory, news_collector):
+    """Un ciclo della News AI"""
+    start_time = time.time()
+    
+    # Raccoglie news
+    articles = await news_collector.collect_news()
+    logger.info("📡 Raccolti %d articoli", len(articles))
+    
+    # Analizza sentiment
+    if articles:
+        sentiment = news_collector.analyze_sentiment(articles)
+        memory.update_news(sentiment, len(articles))
+    
+    elapsed = time.time() - start_time
+    logger.info("⏱️ News AI ciclo: %.2fs", elapsed)
+
+async def _wait_next_tick(timer, shutdown_event):
+    """Attende il prossimo tick del timer; False se nel frattempo arriva lo shutdown"""
+    try:
+        await asyncio.wait_for(shutdown_event.wait(), timeout=timer.delay())
+    except asyncio.TimeoutError:
+        return True
+    return False
+
+async def price_ai_loop(memory, price_collector, trading_logic, shutdown_event):
+    """Loop Price AI (ogni 10 secondi)"""
+    logger.info("🚀 Price AI avviata (10s cicli)")
+    previous_prices = {}
+    timer = FixedRateTimer(10, "Price AI")
+    
+    while not shutdown_event.is_set():
+        try:
+            previous_prices = await price_ai_tick(memory, price_collector, trading_logic, previous_prices)
         except Exception as e:
-            logger.error(f"❌ Errore Price AI: {e}")
-            await asyncio.sleep(10)
+            logger.error("❌ Errore Price AI: %s", e)
+        
+        if not await _wait_next_tick(timer, shutdown_event):
+            break
 
-async def news_ai_loop(memory, news_collector):
+async def news_ai_loop(memory, news_collector, shutdown_event):
     """Loop News AI (ogni 10 minuti)"""
     logger.info("📰 News AI avviata (10min cicli)")
+    timer = FixedRateTimer(600, "News AI")
     
-    while True:
+    while not shutdown_event.is_set():
         try:
-            start_time = time.time()
-            
-            # Raccoglie news
-            articles = news_collector.collect_news()
-            logger.info(f"📡 Raccolti {len(articles)} articoli")
-            
-            # Analizza sentiment
-            if articles:
-                sentiment = news_collector.analyze_sentiment(articles)
-                memory.update_news(sentiment, len(articles))
-            
-            elapsed = time.time() - start_time
-            logger.info(f"⏱️ News AI ciclo: {elapsed:.2f}s")
-            
-            # Attende 10 minuti
-            await asyncio.sleep(600)
-            
+            await news_ai_tick(memory, news_collector)
         except Exception as e:
-            logger.error(f"❌ Errore News AI: {e}")
-            await asyncio.sleep(600)
+            logger.error("❌ Errore News AI: %s", e)
+        
+        # Attende il prossimo tick da 10 minuti
+        if not await _wait_next_tick(timer, shutdown_event):
+            break
+
+async def supervisor(memory, price_collector, news_collector, trading_logic, shutdown_event):
+    """Price AI (10s) e News AI (10min) come task indipendenti, ognuno con il proprio timer
+    
+    Un fetch RSS lento non ritarda il tick dei prezzi; allo shutdown i due loop
+    escono da soli, se il supervisor viene cancellato li cancella entrambi.
+    """
+    tasks = [
+        asyncio.create_task(price_ai_loop(memory, price_collector, trading_logic, shutdown_event)),
+        asyncio.create_task(news_ai_loop(memory, news_collector, shutdown_event)),
+    ]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
 
 async def main():
     """Funzione principale"""
@@ -415,17 +662,12 @@ async def main():
     news_collector = SimpleNewsCollector()
     trading_logic = SimpleTradingLogic()
     
-    # Task per i due AI loop
-    price_task = None
-    news_task = None
+    # Task che avvia e cancella le due AI
+    supervisor_task = None
     
     try:
-        # Crea task
-        price_task = asyncio.create_task(
-            price_ai_loop_with_shutdown(memory, price_collector, trading_logic, shutdown_event)
-        )
-        news_task = asyncio.create_task(
-            news_ai_loop_with_shutdown(memory, news_collector, shutdown_event)
+        supervisor_task = asyncio.create_task(
+            supervisor(memory, price_collector, news_collector, trading_logic, shutdown_event)
         )
         
         # Attende fino a shutdown
@@ -434,7 +676,7 @@ async def main():
         logger.info("💾 Salvando stato finale...")
         
         # Mostra stato finale
-        current_prices = price_collector.get_current_prices()
+        current_prices = await price_collector.get_current_prices()
         if current_prices:
             portfolio_value = trading_logic.get_portfolio_value(current_prices)
             profit_pct = ((portfolio_value - 1000) / 1000) * 100
@@ -456,129 +698,12 @@ async def main():
     except Exception as e:
         logger.error(f"❌ Errore durante arresto: {e}")
     finally:
-        # Cancella task se ancora attivi
-        if price_task and not price_task.done():
-            price_task.cancel()
-        if news_task and not news_task.done():
-            news_task.cancel()
+        # Cancella il task se ancora attivo
+        if supervisor_task and not supervisor_task.done():
+            supervisor_task.cancel()
+        _shutdown_executors()
         
         logger.info("🏁 Cleanup completato")
 
-async def price_ai_loop_with_shutdown(memory, price_collector, trading_logic, shutdown_event):
-    """Loop Price AI con gestione shutdown"""
-    logger.info("🚀 Price AI avviata (10s cicli)")
-    previous_prices = {}
-    
-    while not shutdown_event.is_set():
-        try:
-            start_time = time.time()
-            
-            # Ottieni prezzi
-            current_prices = price_collector.get_current_prices()
-            
-            if current_prices:
-                memory.update_prices(current_prices)
-                
-                # Prendi decisioni per ogni simbolo
-                decisions = []
-                news_sentiment = memory.news_sentiment
-                
-                logger.info(f"🤖 === ANALISI AI PER {len(current_prices)} SIMBOLI ===")
-                
-                for symbol, price in current_prices.items():
-                    prev_price = previous_prices.get(symbol, price)
-                    
-                    decision = trading_logic.make_decision(
-                        symbol, price, prev_price, news_sentiment
-                    )
-                    
-                    # LOG DETTAGLIATO DELLE DECISIONI AI
-                    price_change_pct = decision['price_change'] * 100
-                    logger.info(f"🧠 {symbol}: €{price:.2f} | Δ{price_change_pct:+.2f}% | News:{news_sentiment:+.3f} | Score:{decision['score']:+.3f} → {decision['action']}")
-                    
-                    if decision['action'] != 'HOLD':
-                        decisions.append(decision)
-                        logger.info(f"🎯 SEGNALE TRADING: {symbol} → {decision['action']} (score: {decision['score']:.3f})")
-                
-                if not decisions:
-                    logger.info("📋 Nessun segnale di trading generato (tutti HOLD)")
-                else:
-                    logger.info(f"� {len(decisions)} SEGNALI ATTIVI per esecuzione")
-                
-                # Esegui trades
-                for decision in decisions:
-                    if trading_logic.execute_trade(decision):
-                        memory.add_trade(decision)
-                
-                # Portfolio update
-                portfolio_value = trading_logic.get_portfolio_value(current_prices)
-                profit_pct = ((portfolio_value - 1000) / 1000) * 100
-                
-                # Mostra posizioni se ci sono trade
-                if trading_logic.trade_count > 0:
-                    positions_str = ", ".join([f"{sym}:{qty}" for sym, qty in trading_logic.positions.items() if qty > 0])
-                    if positions_str:
-                        logger.info(f"📊 Portfolio: €{portfolio_value:.2f} ({profit_pct:+.2f}%) | Trades: {trading_logic.trade_count} | Posizioni: {positions_str}")
-                    else:
-                        logger.info(f"📊 Portfolio: €{portfolio_value:.2f} ({profit_pct:+.2f}%) | Trades: {trading_logic.trade_count} | Cash: €{trading_logic.portfolio_value:.2f}")
-                else:
-                    logger.info(f"📊 Portfolio: €{portfolio_value:.2f} ({profit_pct:+.2f}%) | Trades: {trading_logic.trade_count}")
-                
-                previous_prices = current_prices.copy()
-            
-            elapsed = time.time() - start_time
-            logger.debug(f"⏱️ Price AI ciclo: {elapsed:.2f}s")
-            
-            # Attende 10 secondi o fino a shutdown
-            try:
-                await asyncio.wait_for(shutdown_event.wait(), timeout=10.0)
-                break  # Shutdown richiesto
-            except asyncio.TimeoutError:
-                pass  # Continua il loop
-            
-        except Exception as e:
-            logger.error(f"❌ Errore Price AI: {e}")
-            try:
-                await asyncio.wait_for(shutdown_event.wait(), timeout=10.0)
-                break
-            except asyncio.TimeoutError:
-                pass
-
-async def news_ai_loop_with_shutdown(memory, news_collector, shutdown_event):
-    """Loop News AI con gestione shutdown"""
-    logger.info("📰 News AI avviata (10min cicli)")
-    
-    while not shutdown_event.is_set():
-        try:
-            start_time = time.time()
-            
-            # Raccoglie news
-            articles = news_collector.collect_news()
-            logger.info(f"📡 Raccolti {len(articles)} articoli")
-            
-            # Analizza sentiment
-            if articles:
-                sentiment = news_collector.analyze_sentiment(articles)
-                memory.update_news(sentiment, len(articles))
-            
-            elapsed = time.time() - start_time
-            logger.info(f"⏱️ News AI ciclo: {elapsed:.2f}s")
-            
-            # Attende 10 minuti o fino a shutdown (in chunk da 30s per responsività)
-            for _ in range(20):  # 20 x 30s = 600s = 10min
-                try:
-                    await asyncio.wait_for(shutdown_event.wait(), timeout=30.0)
-                    return  # Shutdown richiesto
-                except asyncio.TimeoutError:
-                    pass  # Continua
-            
-        except Exception as e:
-            logger.error(f"❌ Errore News AI: {e}")
-            try:
-                await asyncio.wait_for(shutdown_event.wait(), timeout=30.0)
-                break
-            except asyncio.TimeoutError:
-                pass
-
 if __name__ == "__main__":
     asyncio.run(main())
@@ -4,12 +4,13 @@ Smart Trading System con AI Training integrato
 Sistema completo che può training e trading
 """
 
-import os
 import sys
 import json
 import argparse
 import asyncio
+import subprocess
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
@@ -22,12 +23,28 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+from ai_background_trainer import AIKnowledgeBase
+
 class SmartTradingSystem:
     """Sistema di trading intelligente con AI training"""
     
     def __init__(self):
         self.knowledge_base_path = "../logs/training/ai_knowledge_latest.pkl"  # Corretto path
         self.is_trained = False
+        self._kb_cache = None  # (mtime, AIKnowledgeBase) dell'ultimo file caricato
+        self._dash_proc = None
+    
+    def _load_knowledge_base(self, kb_path):
+        """Carica la knowledge base, riusando quella in memoria se il file non è cambiato"""
+        mtime = kb_path.stat().st_mtime
+        if self._kb_cache and self._kb_cache[0] == mtime:
+            return self._kb_cache[1]
+        
+        kb = AIKnowledgeBase()
+        if not kb.load_knowledge_base(kb_path):
+            return None
+        self._kb_cache = (mtime, kb)
+        return kb
         
     def check_ai_readiness(self):
         """Controlla se l'AI è stata addestrata"""
@@ -35,9 +52,8 @@ class SmartTradingSystem:
         
         if kb_path.exists():
             # Controlla età e qualità della knowledge base
-            from ai_background_trainer import AIKnowledgeBase
-            kb = AIKnowledgeBase()
-            if kb.load_knowledge_base(kb_path):
+            kb = self._load_knowledge_base(kb_path)
+            if kb is not None:
                 # Verifica requisiti minimi
                 min_observations = 1000
                 min_accuracy = 0.4  # 40% minimo
@@ -80,7 +96,8 @@ class SmartTradingSystem:
     
     async def start_trading(self, mode='normal'):
         """Avvia trading con AI addestrata"""
-        if not self.check_ai_readiness():
+        # La verifica legge il pickle da disco: fuori dall'event loop
+        if not await asyncio.to_thread(self.check_ai_readiness):
             logger.error("❌ AI non pronta per trading! Eseguire prima il training.")
             return False
         
@@ -88,18 +105,38 @@ class SmartTradingSystem:
         
         if mode == 'aggressive':
             from aggressive_trader import main as aggressive_main
-            # Nota: aggressive_main() è sincrono, quindi lo wrapppiamo
-            await asyncio.get_event_loop().run_in_executor(None, aggressive_main)
+            # Nota: aggressive_main() è sincrono, quindi gira su un thread dedicato
+            loop = asyncio.get_running_loop()
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix='aggr') as executor:
+                await loop.run_in_executor(executor, aggressive_main)
         else:
             # Avvia dual AI normale
             from simple_dual_ai import main as dual_ai_main
             await dual_ai_main()
     
     def start_dashboard(self):
-        """Avvia dashboard live"""
+        """Avvia dashboard live in un processo separato e ritorna subito"""
         logger.info("📊 Avvio dashboard live...")
         dashboard_path = Path(__file__).parent.parent / "dashboard" / "live_dashboard.py"
-        os.system(f"cd {dashboard_path.parent} && python -m streamlit run live_dashboard.py --server.port 8501")
+        self._dash_proc = subprocess.Popen(
+            [sys.executable, '-m', 'streamlit', 'run', dashboard_path.name, '--server.port', '8501'],
+            cwd=str(dashboard_path.parent),
+            start_new_session=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.STDOUT
+        )
+        logger.info(f"🌐 Dashboard su http://localhost:8501 (PID {self._dash_proc.pid})")
+        return self._dash_proc
+    
+    def stop_dashboard(self):
+        """Termina la dashboard avviata da start_dashboard"""
+        if self._dash_proc and self._dash_proc.poll() is None:
+            self._dash_proc.terminate()
+            try:
+                self._dash_proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._dash_proc.kill()
+        self._dash_proc = None
 
 def main():
     """Funzione principale"""
@@ -142,7 +179,11 @@ def main():
             system.check_ai_readiness()
         
         elif args.command == 'dashboard':
-            system.start_dashboard()
+            # Da CLI resta in primo piano finché la dashboard è attiva
+            try:
+                system.start_dashboard().wait()
+            finally:
+                system.stop_dashboard()
         
         elif args.command == 'auto':
             async def auto_sequence():
@@ -6,25 +6,425 @@ Analisi tecnica e generazione segnali di trading
 
 import pandas as pd
 import numpy as np
+import copy
+import functools
 import json
 import logging
+from collections import OrderedDict, deque
 from typing import Dict, List, Optional
-import ta
+
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+try:
+    from numba import njit, types
+    NUMBA_AVAILABLE = True
+    
+    # Firme esplicite: i kernel vengono compilati all'import (o riletti dalla
+    # cache su disco), mai al primo segnale. Gli array devono essere C-contigui,
+    # float64 o float32 (vedi _kernel_array)
+    _STATE = types.UniTuple(types.float64, 9)
+    _ARRAYS_1D = (types.float64[::1], types.float32[::1])
+    _SIG_RECURSIVE_INIT = _STATE(types.float64)
+    _SIG_RECURSIVE_STEP = _STATE(_STATE, types.float64, types.float64, types.int64)
+    _SIG_RECURSIVE_STATE = [_STATE(arr) for arr in _ARRAYS_1D]
+    _SIG_RECURSIVE_OUTPUTS = types.UniTuple(types.float64, 5)(_STATE)
+    _SIG_FUSED_LAST = [types.UniTuple(types.float64, 11)(arr) for arr in _ARRAYS_1D]
+    _SIG_RECURSIVE_BATCH = [types.float64[:, ::1](arr) for arr in (types.float64[:, ::1], types.float32[:, ::1])]
+    _SIG_SMA3_SIDE = [types.int64(arr) for arr in _ARRAYS_1D]
+except ImportError:
+    NUMBA_AVAILABLE = False
+    _SIG_RECURSIVE_INIT = _SIG_RECURSIVE_STEP = _SIG_RECURSIVE_STATE = None
+    _SIG_RECURSIVE_OUTPUTS = _SIG_FUSED_LAST = _SIG_RECURSIVE_BATCH = _SIG_SMA3_SIDE = None
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit: kernels run as plain Python"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
 
 logger = logging.getLogger(__name__)
 
+# Gli indicatori servono solo all'ultima barra: i kernel seguenti calcolano
+# direttamente il valore finale con le stesse ricorsioni di `ta`/pandas,
+# senza costruire le serie storiche complete. `fastmath` abilita solo FMA e
+# riassociazione: NaN e infiniti restano gestiti come in NumPy.
+# Il modulo va importato con un solo nome (`strategy_engine`, con src/ nel
+# path): la cache su disco dei kernel è condivisa dai due nomi del modulo.
+_FASTMATH = {'contract', 'reassoc'}
+
+# Le ricorsioni (RSI di Wilder 14, MACD 12/26/9, EMA 12/26 con pesi normalizzati
+# come Series.ewm) esistono una sola volta, in _recursive_init/_recursive_step:
+# lo stato è la tupla
+# (avg_gain, avg_loss, ema_fast, ema_slow, macd_signal, num12, den12, num26, den26)
+# e serve sia al calcolo su tutta la serie sia all'aggiornamento di RollingState.
+
+@njit(_SIG_RECURSIVE_INIT, cache=True, fastmath=_FASTMATH)
+def _recursive_init(x):
+    """Stato delle ricorsioni dopo la prima barra (close x)"""
+    return (0.0, 0.0, x, x, 0.0, x, 1.0, x, 1.0)
+
+@njit(_SIG_RECURSIVE_STEP, cache=True, fastmath=_FASTMATH)
+def _recursive_step(state, prev, x, i):
+    """Stato delle ricorsioni dopo la barra i (i >= 1) con close x e close precedente prev"""
+    a_rsi = 1.0 / 14.0
+    a_fast = 2.0 / 13.0
+    a_slow = 2.0 / 27.0
+    a_signal = 2.0 / 10.0
+    avg_gain, avg_loss, ema_fast, ema_slow, macd_signal, num12, den12, num26, den26 = state
+    
+    diff = x - prev
+    gain = diff if diff > 0.0 else 0.0
+    loss = -diff if diff < 0.0 else 0.0
+    avg_gain = (1.0 - a_rsi) * avg_gain + a_rsi * gain
+    avg_loss = (1.0 - a_rsi) * avg_loss + a_rsi * loss
+    ema_fast = (1.0 - a_fast) * ema_fast + a_fast * x
+    ema_slow = (1.0 - a_slow) * ema_slow + a_slow * x
+    if i == 25:
+        # Prima barra con MACD definito: la linea di segnale parte da qui
+        macd_signal = ema_fast - ema_slow
+    elif i >= 26:
+        macd_signal = (1.0 - a_signal) * macd_signal + a_signal * (ema_fast - ema_slow)
+    num12 = num12 * (1.0 - a_fast) + x
+    den12 = den12 * (1.0 - a_fast) + 1.0
+    num26 = num26 * (1.0 - a_slow) + x
+    den26 = den26 * (1.0 - a_slow) + 1.0
+    return (avg_gain, avg_loss, ema_fast, ema_slow, macd_signal, num12, den12, num26, den26)
+
+@njit(_SIG_RECURSIVE_STATE, cache=True, fastmath=_FASTMATH)
+def _recursive_state(close):
+    """Stato delle ricorsioni dopo l'ultima barra di close"""
+    state = _recursive_init(np.float64(close[0]))
+    for i in range(1, close.shape[0]):
+        state = _recursive_step(state, np.float64(close[i - 1]), np.float64(close[i]), i)
+    return state
+
+@njit(_SIG_RECURSIVE_OUTPUTS, cache=True, fastmath=_FASTMATH)
+def _recursive_outputs(state):
+    """(rsi, macd, macd_signal, ema_12, ema_26) da uno stato delle ricorsioni"""
+    avg_gain, avg_loss, ema_fast, ema_slow, macd_signal, num12, den12, num26, den26 = state
+    if avg_loss == 0.0:
+        rsi = 100.0
+    else:
+        rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return (rsi, ema_fast - ema_slow, macd_signal, num12 / den12, num26 / den26)
+
+@njit(_SIG_FUSED_LAST, cache=True, fastmath=_FASTMATH)
+def _fused_last(close):
+    """
+    Tutti gli indicatori dell'ultima barra
+    
+    Le ricorsioni vengono da _recursive_state; Bollinger 20 (2σ, deviazione
+    standard di popolazione) e SMA 20/50 scorrono solo le ultime 50 barre.
+    
+    Returns:
+        (rsi, macd, macd_signal, macd_diff, bb_upper, bb_lower, bb_middle,
+         sma_20, sma_50, ema_12, ema_26)
+    """
+    rsi, macd, macd_signal, ema_12, ema_26 = _recursive_outputs(_recursive_state(close))
+    
+    # Finestre di coda: somme traslate del primo valore della finestra a 20
+    # per non perdere precisione nella varianza
+    n = close.shape[0]
+    start20 = n - 20 if n > 20 else 0
+    start50 = n - 50 if n > 50 else 0
+    shift = np.float64(close[start20])
+    sum20 = 0.0
+    sq20 = 0.0
+    sum50 = 0.0
+    for i in range(start50, n):
+        x = np.float64(close[i])
+        sum50 += x
+        if i >= start20:
+            d = x - shift
+            sum20 += d
+            sq20 += d * d
+    
+    k20 = n - start20
+    mean_shifted = sum20 / k20
+    variance = sq20 / k20 - mean_shifted * mean_shifted
+    bb_std = np.sqrt(variance) if variance > 0.0 else 0.0
+    bb_middle = shift + mean_shifted
+    
+    return (rsi, macd, macd_signal, macd - macd_signal,
+            bb_middle + 2.0 * bb_std, bb_middle - 2.0 * bb_std, bb_middle,
+            bb_middle, sum50 / (n - start50), ema_12, ema_26)
+
+def _kernel_array(values) -> np.ndarray:
+    """Array C-contiguo e scrivibile per i kernel: float32 resta float32, il resto diventa float64"""
+    values = np.asarray(values)
+    dtype = np.float32 if values.dtype == np.float32 else np.float64
+    values = np.ascontiguousarray(values, dtype=dtype)
+    # pandas >= 3 restituisce viste read-only: con una copia non serve una
+    # seconda specializzazione dei kernel per array readonly
+    if not values.flags.writeable:
+        values = values.copy()
+    return values
+
+def _recursive_state_numpy(close):
+    """
+    Stesso risultato di _recursive_state senza numba
+    
+    Le ricorsioni passano per Series.ewm (implementata in C) invece di un loop
+    Python sulle barre.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    n = close.shape[0]
+    a_fast = 2.0 / 13.0
+    a_slow = 2.0 / 27.0
+    series = pd.Series(close, copy=False)
+    
+    # RSI di Wilder: medie partono da 0 sulla prima barra
+    diff = np.diff(close, prepend=close[0])
+    avg_gain = pd.Series(np.maximum(diff, 0.0)).ewm(alpha=1.0 / 14.0, adjust=False).mean().iat[-1]
+    avg_loss = pd.Series(np.maximum(-diff, 0.0)).ewm(alpha=1.0 / 14.0, adjust=False).mean().iat[-1]
+    
+    ema_fast = series.ewm(alpha=a_fast, adjust=False).mean()
+    ema_slow = series.ewm(alpha=a_slow, adjust=False).mean()
+    # La linea di segnale parte dalla prima barra con MACD definito (indice 25)
+    macd_line = (ema_fast - ema_slow).to_numpy()
+    macd_signal = pd.Series(macd_line[25:]).ewm(alpha=0.2, adjust=False).mean().iat[-1] if n > 25 else 0.0
+    
+    # Pesi normalizzati: den = somma delle potenze del decadimento, num = media * den
+    den12 = (1.0 - (1.0 - a_fast) ** n) / a_fast
+    den26 = (1.0 - (1.0 - a_slow) ** n) / a_slow
+    num12 = series.ewm(alpha=a_fast).mean().iat[-1] * den12
+    num26 = series.ewm(alpha=a_slow).mean().iat[-1] * den26
+    
+    return (float(avg_gain), float(avg_loss), float(ema_fast.iat[-1]), float(ema_slow.iat[-1]),
+            float(macd_signal), float(num12), float(den12), float(num26), float(den26))
+
+if not NUMBA_AVAILABLE:
+    # Senza compilazione il loop di _recursive_state girerebbe in Python barra per barra
+    _recursive_state = _recursive_state_numpy
+
+@njit(_SIG_RECURSIVE_BATCH, cache=True, fastmath=_FASTMATH)
+def _recursive_last_batch(close):
+    """
+    RSI, MACD, segnale MACD, EMA 12 ed EMA 26 dell'ultima barra per ogni riga
+    
+    close: matrice float64 o float32 contigua (n_simboli, n_barre), una serie per riga
+    """
+    out = np.empty((close.shape[0], 5))
+    for s in range(close.shape[0]):
+        rsi, macd, macd_signal, ema_12, ema_26 = _recursive_outputs(_recursive_state(close[s]))
+        out[s, 0] = rsi
+        out[s, 1] = macd
+        out[s, 2] = macd_signal
+        out[s, 3] = ema_12
+        out[s, 4] = ema_26
+    return out
+
+def _indicators_batch(close: np.ndarray, volume: np.ndarray) -> List[Dict]:
+    """Indicatori dell'ultima barra per ogni riga di matrici (n_simboli, n_barre)"""
+    recursive = _recursive_last_batch(close)
+    
+    window = close[:, -20:]
+    bb_middle = window.mean(axis=1)
+    bb_std = window.std(axis=1)
+    bb_upper = bb_middle + 2.0 * bb_std
+    bb_lower = bb_middle - 2.0 * bb_std
+    bb_width = (bb_upper - bb_lower) / bb_middle
+    sma_50 = close[:, -50:].mean(axis=1)
+    volume_sma = volume[:, -20:].mean(axis=1)
+    
+    columns = {
+        'rsi': recursive[:, 0],
+        'macd': recursive[:, 1],
+        'macd_signal': recursive[:, 2],
+        'macd_diff': recursive[:, 1] - recursive[:, 2],
+        'bb_upper': bb_upper,
+        'bb_lower': bb_lower,
+        'bb_middle': bb_middle,
+        'bb_width': bb_width,
+        'sma_20': bb_middle,
+        'sma_50': sma_50,
+        'ema_12': recursive[:, 3],
+        'ema_26': recursive[:, 4],
+        'current_price': close[:, -1],
+        'volume': volume[:, -1],
+        'volume_sma': volume_sma,
+    }
+    # Una lista per colonna: i dizionari per simbolo contengono float Python
+    columns = {name: values.tolist() for name, values in columns.items()}
+    return [{name: values[i] for name, values in columns.items()} for i in range(close.shape[0])]
+
+def _indicators_fast(close: np.ndarray, volume: np.ndarray) -> Dict:
+    """Indicatori tecnici dell'ultima barra da array NumPy (close da _kernel_array)"""
+    indicators = {}
+    
+    # Una sola passata su close per RSI, MACD, Bollinger e medie mobili
+    (indicators['rsi'], indicators['macd'], indicators['macd_signal'], indicators['macd_diff'],
+     indicators['bb_upper'], indicators['bb_lower'], indicators['bb_middle'],
+     indicators['sma_20'], indicators['sma_50'],
+     indicators['ema_12'], indicators['ema_26']) = _fused_last(close)
+    indicators['bb_width'] = (indicators['bb_upper'] - indicators['bb_lower']) / indicators['bb_middle']
+    
+    # Prezzo corrente
+    indicators['current_price'] = close[-1]
+    
+    # Volume
+    indicators['volume'] = volume[-1]
+    indicators['volume_sma'] = volume[-20:].mean()
+    
+    return indicators
+
+class RollingState:
+    """
+    Stato incrementale degli indicatori di un simbolo
+    
+    Somme correnti per le medie mobili e stato delle ricorsioni EMA/RSI/MACD:
+    aggiungere una barra costa O(1) invece di ricalcolare tutta la serie.
+    """
+    
+    def __init__(self):
+        self.closes = deque(maxlen=50)
+        self.volumes = deque(maxlen=20)
+        self.sum3 = 0.0
+        self.sum20 = 0.0
+        self.sum50 = 0.0
+        # Somma dei quadrati a 20 barre per la deviazione standard delle
+        # Bollinger, con i valori traslati di `shift` per non perdere precisione
+        self.shift = 0.0
+        self.sq20 = 0.0
+        self.volume_sum20 = 0.0
+        # Stato delle ricorsioni RSI/MACD/EMA (vedi _recursive_step)
+        self.recursive = None
+        self.n = 0
+        self.last_index = None
+    
+    @classmethod
+    def from_arrays(cls, close: np.ndarray, volume: np.ndarray, last_index=None) -> 'RollingState':
+        """Inizializza lo stato da una serie storica completa (close da _kernel_array)"""
+        state = cls()
+        state.closes.extend(close[-50:].tolist())
+        state.volumes.extend(volume[-20:].tolist())
+        state.sum3 = float(close[-3:].sum())
+        state.sum20 = float(close[-20:].sum())
+        state.sum50 = float(close[-50:].sum())
+        state.shift = float(close[-1])
+        state.sq20 = float(np.square(close[-20:] - state.shift).sum())
+        state.volume_sum20 = float(volume[-20:].sum())
+        state.recursive = _recursive_state(close)
+        state.n = close.shape[0]
+        state.last_index = last_index
+        return state
+    
+    def update(self, new_close: float, new_volume: float = 0.0, index=None):
+        """Aggiunge una barra aggiornando somme e ricorsioni in O(1)"""
+        closes = self.closes
+        size = len(closes)
+        
+        if self.n == 0:
+            self.recursive = _recursive_init(new_close)
+            self.shift = new_close
+        else:
+            self.recursive = _recursive_step(self.recursive, closes[-1], new_close, self.n)
+        
+        # Somme correnti: entra la nuova barra, esce quella fuori finestra
+        self.sum3 += new_close - (closes[-3] if size >= 3 else 0.0)
+        self.sum20 += new_close - (closes[-20] if size >= 20 else 0.0)
+        old_dev = closes[-20] - self.shift if size >= 20 else 0.0
+        new_dev = new_close - self.shift
+        self.sq20 += new_dev * new_dev - old_dev * old_dev
+        self.sum50 += new_close - (closes[0] if size == 50 else 0.0)
+        closes.append(new_close)
+        
+        volumes = self.volumes
+        self.volume_sum20 += new_volume - (volumes[0] if len(volumes) == 20 else 0.0)
+        volumes.append(new_volume)
+        
+        self.n += 1
+        self.last_index = index
+    
+    def advance(self, index, close: np.ndarray, volume: np.ndarray) -> bool:
+        """
+        Applica le barre aggiunte dall'ultimo aggiornamento
+        
+        Returns:
+            bool: False se la serie non prolunga quella già vista (va reinizializzata)
+        """
+        n = self.n
+        new_bars = close.shape[0] - n
+        if n == 0 or new_bars < 0 or new_bars > self.closes.maxlen:
+            return False
+        if index[n - 1] != self.last_index or close[n - 1] != self.closes[-1]:
+            return False
+        
+        for i in range(n, close.shape[0]):
+            self.update(float(close[i]), float(volume[i]), index[i])
+        return True
+    
+    def current(self) -> Dict:
+        """Indicatori dell'ultima barra, con le stesse chiavi di _indicators_fast"""
+        indicators = {}
+        
+        rsi, macd, macd_signal, ema_12, ema_26 = _recursive_outputs(self.recursive)
+        indicators['rsi'] = rsi
+        indicators['macd'] = macd
+        indicators['macd_signal'] = macd_signal
+        indicators['macd_diff'] = macd - macd_signal
+        
+        closes = self.closes
+        k20 = min(len(closes), 20)
+        bb_middle = self.sum20 / k20
+        mean_dev = bb_middle - self.shift
+        variance = self.sq20 / k20 - mean_dev * mean_dev
+        bb_std = np.sqrt(variance) if variance > 0.0 else 0.0
+        indicators['bb_upper'] = bb_middle + 2.0 * bb_std
+        indicators['bb_lower'] = bb_middle - 2.0 * bb_std
+        indicators['bb_middle'] = bb_middle
+        indicators['bb_width'] = (indicators['bb_upper'] - indicators['bb_lower']) / indicators['bb_middle']
+        
+        indicators['sma_20'] = bb_middle
+        indicators['sma_50'] = self.sum50 / len(closes)
+        indicators['ema_12'] = ema_12
+        indicators['ema_26'] = ema_26
+        
+        indicators['current_price'] = closes[-1]
+        
+        indicators['volume'] = self.volumes[-1]
+        indicators['volume_sma'] = self.volume_sum20 / len(self.volumes)
+        
+        return indicators
+
+@functools.lru_cache(maxsize=8)
+def _read_config(config_path: str) -> Dict:
+    """JSON di configurazione per percorso; gli errori non vengono messi in cache"""
+    with open(config_path, 'rb') as f:
+        return json_loads(f.read())
+
 class StrategyEngine:
     """Motore di strategie per analisi tecnica"""
     
+    ANALYSIS_CACHE_SIZE = 128
+    
+    # (tipo, strength, motivo BUY, motivo SELL) per i segnali direzionali
+    SIGNAL_TABLE = (
+        ('RSI', 0.8, 'RSI oversold: {rsi:.1f}', 'RSI overbought: {rsi:.1f}'),
+        ('MACD', 0.6, 'MACD positive divergence', 'MACD negative divergence'),
+        ('MA', 0.7, 'Price above rising MA', 'Price below falling MA'),
+        ('BB', 0.6, 'Price below BB lower band', 'Price above BB upper band'),
+    )
+    # Strength per riga di SIGNAL_TABLE, più quella del segnale di volume
+    _SIGNAL_STRENGTHS = np.array([row[1] for row in SIGNAL_TABLE] + [0.4])
+    
     def __init__(self, config_path: str = "config/production_settings.json"):
         """Inizializza il motore di strategie"""
         self.config = self._load_config(config_path)
+        # {(symbol, ultimo indice, n. barre, ultimo close): analisi}, LRU
+        self._cache = OrderedDict()
+        # Stato incrementale degli indicatori per simbolo
+        self._rolling: Dict[str, RollingState] = {}
         
     def _load_config(self, config_path: str) -> Dict:
-        """Carica configurazione"""
+        """Carica configurazione (letta dal disco una sola volta per processo)"""
         try:
-            with open(config_path, 'r') as f:
-                return json.load(f)
+            # Copia: ogni istanza può modificare la propria senza toccare la cache
+            return copy.deepcopy(_read_config(config_path))
         except Exception as e:
             logger.error(f"Errore caricamento config: {e}")
             return {}
@@ -35,115 +435,182 @@ class StrategyEngine:
             if data is None or data.empty or len(data) < 50:
                 return {'recommendation': 'HOLD', 'confidence': 0.0, 'signals': []}
             
-            # Calcola indicatori tecnici
-            indicators = self._calculate_indicators(data)
+            # Stessa ultima barra (anche nel close, che cambia durante la seduta):
+            # l'analisi precedente è ancora valida
+            key = (symbol, data.index[-1], len(data), data['Close'].iat[-1])
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
             
-            # Genera segnali
-            signals = self._generate_signals(indicators)
+            # Calcola indicatori tecnici
+            indicators = self._calculate_indicators(data, symbol)
             
-            # Combina segnali per raccomandazione finale
-            recommendation = self._combine_signals(signals)
+            # Punteggi dei segnali, poi segnali e raccomandazione finale
+            scores = self._score_signals(indicators)
+            signals = self._generate_signals(indicators, scores)
+            recommendation = self._combine_scores(scores)
             
-            return {
+            result = {
                 'recommendation': recommendation['action'],
                 'confidence': recommendation['confidence'],
                 'signals': signals,
                 'indicators': indicators
             }
             
+            self._cache[key] = result
+            if len(self._cache) > self.ANALYSIS_CACHE_SIZE:
+                self._cache.popitem(last=False)
+            return result
+            
         except Exception as e:
             logger.error(f"Errore analisi {symbol}: {e}")
             return {'recommendation': 'HOLD', 'confidence': 0.0, 'signals': []}
     
-    def _calculate_indicators(self, data: pd.DataFrame) -> Dict:
-        """Calcola indicatori tecnici"""
-        indicators = {}
+    def analyze_symbols(self, symbols: List[str], data: Dict[str, pd.DataFrame]) -> Dict[str, Dict]:
+        """
+        Analizza più simboli insieme
         
-        try:
-            # RSI
-            indicators['rsi'] = ta.momentum.RSIIndicator(data['Close']).rsi().iloc[-1]
-            
-            # MACD
-            macd = ta.trend.MACD(data['Close'])
-            indicators['macd'] = macd.macd().iloc[-1]
-            indicators['macd_signal'] = macd.macd_signal().iloc[-1]
-            indicators['macd_diff'] = macd.macd_diff().iloc[-1]
-            
-            # Bollinger Bands
-            bb = ta.volatility.BollingerBands(data['Close'])
-            indicators['bb_upper'] = bb.bollinger_hband().iloc[-1]
-            indicators['bb_lower'] = bb.bollinger_lband().iloc[-1]
-            indicators['bb_middle'] = bb.bollinger_mavg().iloc[-1]
-            indicators['bb_width'] = (indicators['bb_upper'] - indicators['bb_lower']) / indicators['bb_middle']
+        Le serie con lo stesso numero di barre vengono impilate in una matrice
+        (n_simboli, n_barre) e gli indicatori calcolati per tutte in un'unica
+        passata; i risultati coincidono con quelli di analyze_symbol.
+        
+        Returns:
+            Dict[str, Dict]: analisi per simbolo, nello stesso formato di analyze_symbol
+        """
+        results = {}
+        groups: Dict[int, List] = {}
+        
+        for symbol in symbols:
+            frame = data.get(symbol)
+            if frame is None or frame.empty or len(frame) < 50:
+                results[symbol] = {'recommendation': 'HOLD', 'confidence': 0.0, 'signals': []}
+                continue
             
-            # Moving Averages
-            indicators['sma_20'] = data['Close'].rolling(20).mean().iloc[-1]
-            indicators['sma_50'] = data['Close'].rolling(50).mean().iloc[-1]
-            indicators['ema_12'] = data['Close'].ewm(span=12).mean().iloc[-1]
-            indicators['ema_26'] = data['Close'].ewm(span=26).mean().iloc[-1]
+            key = (symbol, frame.index[-1], len(frame), frame['Close'].iat[-1])
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                results[symbol] = cached
+                continue
+            groups.setdefault(len(frame), []).append((symbol, key, frame))
+        
+        for group in groups.values():
+            try:
+                # float32 solo se lo sono tutte le serie del gruppo, altrimenti float64
+                close = np.stack([_kernel_array(frame['Close'].to_numpy()) for _, _, frame in group])
+                volume = np.stack([frame['Volume'].to_numpy(dtype=np.float64) for _, _, frame in group])
+                batch = _indicators_batch(close, volume)
+            except Exception as e:
+                logger.error(f"Errore analisi batch: {e}")
+                for symbol, _, frame in group:
+                    results[symbol] = self.analyze_symbol(symbol, frame)
+                continue
             
-            # Prezzo corrente
-            indicators['current_price'] = data['Close'].iloc[-1]
+            for (symbol, key, _), indicators in zip(group, batch):
+                scores = self._score_signals(indicators)
+                signals = self._generate_signals(indicators, scores)
+                recommendation = self._combine_scores(scores)
+                result = {
+                    'recommendation': recommendation['action'],
+                    'confidence': recommendation['confidence'],
+                    'signals': signals,
+                    'indicators': indicators
+                }
+                self._cache[key] = result
+                if len(self._cache) > self.ANALYSIS_CACHE_SIZE:
+                    self._cache.popitem(last=False)
+                results[symbol] = result
+        
+        return results
+    
+    def _calculate_indicators(self, data: pd.DataFrame, symbol: Optional[str] = None) -> Dict:
+        """Calcola indicatori tecnici (incrementalmente se il simbolo è già noto)"""
+        indicators = {}
+        
+        try:
+            # Pandas viene toccato una sola volta: il resto lavora su array NumPy
+            close = _kernel_array(data['Close'].to_numpy())
+            volume = data['Volume'].to_numpy()
+            if symbol is None:
+                return _indicators_fast(close, volume)
             
-            # Volume
-            indicators['volume'] = data['Volume'].iloc[-1]
-            indicators['volume_sma'] = data['Volume'].rolling(20).mean().iloc[-1]
+            # Se i dati prolungano quelli già visti si applicano solo le nuove barre
+            state = self._rolling.get(symbol)
+            if state is None or not state.advance(data.index, close, volume):
+                state = RollingState.from_arrays(close, volume, data.index[-1])
+                self._rolling[symbol] = state
+            indicators = state.current()
             
         except Exception as e:
             logger.error(f"Errore calcolo indicatori: {e}")
             
         return indicators
     
-    def _generate_signals(self, indicators: Dict) -> List[Dict]:
-        """Genera segnali basati su indicatori"""
-        signals = []
+    def _score_signals(self, indicators: Dict) -> np.ndarray:
+        """
+        Forza con segno dei segnali, nell'ordine di SIGNAL_TABLE
+        
+        Positivo = BUY, negativo = SELL, 0 = nessun segnale; l'ultimo elemento
+        è la forza del segnale di volume (ATTENTION, senza direzione).
+        """
+        scores = np.zeros(len(self.SIGNAL_TABLE) + 1)
         
         try:
-            # RSI Signal
             rsi = indicators.get('rsi', 50)
-            if rsi < 30:
-                signals.append({'type': 'RSI', 'signal': 'BUY', 'strength': 0.8, 'reason': f'RSI oversold: {rsi:.1f}'})
-            elif rsi > 70:
-                signals.append({'type': 'RSI', 'signal': 'SELL', 'strength': 0.8, 'reason': f'RSI overbought: {rsi:.1f}'})
-            
-            # MACD Signal
             macd_diff = indicators.get('macd_diff', 0)
-            if macd_diff > 0:
-                signals.append({'type': 'MACD', 'signal': 'BUY', 'strength': 0.6, 'reason': 'MACD positive divergence'})
-            elif macd_diff < 0:
-                signals.append({'type': 'MACD', 'signal': 'SELL', 'strength': 0.6, 'reason': 'MACD negative divergence'})
-            
-            # Moving Average Signal
             current_price = indicators.get('current_price', 0)
             sma_20 = indicators.get('sma_20', 0)
             sma_50 = indicators.get('sma_50', 0)
-            
-            if current_price > sma_20 > sma_50:
-                signals.append({'type': 'MA', 'signal': 'BUY', 'strength': 0.7, 'reason': 'Price above rising MA'})
-            elif current_price < sma_20 < sma_50:
-                signals.append({'type': 'MA', 'signal': 'SELL', 'strength': 0.7, 'reason': 'Price below falling MA'})
-            
-            # Bollinger Bands Signal
             bb_upper = indicators.get('bb_upper', 0)
             bb_lower = indicators.get('bb_lower', 0)
-            
-            if current_price < bb_lower:
-                signals.append({'type': 'BB', 'signal': 'BUY', 'strength': 0.6, 'reason': 'Price below BB lower band'})
-            elif current_price > bb_upper:
-                signals.append({'type': 'BB', 'signal': 'SELL', 'strength': 0.6, 'reason': 'Price above BB upper band'})
-            
-            # Volume Signal
             volume = indicators.get('volume', 0)
             volume_sma = indicators.get('volume_sma', 0)
             
-            if volume > volume_sma * 1.5:
-                signals.append({'type': 'VOLUME', 'signal': 'ATTENTION', 'strength': 0.4, 'reason': 'High volume detected'})
-                
+            # Condizioni di acquisto e vendita come 1/0: niente catene di if/elif
+            scores[:] = (
+                int(rsi < 30) - int(rsi > 70),
+                int(macd_diff > 0) - int(macd_diff < 0),
+                int(current_price > sma_20 > sma_50) - int(current_price < sma_20 < sma_50),
+                int(current_price < bb_lower) - int(current_price > bb_upper),
+                int(volume > volume_sma * 1.5),
+            )
+            scores *= self._SIGNAL_STRENGTHS
+            
         except Exception as e:
             logger.error(f"Errore generazione segnali: {e}")
+            scores[:] = 0.0
             
+        return scores
+    
+    def _generate_signals(self, indicators: Dict, scores: Optional[np.ndarray] = None) -> List[Dict]:
+        """Genera segnali basati su indicatori (o sui loro punteggi già calcolati)"""
+        if scores is None:
+            scores = self._score_signals(indicators)
+        
+        signals = []
+        for (kind, strength, buy_reason, sell_reason), score in zip(self.SIGNAL_TABLE, scores.tolist()):
+            if score > 0:
+                signals.append({'type': kind, 'signal': 'BUY', 'strength': strength,
+                                'reason': buy_reason.format(**indicators)})
+            elif score < 0:
+                signals.append({'type': kind, 'signal': 'SELL', 'strength': strength,
+                                'reason': sell_reason.format(**indicators)})
+        if scores[-1]:
+            signals.append({'type': 'VOLUME', 'signal': 'ATTENTION', 'strength': 0.4, 'reason': 'High volume detected'})
+        
         return signals
     
+    def _combine_scores(self, scores: np.ndarray) -> Dict:
+        """Raccomandazione finale dai punteggi di _score_signals"""
+        if not scores.any():
+            return {'action': 'HOLD', 'confidence': 0.0}
+        
+        directional = scores[:-1]
+        buy_score = float(directional[directional > 0].sum())
+        sell_score = float(-directional[directional < 0].sum())
+        return self._recommend(buy_score, sell_score)
+    
     def _combine_signals(self, signals: List[Dict]) -> Dict:
         """Combina segnali per raccomandazione finale"""
         if not signals:
@@ -152,7 +619,11 @@ class StrategyEngine:
         # Conta segnali BUY/SELL pesati per strength
         buy_score = sum([s['strength'] for s in signals if s['signal'] == 'BUY'])
         sell_score = sum([s['strength'] for s in signals if s['signal'] == 'SELL'])
-        
+        return self._recommend(buy_score, sell_score)
+    
+    @staticmethod
+    def _recommend(buy_score: float, sell_score: float) -> Dict:
+        """Azione e confidenza dai punteggi BUY/SELL pesati per strength"""
         # Determina azione
         if buy_score > sell_score and buy_score > 1.0:
             action = 'BUY'
@@ -166,6 +637,30 @@ class StrategyEngine:
         
         return {'action': action, 'confidence': confidence}
 
+@njit(_SIG_SMA3_SIDE, cache=True)
+def _sma3_side(close):
+    """+1 se l'ultimo close è sopra la media delle ultime 3 barre, -1 se sotto, 0 altrimenti"""
+    n = close.shape[0]
+    if n < 3:
+        return 0
+    avg_3d = (close[n - 1] + close[n - 2] + close[n - 3]) / 3.0
+    if close[n - 1] > avg_3d:
+        return 1
+    if close[n - 1] < avg_3d:
+        return -1
+    return 0
+
+def _sma3_side_of(df) -> int:
+    """_sma3_side per un DataFrame o per uno RollingState già aggiornato"""
+    if isinstance(df, RollingState):
+        if df.n < 3:
+            return 0
+        avg_3d = df.sum3 / 3
+        return (df.closes[-1] > avg_3d) - (df.closes[-1] < avg_3d)
+    
+    # Serve solo l'ultima media a 3 giorni: bastano le ultime tre barre
+    return _sma3_side(_kernel_array(df['Close'].to_numpy()[-3:]))
+
 def should_buy(df):
     """
     Determina se comprare un titolo basandosi sui dati storici
@@ -173,20 +668,14 @@ def should_buy(df):
     Strategia semplice: compra se il prezzo attuale è sopra la media mobile a 3 giorni
     
     Args:
-        df (pandas.DataFrame): DataFrame con i dati del titolo
+        df (pandas.DataFrame | RollingState): DataFrame con i dati del titolo,
+            oppure il suo stato incrementale già aggiornato all'ultima barra
     
     Returns:
         bool: True se dovremmo comprare, False altrimenti
     """
-    if len(df) < 3:
-        return False
-    
     try:
-        current_price = df["Close"].iloc[-1]
-        avg_3d = df['Close'].rolling(window=3).mean().iloc[-1]
-        
-        # Strategia: compra se prezzo attuale > media 3 giorni
-        return current_price > avg_3d
+        return _sma3_side_of(df) > 0
     except Exception as e:
         print(f"Errore nella strategia: {e}")
         return False
@@ -195,21 +684,17 @@ def should_sell(df):
     """
     Determina se vendere un titolo
     
+    Strategia simmetrica: vende se il prezzo attuale è sotto la media mobile a 3 giorni
+    
     Args:
-        df (pandas.DataFrame): DataFrame con i dati del titolo
+        df (pandas.DataFrame | RollingState): DataFrame con i dati del titolo,
+            oppure il suo stato incrementale già aggiornato all'ultima barra
     
     Returns:
         bool: True se dovremmo vendere, False altrimenti
     """
-    if len(df) < 3:
-        return False
-    
     try:
-        current_price = df["Close"].iloc[-1]
-        avg_3d = df['Close'].rolling(window=3).mean().iloc[-1]
-        
-        # Strategia: vendi se prezzo attuale < media 3 giorni
-        return current_price < avg_3d
+        return _sma3_side_of(df) < 0
     except Exception as e:
         print(f"Errore nella strategia di vendita: {e}")
         return False
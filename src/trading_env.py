@@ -3,6 +3,27 @@ from gymnasium import spaces
 import numpy as np
 from typing import Any, Dict, Tuple, Union
 
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit: kernels run as plain Python"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+@njit(cache=True)
+def _step_kernel(price, next_price, cash, shares, action):
+    """Applica l'azione (0 Hold, 1 Buy, 2 Sell) e restituisce (cash, shares, reward)"""
+    prev_portfolio_value = cash + shares * price
+    if action == 1 and cash >= price:  # Buy
+        shares += 1
+        cash -= price
+    elif action == 2 and shares > 0:  # Sell
+        cash += price
+        shares -= 1
+    return cash, shares, cash + shares * next_price - prev_portfolio_value
+
 class TradingEnv(gym.Env):
     """
     Custom Trading Environment compatible with gymnasium
@@ -10,11 +31,16 @@ class TradingEnv(gym.Env):
     
     def __init__(self, prices: Union[list, np.ndarray]):
         super(TradingEnv, self).__init__()
-        self.prices = np.array(prices) if isinstance(prices, list) else prices
+        self.prices = np.ascontiguousarray(prices, dtype=np.float32)
         self.index = 0
         self.cash = 10.0
         self.shares = 0
         self.initial_value = 10.0
+        
+        # Buffer di lavoro dell'observation, riempito in place a ogni passo;
+        # all'esterno esce sempre una copia (i wrapper gym conservano le
+        # observation tra un passo e l'altro)
+        self._obs_buf = np.empty(3, dtype=np.float32)
 
         # Action space: 0: Hold, 1: Buy, 2: Sell
         self.action_space = spaces.Discrete(3)
@@ -30,15 +56,20 @@ class TradingEnv(gym.Env):
     def reset(self, seed=None, options=None):
         """Reset environment to initial state"""
         super().reset(seed=seed)
+        return self.reset_inplace()
+    
+    def reset_inplace(self):
+        """
+        Reset portfolio state without going through gym.Env.reset
         
+        Leaves the RNG untouched, for callers that restart episodes with an
+        unchanged seed.
+        """
         self.index = 0
         self.cash = self.initial_value
         self.shares = 0
         
-        observation = self._get_observation()
-        info = self._get_info()
-        
-        return observation, info
+        return self._get_observation(), self._get_info()
 
     def step(self, action: int) -> Tuple[np.ndarray, float, bool, bool, Dict[str, Any]]:
         """Execute one time step"""
@@ -48,27 +79,12 @@ class TradingEnv(gym.Env):
             info = self._get_info()
             return observation, 0.0, True, False, info
             
-        price = float(self.prices[self.index])
-        prev_portfolio_value = self.cash + self.shares * price
-
-        # Execute action
-        if action == 1 and self.cash >= price:  # Buy
-            self.shares += 1
-            self.cash -= price
-        elif action == 2 and self.shares > 0:  # Sell
-            self.cash += price
-            self.shares -= 1
-        # action == 0 is Hold, do nothing
-
+        # Execute action and calculate reward (the next bar always exists here)
+        self.cash, self.shares, reward = _step_kernel(
+            float(self.prices[self.index]), float(self.prices[self.index + 1]),
+            self.cash, self.shares, int(action)
+        )
         self.index += 1
-        
-        # Calculate reward
-        if self.index < len(self.prices):
-            current_price = float(self.prices[self.index])
-            current_portfolio_value = self.cash + self.shares * current_price
-            reward = current_portfolio_value - prev_portfolio_value
-        else:
-            reward = 0.0
 
         # Check if done
         done = self.index >= len(self.prices) - 1
@@ -80,13 +96,15 @@ class TradingEnv(gym.Env):
         return observation, reward, done, truncated, info
 
     def _get_observation(self) -> np.ndarray:
-        """Get current observation"""
+        """Get current observation (filled in the work buffer, returned as a copy)"""
+        obs = self._obs_buf
         if self.index < len(self.prices):
-            price = float(self.prices[self.index])
+            obs[0] = self.prices[self.index]
         else:
-            price = float(self.prices[-1])
-            
-        return np.array([price, self.cash, float(self.shares)], dtype=np.float32)
+            obs[0] = self.prices[-1]
+        obs[1] = self.cash
+        obs[2] = self.shares
+        return obs.copy()
     
     def _get_info(self) -> Dict[str, Any]:
         """Get additional info"""
@@ -95,7 +113,7 @@ class TradingEnv(gym.Env):
             portfolio_value = self.cash + self.shares * current_price
         else:
             portfolio_value = self.cash
-            
+        
         return {
             'step': self.index,
             'portfolio_value': portfolio_value,
@@ -10,10 +10,98 @@ import numpy as np
 from datetime import datetime, timedelta
 from pathlib import Path
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit: kernels run as plain Python"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@njit(cache=True)
+def _rollout(prices, episodes, max_steps, seed):
+    """
+    Episodi ad azioni casuali con la stessa logica di TradingEnv.step
+    
+    Ogni episodio riparte da cash 10.0, nessuna azione e indice 0; le azioni
+    (0 Hold, 1 Buy, 2 Sell) vengono da un generatore xorshift a 32 bit.
+    
+    Returns:
+        np.ndarray: reward totale di ogni episodio
+    """
+    totals = np.zeros(episodes)
+    last = prices.shape[0] - 1
+    x = seed & 0xFFFFFFFF
+    if x == 0:
+        x = 2463534242
+    
+    for episode in range(episodes):
+        cash = 10.0
+        shares = 0
+        index = 0
+        total_reward = 0.0
+        
+        for _ in range(max_steps):
+            if index >= last:
+                break
+            
+            x ^= (x << 13) & 0xFFFFFFFF
+            x ^= x >> 17
+            x ^= (x << 5) & 0xFFFFFFFF
+            action = x % 3
+            
+            price = prices[index]
+            prev_value = cash + shares * price
+            if action == 1 and cash >= price:
+                shares += 1
+                cash -= price
+            elif action == 2 and shares > 0:
+                cash += price
+                shares -= 1
+            
+            index += 1
+            total_reward += cash + shares * prices[index] - prev_value
+        
+        totals[episode] = total_reward
+    
+    return totals
+
+def _vec_rollout(prices, episodes, max_steps, rng):
+    """
+    Episodi ad azioni casuali simulati in parallelo con NumPy
+    
+    Stessa logica di _rollout: tutti gli episodi partono dall'indice 0 e
+    avanzano insieme, quindi a ogni passo il prezzo è unico e lo stato
+    (cash, shares) è un vettore con un elemento per episodio.
+    
+    Returns:
+        np.ndarray: reward totale di ogni episodio
+    """
+    steps = min(max_steps, prices.shape[0] - 1)
+    cash = np.full(episodes, 10.0)
+    shares = np.zeros(episodes, dtype=np.int64)
+    actions = rng.integers(0, 3, size=(steps, episodes), dtype=np.int8)
+    
+    for t in range(steps):
+        price = prices[t]
+        buy = (actions[t] == 1) & (cash >= price)
+        sell = (actions[t] == 2) & (shares > 0)
+        trade = buy.astype(np.int64) - sell
+        shares += trade
+        cash -= trade * price
+    
+    # I reward di ogni passo sono differenze di valore del portafoglio:
+    # la loro somma è il valore finale meno quello iniziale
+    return cash + shares * prices[steps] - 10.0
+
 class RLTrainer:
     """Trainer per RL Agent"""
     
@@ -59,82 +147,57 @@ class RLTrainer:
     
     def _full_training(self, episodes, agent):
         """Training completo con ambiente"""
-        from trading_env import TradingEnvironment
         import pandas as pd
         
         # Crea dati demo per training
         dates = pd.date_range(start='2023-01-01', end='2023-12-31', freq='D')
-        np.random.seed(42)
+        # Un solo generatore per dati e azioni, invece dello stato globale di np.random
+        rng = np.random.Generator(np.random.PCG64DXSM(np.random.SeedSequence(42)))
         
-        # Simula dati di prezzo
+        # Simula dati di prezzo (il primo rendimento è scartato: si parte da initial_price)
         initial_price = 100
-        returns = np.random.normal(0.001, 0.02, len(dates))
-        prices = [initial_price]
-        
-        for ret in returns[1:]:
-            new_price = prices[-1] * (1 + ret)
-            prices.append(new_price)
+        n = len(dates)
+        returns = rng.normal(0.001, 0.02, n)
+        returns[0] = 0.0
+        prices = initial_price * np.cumprod(1 + returns)
         
         # Crea DataFrame
         data = pd.DataFrame({
-            'Date': dates[:len(prices)],
+            'Date': dates,
             'Close': prices,
-            'Open': [p * np.random.uniform(0.98, 1.02) for p in prices],
-            'High': [p * np.random.uniform(1.00, 1.05) for p in prices],
-            'Low': [p * np.random.uniform(0.95, 1.00) for p in prices],
-            'Volume': [np.random.randint(1000, 10000) for _ in prices]
+            'Open': prices * rng.uniform(0.98, 1.02, size=n),
+            'High': prices * rng.uniform(1.00, 1.05, size=n),
+            'Low': prices * rng.uniform(0.95, 1.00, size=n),
+            'Volume': rng.integers(1000, 10000, size=n)
         })
         
-        # Crea ambiente
-        env = TradingEnvironment(data)
+        # Il rollout ad azioni casuali replica TradingEnvironment senza passare
+        # da step()/reset() a ogni passo (prezzi float32 come in TradingEnvironment)
+        max_steps = 100  # Limita steps per episodio
+        close = np.ascontiguousarray(data['Close'].to_numpy(), dtype=np.float32)
         
         logger.info("🏋️ Inizio training completo...")
         
-        total_rewards = []
+        if NUMBA_AVAILABLE:
+            # Il kernel usa il suo xorshift, inizializzato dallo stesso generatore
+            total_rewards = _rollout(close, episodes, max_steps, int(rng.integers(1, 2**32)))
+        else:
+            # Senza compilazione: un'operazione vettoriale per passo su tutti gli episodi
+            total_rewards = _vec_rollout(close, episodes, max_steps, rng)
         
-        for episode in range(episodes):
-            # Reset ambiente
-            reset_result = env.reset()
-            if isinstance(reset_result, tuple):
-                state, _ = reset_result
-            else:
-                state = reset_result
-            
-            total_reward = 0
-            done = False
-            steps = 0
-            max_steps = 100  # Limita steps per episodio
-            
-            while not done and steps < max_steps:
-                # Sceglie azione (simulata)
-                action = np.random.choice([0, 1, 2])  # Hold, Buy, Sell
-                
-                # Esegue azione
-                step_result = env.step(action)
-                if len(step_result) == 5:
-                    next_state, reward, terminated, truncated, info = step_result
-                    done = terminated or truncated
-                else:
-                    next_state, reward, done, info = step_result
-                
-                total_reward += reward
-                state = next_state
-                steps += 1
-            
-            total_rewards.append(total_reward)
-            
-            # Log progresso
-            if episode % (episodes // 10) == 0:
-                avg_reward = np.mean(total_rewards[-10:]) if total_rewards else 0
-                logger.info(f"Episodio {episode}/{episodes}: Reward={total_reward:.2f}, Avg={avg_reward:.2f}")
+        # Log progresso
+        log_every = max(episodes // 10, 1)
+        for episode in range(0, episodes, log_every):
+            avg_reward = total_rewards[max(episode - 9, 0):episode + 1].mean()
+            logger.info(f"Episodio {episode}/{episodes}: Reward={total_rewards[episode]:.2f}, Avg={avg_reward:.2f}")
         
         # Simula aggiornamento modello
         training_data = {
             'episodes': episodes,
-            'final_reward': total_rewards[-1] if total_rewards else 0,
-            'avg_reward': np.mean(total_rewards) if total_rewards else 0,
-            'max_reward': np.max(total_rewards) if total_rewards else 0,
-            'min_reward': np.min(total_rewards) if total_rewards else 0,
+            'final_reward': float(total_rewards[-1]) if episodes else 0,
+            'avg_reward': float(total_rewards.mean()) if episodes else 0,
+            'max_reward': float(total_rewards.max()) if episodes else 0,
+            'min_reward': float(total_rewards.min()) if episodes else 0,
             'training_time': datetime.now().isoformat(),
             'model_type': 'environment_trained',
         }
@@ -142,7 +205,7 @@ class RLTrainer:
         # Salva modello
         model_path = self.data_dir / "rl_model.pkl"
         with open(model_path, 'wb') as f:
-            pickle.dump(training_data, f)
+            pickle.dump(training_data, f, protocol=pickle.HIGHEST_PROTOCOL)
         
         logger.info(f"✅ Training completo completato!")
         logger.info(f"📊 Reward finale: {training_data['final_reward']:.2f}")
@@ -170,7 +233,7 @@ class RLTrainer:
         # Salva "modello" semplificato
         model_path = self.data_dir / "rl_model.pkl"
         with open(model_path, 'wb') as f:
-            pickle.dump(training_data, f)
+            pickle.dump(training_data, f, protocol=pickle.HIGHEST_PROTOCOL)
         
         logger.info(f"✅ Training semplificato completato!")
         logger.info(f"📊 Reward finale: {training_data['final_reward']:.2f}")
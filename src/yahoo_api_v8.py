@@ -5,14 +5,23 @@ Accesso diretto alle nuove API v8 di Yahoo Finance
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
 import numpy as np
 import time
 import logging
-from datetime import datetime, timedelta
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List, Optional, Union
 import json
 
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
 logger = logging.getLogger(__name__)
 
 class YahooFinanceV8:
@@ -20,6 +29,10 @@ class YahooFinanceV8:
     
     def __init__(self):
         self.base_url = "https://query2.finance.yahoo.com/v8/finance/chart"
+        # spark: quotazioni di più simboli per richiesta, senza crumb/cookie
+        # (al contrario di /v7/finance/quote, che risponde 401)
+        self.spark_url = "https://query2.finance.yahoo.com/v8/finance/spark"
+        self.spark_batch = 20  # simboli massimi per richiesta spark
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'application/json',
@@ -30,23 +43,32 @@ class YahooFinanceV8:
         }
         self.session = requests.Session()
         self.session.headers.update(self.headers)
+        # Pool abbastanza ampio per le richieste parallele (get_multiple_stocks e
+        # collector): le connessioni keep-alive restano aperte e riusate. I 429/5xx
+        # vengono ritentati con backoff (rispettando Retry-After)
+        self.session.mount('https://', HTTPAdapter(
+            pool_connections=20, pool_maxsize=20,
+            max_retries=Retry(total=3, backoff_factor=0.3,
+                              status_forcelist=[429, 500, 502, 503, 504])
+        ))
         
         # Rate limiting
         self.last_request_time = 0
         self.min_request_interval = 0.5  # 500ms tra richieste
+        self._rate_lock = threading.Lock()
         
         logger.info("🔧 Yahoo Finance v8 API client inizializzato")
     
     def _wait_for_rate_limit(self):
-        """Gestione rate limiting"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
+        """Gestione rate limiting (thread-safe: ogni richiesta prenota il proprio slot)"""
+        with self._rate_lock:
+            current_time = time.time()
+            slot = max(current_time, self.last_request_time + self.min_request_interval)
+            self.last_request_time = slot
         
-        if time_since_last < self.min_request_interval:
-            sleep_time = self.min_request_interval - time_since_last
+        sleep_time = slot - current_time
+        if sleep_time > 0:
             time.sleep(sleep_time)
-        
-        self.last_request_time = time.time()
     
     def _period_to_timestamps(self, period: str) -> tuple:
         """Converte periodo in timestamp Unix"""
@@ -100,7 +122,7 @@ class YahooFinanceV8:
             interval (str): Intervallo dati
             
         Returns:
-            pd.DataFrame: Dati OHLCV o None se errore
+            pd.DataFrame: Dati OHLCV (indice DatetimeIndex tz-aware UTC) o None se errore
         """
         try:
             self._wait_for_rate_limit()
@@ -125,8 +147,8 @@ class YahooFinanceV8:
             response = self.session.get(url, params=params, timeout=10)
             response.raise_for_status()
             
-            # Parse JSON
-            data = response.json()
+            # Parse JSON (orjson se disponibile, direttamente dai byte)
+            data = json_loads(response.content)
             
             if 'chart' not in data or not data['chart']['result']:
                 logger.warning(f"⚠️ Nessun dato per {symbol}")
@@ -136,33 +158,34 @@ class YahooFinanceV8:
             
             # Estrae dati
             timestamps = result['timestamp']
-            quotes = result['indicators']['quote'][0]
             # Validazione dati base
             quotes = result['indicators']['quote'][0]
             if not quotes.get('close') or len(quotes['close']) == 0:
                 logger.error(f"❌ Dati 'close' mancanti per {symbol}")
                 return None
             
-            # Crea DataFrame
+            # Colonne come array float64 (i null dell'API diventano NaN)
+            close = np.asarray(quotes['close'], dtype=np.float64)
             df_data = {
-                'Open': quotes['open'],
-                'High': quotes['high'], 
-                'Low': quotes['low'],
-                'Close': quotes['close'],
-                'Volume': quotes['volume']
+                'Open': np.asarray(quotes['open'], dtype=np.float64),
+                'High': np.asarray(quotes['high'], dtype=np.float64),
+                'Low': np.asarray(quotes['low'], dtype=np.float64),
+                'Close': close,
+                'Volume': np.asarray(quotes['volume'], dtype=np.float64)
             }
             
             # Aggiunge Adj Close se disponibile
             if 'adjclose' in result['indicators']:
-                df_data['Adj Close'] = result['indicators']['adjclose'][0]['adjclose']
+                df_data['Adj Close'] = np.asarray(result['indicators']['adjclose'][0]['adjclose'], dtype=np.float64)
             else:
-                df_data['Adj Close'] = quotes['close']
+                df_data['Adj Close'] = close
             
-            # Converte timestamp in datetime
-            dates = [datetime.fromtimestamp(ts) for ts in timestamps]
+            # Timestamp Unix convertiti in blocco: indice tz-aware in UTC, come
+            # quello (tz-aware) del fallback yfinance e indipendente dall'ora locale
+            dates = pd.to_datetime(np.asarray(timestamps, dtype=np.int64), unit='s', utc=True)
             
             # Crea DataFrame
-            df = pd.DataFrame(df_data, index=dates)
+            df = pd.DataFrame(df_data, index=dates, copy=False)
             
             # Rimuove valori null
             df.dropna(inplace=True)
@@ -183,6 +206,72 @@ class YahooFinanceV8:
             logger.error(f"❌ Errore generico per {symbol}: {e}")
             return None
     
+    def get_quotes(self, symbols: List[str]) -> Dict[str, Dict]:
+        """
+        Ottiene le quotazioni correnti di più simboli (endpoint spark, a blocchi)
+        
+        Args:
+            symbols: Lista simboli
+            
+        Returns:
+            Dict con symbol -> {price, volume, daily_change, daily_change_pct};
+            i simboli senza quotazione non compaiono
+        """
+        quotes = {}
+        for i in range(0, len(symbols), self.spark_batch):
+            batch = symbols[i:i + self.spark_batch]
+            try:
+                # Un solo slot di rate limit per blocco di simboli
+                self._wait_for_rate_limit()
+                
+                response = self.session.get(
+                    self.spark_url,
+                    params={'symbols': ','.join(batch), 'range': '1d', 'interval': '1d'},
+                    timeout=10
+                )
+                response.raise_for_status()
+                data = json_loads(response.content)
+                
+                # Formato v8 piatto {symbol: {...}} o quello annidato {'spark': {'result': [...]}}
+                if 'spark' in data:
+                    items = [(item['symbol'], item['response'][0]) for item in data['spark']['result'] or []]
+                else:
+                    items = data.items()
+                for symbol, item in items:
+                    quote = self._spark_quote(item)
+                    if quote is not None:
+                        quotes[symbol] = quote
+                        
+            # Chi chiama ripiega su yfinance per i simboli mancanti: non è un errore
+            except requests.exceptions.RequestException as e:
+                logger.debug(f"📡 Quotazioni spark non disponibili: {e}")
+            except (KeyError, IndexError, TypeError, ValueError, AttributeError) as e:
+                logger.debug(f"📡 Risposta spark non valida: {e}")
+        
+        logger.debug(f"📡 Quotazioni spark: {len(quotes)}/{len(symbols)} simboli")
+        return quotes
+    
+    @staticmethod
+    def _spark_quote(item: Dict) -> Optional[Dict]:
+        """Quotazione da una voce spark (None se manca il prezzo)"""
+        meta = item.get('meta', {})
+        closes = item.get('close')
+        if closes is None:
+            closes = item.get('indicators', {}).get('quote', [{}])[0].get('close') or []
+        closes = [c for c in closes if c is not None]
+        
+        price = meta.get('regularMarketPrice', closes[-1] if closes else None)
+        if price is None:
+            return None
+        prev_close = meta.get('chartPreviousClose') or item.get('chartPreviousClose') or item.get('previousClose')
+        daily_change = float(price) - float(prev_close) if prev_close else 0.0
+        return {
+            'price': float(price),
+            'volume': int(meta.get('regularMarketVolume') or 0),
+            'daily_change': daily_change,
+            'daily_change_pct': (daily_change / float(prev_close)) * 100 if prev_close else 0.0
+        }
+    
     def get_multiple_stocks(self, symbols: List[str], period: str = "1y", interval: str = "1d") -> Dict[str, pd.DataFrame]:
         """
         Ottiene dati per multipli simboli
@@ -196,18 +285,30 @@ class YahooFinanceV8:
             Dict con symbol -> DataFrame
         """
         results = {}
+        if not symbols:
+            return results
         
-        for symbol in symbols:
-            try:
-                data = self.get_stock_data(symbol, period, interval)
-                if data is not None and not data.empty:
-                    results[symbol] = data
-                    logger.info(f"✅ {symbol}: {len(data)} righe")
-                else:
-                    logger.warning(f"⚠️ {symbol}: nessun dato")
-                    
-            except Exception as e:
-                logger.error(f"❌ Errore {symbol}: {e}")
+        # Richieste in parallelo: _wait_for_rate_limit resta globale tra i worker,
+        # quindi si sovrappongono le attese di rete, non si supera il rate limit
+        with ThreadPoolExecutor(max_workers=min(8, len(symbols)), thread_name_prefix='v8-fetch') as executor:
+            futures = {executor.submit(self.get_stock_data, symbol, period, interval): symbol
+                       for symbol in symbols}
+            
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    data = future.result()
+                    if data is not None and not data.empty:
+                        results[symbol] = data
+                        logger.info(f"✅ {symbol}: {len(data)} righe")
+                    else:
+                        logger.warning(f"⚠️ {symbol}: nessun dato")
+                        
+                except Exception as e:
+                    logger.error(f"❌ Errore {symbol}: {e}")
+        
+        # Stesso ordine dei simboli richiesti
+        results = {symbol: results[symbol] for symbol in symbols if symbol in results}
         
         logger.info(f"📊 Completato: {len(results)}/{len(symbols)} simboli")
         return results
@@ -98,7 +98,7 @@ except Exception as e:
 # Test 6: Strategy Engine
 print("\n📈 TEST STRATEGY ENGINE:")
 try:
-    from src.strategy_engine import StrategyEngine
+    from strategy_engine import StrategyEngine
     strategy_engine = StrategyEngine(config_path='config/production_settings.json')
     print("✅ Strategy Engine inizializzato")
 except Exception as e:
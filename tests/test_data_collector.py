@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test Data Collector - Memo dei prezzi correnti e orari di borsa
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+# Setup paths
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+
+pytest.importorskip('pandas')
+pytest.importorskip('yfinance')
+
+import data_collector  # noqa: E402
+
+TZ = data_collector.NYSE_TZ
+
+
+class FrozenClock:
+    """Orologio monotonic fermo, avanzato a mano dal test"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        pass
+
+
+class FailingTicker:
+    """Fallback yfinance senza rete: nessun prezzo"""
+
+    def __init__(self, symbol):
+        pass
+
+    def history(self, **kwargs):
+        raise RuntimeError("rete non disponibile nei test")
+
+
+@pytest.fixture
+def collector(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    clock = FrozenClock()
+    monkeypatch.setattr(data_collector, 'time', clock)
+    monkeypatch.setattr(data_collector.yf, 'Ticker', FailingTicker)
+    dc = data_collector.DataCollector(config={'data': {'symbols': ['AAPL', 'MSFT'],
+                                                       'lookback_days': 30}})
+    return dc, clock
+
+
+def test_seconds_until_us_open():
+    """Aperto durante la seduta, chiuso fino alla riapertura saltando weekend e festività"""
+    # Mercoledì 14 ottobre 2026 a metà seduta
+    assert data_collector._seconds_until_us_open(datetime(2026, 10, 14, 12, 0, tzinfo=TZ)) == 0
+    # Stesso giorno prima dell'apertura
+    assert data_collector._seconds_until_us_open(datetime(2026, 10, 14, 9, 0, tzinfo=TZ)) == 1800
+    # Venerdì sera: riapre lunedì alle 9:30
+    friday = datetime(2026, 10, 16, 17, 0, tzinfo=TZ)
+    assert data_collector._seconds_until_us_open(friday) == (2 * 24 + 16.5) * 3600
+    # Giorno del Ringraziamento (26 novembre 2026): chiuso, riapre venerdì
+    thanksgiving = datetime(2026, 11, 26, 12, 0, tzinfo=TZ)
+    assert data_collector._seconds_until_us_open(thanksgiving) == 21.5 * 3600
+
+
+def test_closed_market_ttl_capped_at_next_open(collector, monkeypatch):
+    """A mercato chiuso il memo scade alla riapertura, non dopo closed_price_ttl"""
+    dc, clock = collector
+    quotes = {'AAPL': {'price': 1.0}, 'MSFT': {'price': 2.0}}
+    calls = []
+    monkeypatch.setattr(data_collector.yahoo_v8, 'get_quotes',
+                        lambda symbols: calls.append(1) or dict(quotes))
+    monkeypatch.setattr(data_collector, '_seconds_until_us_open', lambda: 600.0)
+
+    dc.get_current_prices()
+    clock.now += 599
+    dc.get_current_prices()
+    assert len(calls) == 1
+
+    clock.now += 2
+    dc.get_current_prices()
+    assert len(calls) == 2
+
+
+def test_partial_prices_not_memoized(collector, monkeypatch):
+    """Un risultato con simboli mancanti viene richiesto di nuovo al giro dopo"""
+    dc, clock = collector
+    calls = []
+    monkeypatch.setattr(data_collector.yahoo_v8, 'get_quotes',
+                        lambda symbols: calls.append(1) or {'AAPL': {'price': 1.0}})
+    monkeypatch.setattr(data_collector, '_seconds_until_us_open', lambda: 0.0)
+
+    prices = dc.get_current_prices()
+    assert set(prices) == {'AAPL'}
+    dc.get_current_prices()
+    assert len(calls) == 2
@@ -52,8 +52,8 @@ except ImportError as e:
     print(f"❌ RLAgent: {e}")
 
 try:
-    from src.strategy_engine import StrategyEngine
-    print("✅ src.strategy_engine.StrategyEngine")
+    from strategy_engine import StrategyEngine
+    print("✅ strategy_engine.StrategyEngine")
 except ImportError as e:
     print(f"❌ StrategyEngine: {e}")
 
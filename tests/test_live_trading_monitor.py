@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Test Live Trading Monitor - RSI di Wilder contro un riferimento pandas
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Setup paths
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+pytest.importorskip('yfinance')
+pytest.importorskip('gymnasium')
+
+import live_trading_monitor  # noqa: E402
+
+
+def wilder_rsi_reference(close, period):
+    """RSI di Wilder con pandas: media semplice delle prime variazioni, poi ewm(alpha=1/period)"""
+    delta = pd.Series(close).diff()
+    averages = []
+    for side in (delta.clip(lower=0), -delta.clip(upper=0)):
+        seeded = pd.concat([pd.Series([side.iloc[1:period + 1].mean()]), side.iloc[period + 1:]])
+        averages.append(seeded.ewm(alpha=1 / period, adjust=False).mean().to_numpy())
+    avg_gain, avg_loss = averages
+    rsi = np.full(len(close), np.nan)
+    rsi[period:] = 100 - 100 / (1 + avg_gain / avg_loss)
+    return rsi
+
+
+@pytest.mark.parametrize('period', [5, 14])
+def test_rsi_wilder_matches_reference(period):
+    """Il kernel in un'unica passata coincide con il riferimento su tutta la serie"""
+    rng = np.random.default_rng(8)
+    close = 50.0 + np.cumsum(rng.normal(0.0, 1.0, 250))
+    np.testing.assert_allclose(live_trading_monitor._rsi_wilder(close, period),
+                               wilder_rsi_reference(close, period), rtol=1e-9)
+
+
+def test_rsi_wilder_edge_cases():
+    """Serie troppo corte restano NaN; senza perdite l'RSI è 100"""
+    assert np.isnan(live_trading_monitor._rsi_wilder(np.arange(14, dtype=np.float64), 14)).all()
+    rising = live_trading_monitor._rsi_wilder(np.arange(30, dtype=np.float64), 14)
+    assert np.isnan(rising[:14]).all()
+    assert (rising[14:] == 100.0).all()
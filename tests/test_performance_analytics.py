@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test Performance Analytics - Riduzione LTTB delle serie dei grafici
+"""
+
+import math
+import sys
+from pathlib import Path
+
+import pytest
+
+# Setup paths
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('pandas')
+pytest.importorskip('scipy')
+pytest.importorskip('sklearn')
+
+import performance_analytics  # noqa: E402
+
+
+def lttb_reference(x, y, threshold):
+    """LTTB nella formulazione originale (Steinarsson), un punto alla volta"""
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+
+    every = (n - 2) / (threshold - 2)
+    sampled = [0]
+    a = 0
+    for i in range(threshold - 2):
+        avg_start = math.floor((i + 1) * every) + 1
+        avg_end = min(math.floor((i + 2) * every) + 1, n)
+        avg_x = sum(x[avg_start:avg_end]) / (avg_end - avg_start)
+        avg_y = sum(y[avg_start:avg_end]) / (avg_end - avg_start)
+
+        best, best_area = None, -1.0
+        for j in range(math.floor(i * every) + 1, math.floor((i + 1) * every) + 1):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        sampled.append(best)
+        a = best
+    sampled.append(n - 1)
+    return sampled
+
+
+@pytest.mark.parametrize('n, threshold', [(1000, 100), (5001, 2000), (777, 3)])
+def test_lttb_matches_reference(n, threshold):
+    """Gli indici scelti coincidono con l'algoritmo di riferimento"""
+    rng = np.random.default_rng(n)
+    x = np.sort(rng.uniform(0.0, 1e6, n))
+    y = np.cumsum(rng.normal(0.0, 1.0, n))
+    indices = performance_analytics._lttb_indices(x, y, threshold)
+    assert indices.tolist() == lttb_reference(x.tolist(), y.tolist(), threshold)
+
+
+def test_lttb_short_series_untouched():
+    """Sotto la soglia la serie resta intera"""
+    y = np.arange(10, dtype=np.float64)
+    assert performance_analytics._lttb_indices(y, y, 20).tolist() == list(range(10))
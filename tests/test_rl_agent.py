@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Test RL Agent - Q-table densa, discretizzazione e kernel di training
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Setup paths
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+pytest.importorskip('gymnasium')
+
+import rl_agent  # noqa: E402
+
+CONFIG = {'rl_agent': {'learning_rate': 0.1, 'epsilon': 0.3, 'discount_factor': 0.95, 'seed': 7}}
+
+
+@pytest.fixture
+def agent(tmp_path, monkeypatch):
+    """Agente nuovo, senza modelli salvati"""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'data').mkdir()
+    return rl_agent.RLAgent(CONFIG)
+
+
+@pytest.fixture
+def market():
+    """Barre OHLCV fisse (random walk)"""
+    rng = np.random.default_rng(3)
+    close = 100.0 * np.cumprod(1 + rng.normal(0.0, 0.02, 60))
+    return pd.DataFrame({
+        'Open': close,
+        'High': close * 1.01,
+        'Low': close * 0.99,
+        'Close': close,
+        'Volume': rng.integers(1_000, 10_000, 60).astype(np.float64),
+    })
+
+
+def _sign_state_key(observation):
+    """Chiave ternaria originale (-1, 0, 1 attorno a +/-0.01) come tupla"""
+    return tuple(0 if abs(val) < 0.01 else (1 if val > 0 else -1) for val in observation)
+
+
+def _ternary_code(state):
+    """Riga della Q-table densa per una tupla ternaria"""
+    return sum((digit + 1) * 3 ** k for k, digit in enumerate(state))
+
+
+def _reference_observation(data, step, cash, shares, total_value, initial_capital):
+    """Observation di TradingEnvironment calcolata riga per riga con pandas"""
+    if step >= len(data):
+        return np.zeros(10, dtype=np.float32)
+    row = data.iloc[step]
+    features = [row['Close'], row['Volume'], row['High'] - row['Low'],
+                cash / initial_capital, shares, total_value / initial_capital]
+    if step > 5:
+        features.append(row['Close'] / data['Close'].iloc[step - 5:step].mean() - 1)
+    else:
+        features.append(0)
+    if step > 1:
+        features.append(row['Close'] / data.iloc[step - 1]['Close'] - 1)
+    else:
+        features.append(0)
+    features += [0, 0]
+    return np.array(features, dtype=np.float32)
+
+
+def _reference_episode(q_table, data, learning_rate, discount_factor, epsilon,
+                       explore_draws, random_actions, initial_capital=10000):
+    """Episodio di Q-learning con Q-table a dizionario e ambiente in Python puro"""
+    step, cash, shares, total_value = 0, float(initial_capital), 0.0, float(initial_capital)
+    max_steps = len(data) - 1
+    state = _sign_state_key(_reference_observation(data, 0, cash, shares, total_value, initial_capital))
+    total_reward = 0.0
+    done = False
+    for k in range(len(explore_draws)):
+        if done:
+            break
+        if explore_draws[k] < epsilon:
+            action = int(random_actions[k])
+        else:
+            action = int(np.argmax(q_table.get(state, [0, 0, 0])))
+
+        reward = 0.0
+        if step >= len(data):
+            done = True
+        else:
+            price = data['Close'].iloc[step]
+            if action == 1:
+                bought = cash // price
+                shares += bought
+                cash -= bought * price
+            elif action == 2:
+                cash += shares * price
+                shares = 0.0
+            step += 1
+            new_total_value = cash + shares * price
+            reward = new_total_value - total_value
+            total_value = new_total_value
+            done = step >= max_steps
+
+        next_state = _sign_state_key(
+            _reference_observation(data, step, cash, shares, total_value, initial_capital))
+        q_values = q_table.setdefault(state, [0.0, 0.0, 0.0])
+        q_values[action] += learning_rate * (
+            reward + discount_factor * max(q_table.get(next_state, [0, 0, 0])) - q_values[action])
+        state = next_state
+        total_reward += reward
+    return total_reward
+
+
+def test_state_key_matches_ternary_bucketing(agent):
+    """Con i bordi di default la chiave impaccata è la tupla ternaria originale"""
+    rng = np.random.default_rng(0)
+    observations = rng.normal(0.0, 0.05, (500, rl_agent.OBS_SIZE)).astype(np.float32)
+    for obs in observations:
+        expected = _ternary_code(_sign_state_key(obs))
+        assert agent.get_state_key(obs) == expected
+        assert rl_agent._encode_observation(obs, agent._edges) == expected
+
+
+def test_fitted_discretizer_encoding(agent):
+    """Con i bordi a quantili il kernel e get_state_key impaccano le cifre in base n_bins"""
+    rng = np.random.default_rng(1)
+    observations = rng.normal(0.0, 1.0, (400, rl_agent.OBS_SIZE)).astype(np.float32)
+    agent.fit_discretizer(observations, n_bins=4)
+    assert agent.q_table.shape == (4 ** rl_agent.OBS_SIZE, rl_agent.N_ACTIONS)
+
+    for obs in observations[:100]:
+        digits = [int(np.sum(obs[k] > agent._edges[k])) for k in range(rl_agent.OBS_SIZE)]
+        expected = sum(d * 4 ** k for k, d in enumerate(digits))
+        assert agent.get_state_key(obs) == expected
+        assert rl_agent._encode_observation(obs, agent._edges) == expected
+
+
+def test_legacy_q_table_conversion(agent):
+    """Una Q-table a dizionario del vecchio formato finisce nelle righe giuste"""
+    state = (1, 0, -1, 0, 0, 1, 0, 0, 0, 0)
+    agent._load_legacy_q_table({state: [1.0, 2.0, 3.0]})
+    assert agent.q_table[_ternary_code(state)].tolist() == [1.0, 2.0, 3.0]
+    assert agent.is_trained()
+
+
+def test_environment_observation_matches_reference(market):
+    """Le feature precalcolate di TradingEnvironment coincidono con il calcolo riga per riga"""
+    env = rl_agent.TradingEnvironment(market)
+    obs, _ = env.reset()
+    for step in range(len(market) + 1):
+        expected = _reference_observation(market, step, float(env.cash), float(env.shares),
+                                          float(env.total_value), 10000)
+        np.testing.assert_allclose(obs, expected, rtol=1e-6)
+        obs, _, _, _, _ = env.step(step % 3)
+
+
+def test_q_learning_episode_matches_reference(agent, market):
+    """Il kernel di training aggiorna la Q-table densa come il ciclo originale a dizionario"""
+    env = rl_agent.TradingEnvironment(market)
+    reference = {}
+    rng = np.random.default_rng(5)
+    for _ in range(5):
+        explore_draws = rng.random(len(market))
+        random_actions = rng.integers(0, rl_agent.N_ACTIONS, size=len(market), dtype=np.int8)
+        total = rl_agent._q_learning_episode(
+            agent.q_table, agent._visited, agent._edges,
+            env._close, env._volume, env._range, env._sma5, env._ret1,
+            10000.0, 0.1, 0.95, 0.3, explore_draws, random_actions)
+        expected = _reference_episode(reference, market, 0.1, 0.95, 0.3,
+                                      explore_draws, random_actions)
+        assert total == pytest.approx(expected, rel=1e-9)
+
+    assert int(agent._visited.sum()) == len(reference)
+    for state, q_values in reference.items():
+        np.testing.assert_allclose(agent.q_table[_ternary_code(state)], q_values, rtol=1e-4)
+
+
+def test_seeded_agents_are_reproducible(tmp_path, monkeypatch):
+    """Con lo stesso seed due agenti scelgono le stesse azioni"""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'data').mkdir()
+    market_state = {'AAPL': {'close': 150.0, 'volume': 2e6, 'rsi': 40}}
+    actions = []
+    for _ in range(2):
+        agent = rl_agent.RLAgent(CONFIG)
+        actions.append([agent.get_action(market_state)['type'] for _ in range(50)])
+    assert actions[0] == actions[1]
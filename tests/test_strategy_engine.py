@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test Strategy Engine - Coerenza dei percorsi di calcolo degli indicatori
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Setup paths
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('pandas')
+
+import strategy_engine  # noqa: E402
+
+N_BARS = 300
+
+
+@pytest.fixture
+def series():
+    """Random walk fisso: close e volume di N_BARS barre"""
+    rng = np.random.default_rng(42)
+    close = np.ascontiguousarray(100.0 + np.cumsum(rng.normal(0.0, 1.0, N_BARS)))
+    volume = rng.integers(1_000, 10_000, N_BARS).astype(np.float64)
+    return close, volume
+
+
+def test_recursive_state_numpy_matches_kernel(series):
+    """Il fallback NumPy produce lo stesso stato delle ricorsioni del kernel"""
+    close, _ = series
+    np.testing.assert_allclose(strategy_engine._recursive_state_numpy(close),
+                               strategy_engine._recursive_state(close), rtol=1e-10)
+
+
+def test_all_paths_agree(series):
+    """Analisi singola, batch e RollingState (da zero e da storico) coincidono"""
+    close, volume = series
+    expected = strategy_engine._indicators_fast(close, volume)
+
+    batch = strategy_engine._indicators_batch(np.stack([close, close]), np.stack([volume, volume]))
+    for indicators in batch:
+        assert indicators.keys() == expected.keys()
+        for name, value in expected.items():
+            assert indicators[name] == pytest.approx(value, rel=1e-10), name
+
+    from_scratch = strategy_engine.RollingState()
+    for x, v in zip(close.tolist(), volume.tolist()):
+        from_scratch.update(x, v)
+
+    from_history = strategy_engine.RollingState.from_arrays(close[:100], volume[:100])
+    for x, v in zip(close[100:].tolist(), volume[100:].tolist()):
+        from_history.update(x, v)
+
+    for state in (from_scratch, from_history):
+        current = state.current()
+        assert current.keys() == expected.keys()
+        for name, value in expected.items():
+            assert current[name] == pytest.approx(value, rel=1e-9), name
+
+
+def test_float32_series_close_to_float64(series):
+    """Le serie float32 passano per gli stessi kernel con errore da arrotondamento"""
+    close, _ = series
+    reference = strategy_engine._fused_last(close)
+    single = strategy_engine._fused_last(strategy_engine._kernel_array(close.astype(np.float32)))
+    np.testing.assert_allclose(single, reference, rtol=1e-5)
+
+
+def test_readonly_input_is_copied(series):
+    """Le viste read-only (pandas >= 3) diventano array scrivibili per i kernel"""
+    close, _ = series
+    close.flags.writeable = False
+    array = strategy_engine._kernel_array(close)
+    assert array.flags.writeable and array.flags.c_contiguous
+    assert strategy_engine._fused_last(array) == strategy_engine._fused_last(close.copy())
+
+
+def test_should_buy_sell_guard_bad_frames():
+    """Un DataFrame senza colonna Close non solleva: nessun segnale"""
+    pd = pytest.importorskip('pandas')
+    frame = pd.DataFrame({'x': [1, 2, 3]})
+    assert strategy_engine.should_buy(frame) is False
+    assert strategy_engine.should_sell(frame) is False
+
+
+def _ta_indicators(frame):
+    """Indicatori di riferimento calcolati con ta e pandas (implementazione originale)"""
+    ta = pytest.importorskip('ta')
+    close = frame['Close']
+    macd = ta.trend.MACD(close)
+    bb = ta.volatility.BollingerBands(close)
+    indicators = {
+        'rsi': ta.momentum.RSIIndicator(close).rsi().iloc[-1],
+        'macd': macd.macd().iloc[-1],
+        'macd_signal': macd.macd_signal().iloc[-1],
+        'macd_diff': macd.macd_diff().iloc[-1],
+        'bb_upper': bb.bollinger_hband().iloc[-1],
+        'bb_lower': bb.bollinger_lband().iloc[-1],
+        'bb_middle': bb.bollinger_mavg().iloc[-1],
+        'sma_20': close.rolling(20).mean().iloc[-1],
+        'sma_50': close.rolling(50).mean().iloc[-1],
+        'ema_12': close.ewm(span=12).mean().iloc[-1],
+        'ema_26': close.ewm(span=26).mean().iloc[-1],
+        'current_price': close.iloc[-1],
+        'volume': frame['Volume'].iloc[-1],
+        'volume_sma': frame['Volume'].rolling(20).mean().iloc[-1],
+    }
+    indicators['bb_width'] = (indicators['bb_upper'] - indicators['bb_lower']) / indicators['bb_middle']
+    return indicators
+
+
+def test_indicators_match_ta(series):
+    """Gli indicatori fusi coincidono con ta su tutti i percorsi di StrategyEngine"""
+    pd = pytest.importorskip('pandas')
+    close, volume = series
+    frame = pd.DataFrame({'Close': close, 'Volume': volume})
+    expected = _ta_indicators(frame)
+
+    engine = strategy_engine.StrategyEngine(config_path=str(ROOT / 'config' / 'production_settings.json'))
+    single = engine._calculate_indicators(frame)
+    rolling = engine._calculate_indicators(frame, 'TEST')
+    for indicators in (single, rolling):
+        assert indicators.keys() == expected.keys()
+        for name, value in expected.items():
+            assert indicators[name] == pytest.approx(value, rel=1e-9), name
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Test Trading Env - Kernel di step contro la logica originale di TradingEnv.step
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Setup paths
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('gymnasium')
+
+import trading_env  # noqa: E402
+
+
+def reference_step(prices, index, cash, shares, action):
+    """TradingEnv.step originale in Python puro: (index, cash, shares, reward, done)"""
+    if index >= len(prices) - 1:
+        return index, cash, shares, 0.0, True
+    price = float(prices[index])
+    prev_portfolio_value = cash + shares * price
+    if action == 1 and cash >= price:
+        shares += 1
+        cash -= price
+    elif action == 2 and shares > 0:
+        cash += price
+        shares -= 1
+    index += 1
+    reward = cash + shares * float(prices[index]) - prev_portfolio_value
+    return index, cash, shares, reward, index >= len(prices) - 1
+
+
+@pytest.fixture
+def prices():
+    """Prezzi fissi attorno a 3 (con cash iniziale 10 si comprano più azioni)"""
+    rng = np.random.default_rng(11)
+    return (3.0 * np.cumprod(1 + rng.normal(0.0, 0.03, 80))).astype(np.float32)
+
+
+def test_step_kernel_matches_reference(prices):
+    """Observation, reward e info di step coincidono con la logica originale"""
+    env = trading_env.TradingEnv(prices)
+    env.reset(seed=0)
+    actions = np.random.default_rng(2).integers(0, 3, size=len(prices) + 5)
+
+    index, cash, shares = 0, 10.0, 0
+    for action in actions.tolist():
+        obs, reward, done, truncated, info = env.step(action)
+        index, cash, shares, expected_reward, expected_done = reference_step(
+            prices, index, cash, shares, action)
+
+        assert reward == pytest.approx(expected_reward, rel=1e-12, abs=1e-12)
+        assert done == expected_done and not truncated
+        assert info['step'] == index
+        assert info['cash'] == pytest.approx(cash, rel=1e-12)
+        assert info['shares'] == shares
+        np.testing.assert_allclose(obs, [prices[min(index, len(prices) - 1)], cash, shares],
+                                   rtol=1e-6)
+
+
+def test_observations_are_independent_copies(prices):
+    """Il buffer di lavoro non trapela: le observation restituite non cambiano dopo"""
+    env = trading_env.TradingEnv(prices)
+    first, _ = env.reset(seed=0)
+    snapshot = first.copy()
+    env.step(1)
+    np.testing.assert_array_equal(first, snapshot)
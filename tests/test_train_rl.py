@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test Train RL - Rollout compilato e vettoriale contro TradingEnv.step
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Setup paths
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('gymnasium')
+
+import train_rl  # noqa: E402
+from trading_env import TradingEnv  # noqa: E402
+
+MAX_STEPS = 100
+
+
+@pytest.fixture
+def prices():
+    """Prezzi float32 fissi attorno a 3: con cash 10 gli episodi comprano e vendono"""
+    rng = np.random.default_rng(21)
+    return np.ascontiguousarray(3.0 * np.cumprod(1 + rng.normal(0.0, 0.03, 150)), dtype=np.float32)
+
+
+def _env_episode(prices, actions):
+    """Reward totale di un episodio giocato con TradingEnv.step"""
+    env = TradingEnv(prices)
+    env.reset(seed=0)
+    total_reward = 0.0
+    for action in actions:
+        _, reward, done, truncated, _ = env.step(int(action))
+        total_reward += reward
+        if done or truncated:
+            break
+    return total_reward
+
+
+def _xorshift_actions(seed, count):
+    """Le azioni che _rollout estrae dal suo xorshift a 32 bit"""
+    x = seed & 0xFFFFFFFF or 2463534242
+    actions = []
+    for _ in range(count):
+        x ^= (x << 13) & 0xFFFFFFFF
+        x ^= x >> 17
+        x ^= (x << 5) & 0xFFFFFFFF
+        actions.append(x % 3)
+    return actions
+
+
+def test_rollout_matches_env(prices):
+    """Il rollout compilato somma gli stessi reward di TradingEnv.step"""
+    episodes = 8
+    totals = train_rl._rollout(prices, episodes, MAX_STEPS, 12345)
+    # Lo stato del generatore prosegue da un episodio all'altro
+    actions = _xorshift_actions(12345, episodes * MAX_STEPS)
+    steps = min(MAX_STEPS, len(prices) - 1)
+    expected = []
+    for episode in range(episodes):
+        expected.append(_env_episode(prices, actions[:steps]))
+        actions = actions[steps:]
+    np.testing.assert_allclose(totals, expected, rtol=1e-9, atol=1e-9)
+
+
+def test_vec_rollout_matches_env(prices):
+    """Il rollout vettoriale (senza numba) somma gli stessi reward di TradingEnv.step"""
+    episodes = 8
+    totals = train_rl._vec_rollout(prices, episodes, MAX_STEPS, np.random.default_rng(4))
+    steps = min(MAX_STEPS, len(prices) - 1)
+    actions = np.random.default_rng(4).integers(0, 3, size=(steps, episodes), dtype=np.int8)
+    expected = [_env_episode(prices, actions[:, episode]) for episode in range(episodes)]
+    np.testing.assert_allclose(totals, expected, rtol=1e-9, atol=1e-9)
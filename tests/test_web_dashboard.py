@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test Web Dashboard - Cache del refresh e ciclo di vita del loop
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Setup paths
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT / 'dashboard'))
+
+pytest.importorskip('flask')
+pytest.importorskip('flask_cors')
+
+
+def test_refresh_loop_survives_requests(tmp_path, monkeypatch):
+    """Il refresh resta attivo dopo le richieste e la seconda risposta viene dalla cache"""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'data').mkdir()
+
+    import web_dashboard
+    # Thread reali: con eventlet senza monkey patching il task non partirebbe
+    monkeypatch.setattr(web_dashboard, 'SOCKETIO_ASYNC_MODE', 'threading')
+
+    app = web_dashboard.create_app({'dashboard': {'auto_refresh': 30}})
+    dashboard = app.dashboard
+    try:
+        # Primo tick del refresh
+        deadline = time.monotonic() + 10
+        while dashboard.cache['portfolio'] is None and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert dashboard.cache['portfolio'] is not None
+
+        client = app.test_client()
+        first = client.get('/api/portfolio/summary')
+        assert first.status_code == 200
+
+        calls = []
+        compute = dashboard.get_portfolio_summary
+        monkeypatch.setattr(dashboard, 'get_portfolio_summary',
+                            lambda: calls.append(1) or compute())
+        second = client.get('/api/portfolio/summary')
+
+        assert dashboard.running
+        assert dashboard.refresh_thread is not None
+        assert calls == []
+        assert second.get_json() == first.get_json()
+    finally:
+        dashboard.stop_auto_refresh()
+
+    assert not dashboard.running
+
+
+def test_dashboard_reads_portfolio_snapshot(tmp_path, monkeypatch):
+    """Le operazioni salvate da Portfolio arrivano alla dashboard tramite lo snapshot msgpack"""
+    pytest.importorskip('ormsgpack')
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'data').mkdir()
+
+    from portfolio import Portfolio
+    import web_dashboard
+
+    portfolio = Portfolio(config={'trading': {'initial_capital': 10000}})
+    portfolio.simulate_trade({'type': 'buy', 'symbol': 'AAPL', 'quantity': 10, 'price': 100.0})
+    portfolio.simulate_trade({'type': 'buy', 'symbol': 'AAPL', 'quantity': 10, 'price': 200.0})
+    portfolio.simulate_trade({'type': 'sell', 'symbol': 'AAPL', 'quantity': 5, 'price': 180.0})
+    assert (tmp_path / 'data' / 'current_portfolio.msgpack').exists()
+
+    dashboard = web_dashboard.TradingDashboard({})
+    loaded = dashboard.load_portfolio()
+    assert loaded.cash == pytest.approx(10000 - 1000 - 2000 + 900)
+    assert loaded.positions == {'AAPL': {'shares': 15, 'avg_price': pytest.approx(150.0)}}
+    assert [tx['type'] for tx in loaded.transactions] == ['BUY', 'BUY', 'SELL']
+
+    summary = dashboard.get_portfolio_summary()
+    assert summary['total_trades'] == 3
+    assert summary['total_value'] == pytest.approx(loaded.cash + 15 * 150.0)